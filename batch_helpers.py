@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def check_winners(
+    boards: np.ndarray,
+    target: int,
+    how_many: int,
+) -> np.ndarray:
+    # Vectorized check_winner over a stack of same-shape boards, shaped
+    # (num_boards, rows, cols). Returns one bool per board.
+    num_boards, rows, cols = boards.shape
+    # check_winner only scans k x k boxes, so it never finds a line on a
+    # board narrower or shorter than k; keep the two in exact agreement.
+    if rows < how_many or cols < how_many:
+        return np.zeros(num_boards, dtype=bool)
+    is_target: np.ndarray = boards == target
+    # Each window starts at (row, col); AND the k cells of each line
+    # together by slicing the board k times with a growing offset.
+    row_starts: int = rows - how_many + 1
+    col_starts: int = cols - how_many + 1
+    horizontal: np.ndarray = is_target[:, :, :col_starts].copy()
+    vertical: np.ndarray = is_target[:, :row_starts, :].copy()
+    downward_diagonal: np.ndarray = (
+        is_target[:, :row_starts, :col_starts].copy()
+    )
+    upward_diagonal: np.ndarray = (
+        is_target[:, how_many - 1:, :col_starts].copy()
+    )
+    for i in range(1, how_many):
+        horizontal &= is_target[:, :, i:i + col_starts]
+        vertical &= is_target[:, i:i + row_starts, :]
+        downward_diagonal &= is_target[:, i:i + row_starts, i:i + col_starts]
+        upward_diagonal &= is_target[
+            :,
+            how_many - 1 - i:rows - i,
+            i:i + col_starts,
+        ]
+    return (
+        horizontal.any(axis=(1, 2))
+        | vertical.any(axis=(1, 2))
+        | downward_diagonal.any(axis=(1, 2))
+        | upward_diagonal.any(axis=(1, 2))
+    )
+
+
+def find_winners(boards: np.ndarray, how_many: int) -> np.ndarray:
+    # Per board: 0 or 1 for the player with a winning line, -1 for neither.
+    # Finished games only ever have one, so player 0 is checked first.
+    player_0_won: np.ndarray = check_winners(boards, 0, how_many)
+    player_1_won: np.ndarray = check_winners(boards, 1, how_many)
+    return np.where(player_0_won, 0, np.where(player_1_won, 1, -1))
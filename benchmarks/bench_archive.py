@@ -0,0 +1,59 @@
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from game_archive import GameArchive
+from game_objects import TwoPlayerGame
+from game_store import InMemoryGameStore
+from payload_schema import NewGame
+
+
+NUM_GAMES: int = 20_000
+WIN_CONDITION: int = 4
+
+
+def main() -> None:
+    # Finished 7x6 games of 13 moves each, held in memory and then archived
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        store: InMemoryGameStore = InMemoryGameStore(
+            archive=GameArchive(directory),
+        )
+        for game_number in range(NUM_GAMES):
+            game: TwoPlayerGame = TwoPlayerGame(
+                str(uuid.uuid4()),
+                NewGame(
+                    players=[f'foo-{game_number}', f'bar-{game_number}'],
+                    columns=7,
+                    rows=6,
+                ),
+                WIN_CONDITION,
+            )
+            for column in (0, 1, 2, 3, 4, 5, 6, 1, 2, 3, 4, 5):
+                game.make_move(game.players[game.turn_index], column)
+            game.delete_player(game.players[game.turn_index])
+            store.add(game)
+            with store.update(game.game_id):
+                pass
+        in_memory, _ = tracemalloc.get_traced_memory()
+        started: float = time.perf_counter()
+        archived: int = store.archive_finished(time.monotonic() + 3601)
+        while archived < NUM_GAMES:
+            archived += store.archive_finished(time.monotonic() + 3601)
+        elapsed: float = time.perf_counter() - started
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        started = time.perf_counter()
+        for game_id in list(store.archive.offsets)[:1000]:
+            store.get(game_id)
+        read: float = (time.perf_counter() - started) / 1000
+        print(f'{NUM_GAMES} finished 7x6 games')
+        print(f'in memory: {in_memory / NUM_GAMES:>7.1f} bytes per game')
+        print(f'archived:  {after / NUM_GAMES:>7.1f} bytes per game')
+        print(f'archived in {elapsed:.2f} s, read back in {read * 1e6:.0f} us')
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import time
+from typing import List
+
+import numpy as np
+
+from batch_helpers import find_winners
+from helpers import check_winner
+
+
+NUM_BOARDS: int = 10_000
+ROWS: int = 6
+COLUMNS: int = 7
+WIN_CONDITION: int = 4
+
+
+def main() -> None:
+    rng: np.random.Generator = np.random.default_rng(98)
+    stacked: np.ndarray = rng.integers(
+        -1,
+        2,
+        size=(NUM_BOARDS, ROWS, COLUMNS),
+        dtype=np.int8,
+    )
+    boards: List[List[List[int]]] = stacked.tolist()
+
+    started: float = time.perf_counter()
+    looped: List[int] = [
+        0 if check_winner(board, 0, WIN_CONDITION)
+        else 1 if check_winner(board, 1, WIN_CONDITION)
+        else -1
+        for board in boards
+    ]
+    loop_seconds: float = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized: np.ndarray = find_winners(stacked, WIN_CONDITION)
+    vectorized_seconds: float = time.perf_counter() - started
+
+    assert vectorized.tolist() == looped
+    print(f'{NUM_BOARDS} boards of {ROWS}x{COLUMNS}')
+    print(f'check_winner loop: {loop_seconds * 1000:>8.1f} ms')
+    print(f'find_winners:      {vectorized_seconds * 1000:>8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
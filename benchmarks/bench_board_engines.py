@@ -0,0 +1,72 @@
+import random
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from boards import BOARD_ENGINES, make_board
+from game_objects import GameState, TwoPlayerGame
+from payload_schema import NewGame
+
+
+BOARD_SHAPES: List[Tuple[int, int]] = [(6, 7), (20, 20), (64, 64)]
+WIN_CONDITION: int = 4
+GAMES_PER_SHAPE: int = 50
+
+
+def play_random_games(engine: str, rows: int, columns: int) -> int:
+    # Same seed for every engine, so every engine plays the same moves
+    rng: random.Random = random.Random(98)
+    new_game: NewGame = NewGame(
+        players=['foo', 'bar'],
+        rows=rows,
+        columns=columns,
+    )
+    moves_played: int = 0
+    for game_number in range(GAMES_PER_SHAPE):
+        game: TwoPlayerGame = TwoPlayerGame(
+            f'game-{game_number}',
+            new_game,
+            WIN_CONDITION,
+            engine,
+        )
+        open_columns: List[int] = list(range(columns))
+        while game.state == GameState.IN_PROGRESS:
+            column: int = rng.choice(open_columns)
+            game.make_move(game.players[game.turn_index], column)
+            if game.board.is_column_full(column):
+                open_columns.remove(column)
+            moves_played += 1
+    return moves_played
+
+
+def board_bytes(engine: str, rows: int, columns: int) -> int:
+    # Bytes held by a board after half of it has been filled
+    tracemalloc.start()
+    board = make_board(engine, rows, columns, WIN_CONDITION)
+    for column in range(columns):
+        for height in range(rows // 2):
+            board.drop(column, height % 2)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated
+
+
+def main() -> None:
+    print(
+        f'{"board":>8} {"engine":>9} {"moves/s":>10} '
+        f'{"half-full board bytes":>22}'
+    )
+    for rows, columns in BOARD_SHAPES:
+        for engine in BOARD_ENGINES:
+            started: float = time.perf_counter()
+            moves_played: int = play_random_games(engine, rows, columns)
+            elapsed: float = time.perf_counter() - started
+            shape: str = f'{rows}x{columns}'
+            print(
+                f'{shape:>8} {engine:>9} {moves_played / elapsed:>10.0f} '
+                f'{board_bytes(engine, rows, columns):>22}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import os
+import time
+import uuid
+from typing import Dict, List
+
+from fastapi.testclient import TestClient
+
+from main import app, bulk_game_ids
+
+
+NUM_GAMES: int = 10_000
+NEW_GAME: Dict[str, object] = {
+    'players': ['foo', 'bar'],
+    'columns': 7,
+    'rows': 6,
+}
+
+
+def one_request_per_game(test_client: TestClient) -> float:
+    started: float = time.perf_counter()
+    for _ in range(NUM_GAMES):
+        test_client.post('/drop_token', json=NEW_GAME)
+    return time.perf_counter() - started
+
+
+def one_bulk_request(test_client: TestClient) -> float:
+    started: float = time.perf_counter()
+    game_ids: List[str] = test_client.post(
+        '/drop_token/batch/games',
+        json={'games': [NEW_GAME] * NUM_GAMES},
+    ).json()['gameIds']
+    assert len(game_ids) == NUM_GAMES
+    return time.perf_counter() - started
+
+
+def ids_one_by_one() -> float:
+    started: float = time.perf_counter()
+    for _ in range(NUM_GAMES):
+        str(uuid.uuid4())
+    return time.perf_counter() - started
+
+
+def ids_in_bulk() -> float:
+    started: float = time.perf_counter()
+    bulk_game_ids(NUM_GAMES)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    os.environ.setdefault('WIN_CONDITION', '4')
+    with TestClient(app) as test_client:
+        per_request: float = one_request_per_game(test_client)
+    with TestClient(app) as test_client:
+        bulk: float = one_bulk_request(test_client)
+    print(f'{NUM_GAMES} games, one request each: {per_request:.2f} s')
+    print(f'{NUM_GAMES} games, one bulk request: {bulk:.2f} s')
+    print(f'{per_request / bulk:.0f}x faster in bulk')
+    print(f'IDs from uuid4(): {ids_one_by_one() * 1e3:.1f} ms')
+    print(f'IDs from one os.urandom read: {ids_in_bulk() * 1e3:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
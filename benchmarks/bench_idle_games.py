@@ -0,0 +1,42 @@
+import time
+import tracemalloc
+from typing import List
+
+from game_objects import TwoPlayerGame
+from payload_schema import NewGame
+
+
+NUM_GAMES: int = 1_000_000
+WIN_CONDITION: int = 4
+
+
+def main() -> None:
+    # IDs and payloads exist before any game does, so they are not counted.
+    # Players are parsed per request in the service, so every game gets its
+    # own strings rather than sharing two.
+    game_ids: List[str] = [
+        str(game_number) for game_number in range(NUM_GAMES)
+    ]
+    new_games: List[NewGame] = [
+        NewGame(
+            players=[f'foo-{game_number}', f'bar-{game_number}'],
+            columns=7,
+            rows=6,
+        )
+        for game_number in range(NUM_GAMES)
+    ]
+    tracemalloc.start()
+    started: float = time.perf_counter()
+    games: List[TwoPlayerGame] = [
+        TwoPlayerGame(game_id, new_game, WIN_CONDITION)
+        for game_id, new_game in zip(game_ids, new_games)
+    ]
+    elapsed: float = time.perf_counter() - started
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{len(games)} idle 7x6 games created in {elapsed:.1f} s')
+    print(f'{allocated / NUM_GAMES:.1f} bytes per game')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import tracemalloc
+from typing import Dict, List, Union
+
+from move_log import MoveLog
+
+
+NUM_MOVES: int = 100_000
+PLAYERS: List[str] = ['foo', 'bar']
+
+
+def dict_log_bytes() -> int:
+    tracemalloc.start()
+    moves: List[Dict[str, Union[int, str]]] = []
+    for move_number in range(NUM_MOVES):
+        moves.append({
+            'type': 'MOVE',
+            'player': PLAYERS[move_number % 2],
+            'column': move_number % 1000,
+        })
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated
+
+
+def compact_log_bytes() -> int:
+    tracemalloc.start()
+    move_log: MoveLog = MoveLog(PLAYERS)
+    for move_number in range(NUM_MOVES):
+        move_log.append_move(move_number % 2, move_number % 1000)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated
+
+
+def main() -> None:
+    print(f'{NUM_MOVES} moves')
+    print(f'list of dicts: {dict_log_bytes() / NUM_MOVES:>6.1f} bytes/move')
+    print(f'MoveLog:       {compact_log_bytes() / NUM_MOVES:>6.1f} bytes/move')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import time
+import tracemalloc
+from typing import Iterator, List, Tuple
+
+from main import MOVES_PER_CHUNK, moves_chunks
+from move_log import MoveLog
+
+
+NUM_MOVES: int = 1_000_000
+PLAYERS: List[str] = ['foo', 'bar']
+
+
+def whole_body(move_log: MoveLog) -> Tuple[float, int]:
+    # Seconds until the body can be sent, and peak bytes allocated
+    tracemalloc.start()
+    started: float = time.perf_counter()
+    body: bytes = b'{"moves":' + move_log.get_range_json(0, NUM_MOVES) + b'}'
+    first_byte: float = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert body
+    return first_byte, peak
+
+
+def streamed_body(move_log: MoveLog) -> Tuple[float, int]:
+    tracemalloc.start()
+    started: float = time.perf_counter()
+    chunks: Iterator[bytes] = moves_chunks(move_log, 0, NUM_MOVES)
+    next(chunks)
+    first_byte: float = time.perf_counter() - started
+    for _ in chunks:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, peak
+
+
+def main() -> None:
+    move_log: MoveLog = MoveLog(PLAYERS)
+    for move_number in range(NUM_MOVES):
+        move_log.append_move(move_number % 2, move_number % 7)
+    print(f'GET .../moves for {NUM_MOVES} moves')
+    for name, measure in (
+        ('whole body', whole_body),
+        (f'{MOVES_PER_CHUNK}-move chunks', streamed_body),
+    ):
+        first_byte, peak = measure(move_log)
+        print(
+            f'{name:>17}: first byte after {first_byte * 1000:>6.1f} ms, '
+            f'peak {peak / 2 ** 20:>6.1f} MiB',
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from game_store import InMemoryGameStore
+from journal import Journal
+
+
+NUM_GAMES: int = 1_000_000
+# Every tenth game has a few moves played
+MOVES_PER_PLAYED_GAME: int = 6
+
+
+def write_log(directory: str) -> int:
+    journal: Journal = Journal(directory)
+    records: int = 0
+    for game_number in range(NUM_GAMES):
+        game_id: str = str(uuid.UUID(int=game_number))
+        journal.append_create(game_id, ('foo', 'bar'), 6, 7, 4, 'list')
+        records += 1
+        if game_number % 10 == 0:
+            for move_number in range(MOVES_PER_PLAYED_GAME):
+                journal.append_move(game_id, move_number % 2, move_number)
+                records += 1
+    journal.close()
+    return records
+
+
+def time_recovery(directory: str) -> float:
+    started: float = time.perf_counter()
+    store: InMemoryGameStore = InMemoryGameStore(
+        Journal(directory),
+        snapshot_every=10 ** 9,
+    )
+    elapsed: float = time.perf_counter() - started
+    assert len(store.games) == NUM_GAMES
+    store.close()
+    return elapsed
+
+
+def main() -> None:
+    directory: str = tempfile.mkdtemp()
+    try:
+        records: int = write_log(directory)
+        log_bytes: int = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+        print(f'{NUM_GAMES} games, {records} records, {log_bytes} log bytes')
+        # Replays the whole log, then leaves a snapshot behind
+        print(f'recovery from log:      {time_recovery(directory):.1f} s')
+        print(f'recovery from snapshot: {time_recovery(directory):.1f} s')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import timeit
+from typing import List, Tuple
+
+from helpers import check_winner, check_winner_at
+
+
+BOARD_SHAPES: List[Tuple[int, int]] = [
+    (6, 7),
+    (16, 16),
+    (32, 32),
+    (64, 64),
+    (128, 128),
+]
+WIN_CONDITION: int = 4
+
+
+def build_board_without_winner(rows: int, columns: int) -> List[List[int]]:
+    # Runs of at most 2 in every direction, so both checks do their worst case
+    return [
+        [(col + row // 2) % 2 for col in range(columns)]
+        for row in range(rows)
+    ]
+
+
+def time_per_call_in_microseconds(statement: str, namespace: dict) -> float:
+    timer: timeit.Timer = timeit.Timer(statement, globals=namespace)
+    calls, seconds = timer.autorange()
+    return seconds / calls * 1_000_000
+
+
+def main() -> None:
+    print(
+        f'{"board":>10} {"check_winner (us)":>18} '
+        f'{"check_winner_at (us)":>21}'
+    )
+    for rows, columns in BOARD_SHAPES:
+        board: List[List[int]] = build_board_without_winner(rows, columns)
+        row: int = rows // 2
+        col: int = columns // 2
+        namespace: dict = {
+            'board': board,
+            'row': row,
+            'col': col,
+            'target': board[row][col],
+            'how_many': WIN_CONDITION,
+            'check_winner': check_winner,
+            'check_winner_at': check_winner_at,
+        }
+        full_scan: float = time_per_call_in_microseconds(
+            'check_winner(board, target, how_many)',
+            namespace,
+        )
+        around_last_move: float = time_per_call_in_microseconds(
+            'check_winner_at(board, target, how_many, row, col)',
+            namespace,
+        )
+        shape: str = f'{rows}x{columns}'
+        print(f'{shape:>10} {full_scan:>18.2f} {around_last_move:>21.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+from typing import Dict, List, Set, Tuple, Type, Union
+
+from winning_lines import LineCounters, WinningLines, get_winning_lines
+
+
+class ListBoard:
+    # Row 0 is the top of the board, -1 marks an empty cell
+    __slots__ = (
+        'rows',
+        'columns',
+        'win_condition',
+        'cells',
+        'row_index_of_lowest_empty_cell',
+        'winning_lines',
+        'line_counters',
+    )
+
+    def __init__(self, rows: int, columns: int, win_condition: int) -> None:
+        self.rows: int = rows
+        self.columns: int = columns
+        self.win_condition: int = win_condition
+        self.cells: List[List[int]] = [
+            [*ref] for ref in ([[-1] * columns] * rows)
+        ]
+        self.row_index_of_lowest_empty_cell: List[int] = [rows - 1] * columns
+        # Shared, read-only geometry for every board of this shape
+        self.winning_lines: WinningLines = get_winning_lines(
+            rows,
+            columns,
+            win_condition,
+        )
+        self.line_counters: LineCounters = LineCounters(self.winning_lines)
+
+    def is_column_full(self, column: int) -> bool:
+        return self.row_index_of_lowest_empty_cell[column] < 0
+
+    def is_full(self) -> bool:
+        return all(
+            row_index < 0
+            for row_index in self.row_index_of_lowest_empty_cell
+        )
+
+    def drop(self, column: int, player_index: int) -> int:
+        row_index_to_fill: int = self.row_index_of_lowest_empty_cell[column]
+        self.cells[row_index_to_fill][column] = player_index
+        self.row_index_of_lowest_empty_cell[column] -= 1
+        self.line_counters.add_token(
+            player_index,
+            row_index_to_fill * self.columns + column,
+        )
+        return row_index_to_fill
+
+    def is_winning_drop(
+        self,
+        player_index: int,
+        row: int,
+        column: int,
+    ) -> bool:
+        return self.line_counters.has_full_line_through(
+            player_index,
+            row * self.columns + column,
+        )
+
+    def can_still_win(self, player_index: int) -> bool:
+        return self.line_counters.can_still_win(player_index)
+
+    def open_threats(self, player_index: int) -> Set[Tuple[int, int]]:
+        # The empty cell of every line the player is one token short of
+        threats: Set[Tuple[int, int]] = set()
+        for line_id in self.line_counters.threat_lines[player_index]:
+            for cell in self.winning_lines.lines[line_id]:
+                row, column = divmod(cell, self.columns)
+                if self.cells[row][column] == -1:
+                    threats.add((row, column))
+        return threats
+
+
+class BitBoard:
+    # One int bitmask per player. Bits are laid out column by column, bottom
+    # to top, with one always-empty padding bit on top of every column so
+    # that vertical and diagonal shifts never wrap into the next column.
+    __slots__ = (
+        'rows',
+        'columns',
+        'win_condition',
+        'column_stride',
+        'shifts',
+        'playable_cells',
+        'masks',
+        'heights',
+        'tokens_dropped',
+    )
+
+    def __init__(self, rows: int, columns: int, win_condition: int) -> None:
+        self.rows: int = rows
+        self.columns: int = columns
+        self.win_condition: int = win_condition
+        self.column_stride: int = rows + 1
+        # Vertical, horizontal and both diagonals
+        self.shifts: List[int] = [
+            1,
+            self.column_stride,
+            self.column_stride + 1,
+            self.column_stride - 1,
+        ]
+        # Every bit but the padding ones: a full column repeated per column
+        bottom_of_each_column: int = (
+            ((1 << (self.column_stride * columns)) - 1)
+            // ((1 << self.column_stride) - 1)
+        )
+        self.playable_cells: int = bottom_of_each_column * ((1 << rows) - 1)
+        self.masks: List[int] = [0, 0]
+        self.heights: List[int] = [0] * columns
+        self.tokens_dropped: int = 0
+
+    def is_column_full(self, column: int) -> bool:
+        return self.heights[column] == self.rows
+
+    def is_full(self) -> bool:
+        return self.tokens_dropped == self.rows * self.columns
+
+    def drop(self, column: int, player_index: int) -> int:
+        height: int = self.heights[column]
+        self.masks[player_index] |= 1 << (column * self.column_stride + height)
+        self.heights[column] += 1
+        self.tokens_dropped += 1
+        # Same row numbering as ListBoard: row 0 is the top
+        return self.rows - 1 - height
+
+    def is_winning_drop(
+        self,
+        player_index: int,
+        row: int,
+        column: int,
+    ) -> bool:
+        # Shift-and-AND: after k-1 rounds a bit survives only where k tokens
+        # line up in that direction.
+        mask: int = self.masks[player_index]
+        for shift in self.shifts:
+            line: int = mask
+            for step in range(1, self.win_condition):
+                line &= mask >> (step * shift)
+                if not line:
+                    break
+            if line:
+                return True
+        return False
+
+    def can_still_win(self, player_index: int) -> bool:
+        # Same shift-and-AND as is_winning_drop, over every cell the other
+        # player has not taken
+        available: int = self.playable_cells & ~self.masks[1 - player_index]
+        for shift in self.shifts:
+            line: int = available
+            for step in range(1, self.win_condition):
+                line &= available >> (step * shift)
+                if not line:
+                    break
+            if line:
+                return True
+        return False
+
+    def open_threats(self, player_index: int) -> Set[Tuple[int, int]]:
+        # For every direction and every position of the gap within a line,
+        # AND together the other k-1 cells shifted onto the gap; empty cells
+        # left set are where the player would complete a line.
+        mask: int = self.masks[player_index]
+        empty: int = self.playable_cells & ~(self.masks[0] | self.masks[1])
+        winning_cells: int = 0
+        for shift in self.shifts:
+            for gap in range(self.win_condition):
+                line: int = empty
+                for step in range(self.win_condition):
+                    offset: int = (step - gap) * shift
+                    if offset > 0:
+                        line &= mask >> offset
+                    elif offset < 0:
+                        line &= mask << -offset
+                winning_cells |= line
+        threats: Set[Tuple[int, int]] = set()
+        while winning_cells:
+            lowest_bit: int = winning_cells & -winning_cells
+            column, height = divmod(
+                lowest_bit.bit_length() - 1,
+                self.column_stride,
+            )
+            threats.add((self.rows - 1 - height, column))
+            winning_cells ^= lowest_bit
+        return threats
+
+
+class SparseBoard:
+    # Only what has been played is stored: the height of every column that
+    # has a token and the owner of every filled cell, keyed by
+    # column * rows + height (height 0 being the bottom). Memory and time
+    # grow with the moves played, not with the area of the board.
+    __slots__ = (
+        'rows',
+        'columns',
+        'win_condition',
+        'heights',
+        'cells',
+    )
+
+    def __init__(self, rows: int, columns: int, win_condition: int) -> None:
+        self.rows: int = rows
+        self.columns: int = columns
+        self.win_condition: int = win_condition
+        self.heights: Dict[int, int] = {}
+        self.cells: Dict[int, int] = {}
+
+    def owner(self, column: int, height: int) -> int:
+        in_bounds: bool = (
+            0 <= column < self.columns and 0 <= height < self.rows
+        )
+        if not in_bounds:
+            return -1
+        return self.cells.get(column * self.rows + height, -1)
+
+    def is_column_full(self, column: int) -> bool:
+        return self.heights.get(column, 0) == self.rows
+
+    def is_full(self) -> bool:
+        return len(self.cells) == self.rows * self.columns
+
+    def drop(self, column: int, player_index: int) -> int:
+        height: int = self.heights.get(column, 0)
+        self.cells[column * self.rows + height] = player_index
+        self.heights[column] = height + 1
+        # Same row numbering as ListBoard: row 0 is the top
+        return self.rows - 1 - height
+
+    def is_winning_drop(
+        self,
+        player_index: int,
+        row: int,
+        column: int,
+    ) -> bool:
+        return self.completes_line(player_index, column, self.rows - 1 - row)
+
+    def completes_line(
+        self,
+        player_index: int,
+        column: int,
+        height: int,
+    ) -> bool:
+        # Same walk as helpers.check_winner_at, over the cell mapping. The
+        # cell itself is taken to be the player's.
+        directions: List[Tuple[int, int]] = [(1, 0), (0, 1), (1, 1), (1, -1)]
+        for col_step, height_step in directions:
+            in_a_row: int = 1
+            for sense in (1, -1):
+                c: int = column + sense * col_step
+                h: int = height + sense * height_step
+                while (
+                    in_a_row < self.win_condition
+                    and self.owner(c, h) == player_index
+                ):
+                    in_a_row += 1
+                    c += sense * col_step
+                    h += sense * height_step
+            if in_a_row >= self.win_condition:
+                return True
+        return False
+
+    def can_still_win(self, player_index: int) -> bool:
+        # Sparse boards are far larger than the moves played on them, so
+        # this only rules out shapes that cannot hold a line at all and
+        # otherwise leaves the draw to is_full.
+        return (
+            self.rows >= self.win_condition
+            or self.columns >= self.win_condition
+        )
+
+    def open_threats(self, player_index: int) -> Set[Tuple[int, int]]:
+        # Any cell completing a line lies within k-1 cells of one of the
+        # player's tokens along some direction, so only those are tried.
+        # With a win condition of 1 that misses the empty cells far from
+        # any token, but such a game ends on its first move anyway.
+        threats: Set[Tuple[int, int]] = set()
+        reach: int = self.win_condition - 1
+        directions: List[Tuple[int, int]] = [(1, 0), (0, 1), (1, 1), (1, -1)]
+        for cell, owner in self.cells.items():
+            if owner != player_index:
+                continue
+            column, height = divmod(cell, self.rows)
+            for col_step, height_step in directions:
+                for offset in range(-reach, reach + 1):
+                    c: int = column + offset * col_step
+                    h: int = height + offset * height_step
+                    is_empty_cell: bool = (
+                        0 <= c < self.columns
+                        and 0 <= h < self.rows
+                        and c * self.rows + h not in self.cells
+                    )
+                    if is_empty_cell and self.completes_line(
+                        player_index,
+                        c,
+                        h,
+                    ):
+                        threats.add((self.rows - 1 - h, c))
+        return threats
+
+
+Board = Union[ListBoard, BitBoard, SparseBoard]
+
+BOARD_ENGINES: Dict[str, Type[Board]] = {
+    'list': ListBoard,
+    'bitboard': BitBoard,
+}
+
+# Boards with more cells than this are sparse whatever the engine, since a
+# dense board (and the winning-line index a ListBoard shares) grows with
+# the area of the board.
+SPARSE_BOARD_THRESHOLD: int = 4096
+
+
+def make_board(
+    engine: str,
+    rows: int,
+    columns: int,
+    win_condition: int,
+) -> Board:
+    if engine not in BOARD_ENGINES:
+        raise ValueError(f'Unknown board engine {engine!r}.')
+    if rows * columns > SPARSE_BOARD_THRESHOLD:
+        return SparseBoard(rows, columns, win_condition)
+    return BOARD_ENGINES[engine](rows, columns, win_condition)
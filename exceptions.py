@@ -10,8 +10,17 @@ class FetchMoveException(Exception):
 class GameCompletedException(Exception):
     pass
 
+class GameNotFoundException(Exception):
+    pass
+
+class GameTooLargeException(Exception):
+    pass
+
 class IllegalTurnException(Exception):
     pass
 
 class PlayerNotFoundException(Exception):
     pass
+
+class StoreFullException(Exception):
+    pass
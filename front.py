@@ -0,0 +1,430 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple, Type
+from urllib.parse import urlencode, urlsplit
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.requests import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from hash_ring import HashRing
+from payload_schema import BatchMoves, GameIds, NewGames
+
+
+# Thin front for sharded mode. Games are spread over worker processes by
+# consistent hashing of their ID; each worker is a plain main:app owning
+# its shard, and this process only forwards requests to the right one.
+# Run `python front.py --shards N` to start the workers and the front.
+
+# Headers that only describe one hop, or that http.client and starlette
+# recompute themselves
+HOP_BY_HOP_HEADERS: List[str] = [
+    'connection',
+    'content-length',
+    'date',
+    'host',
+    'keep-alive',
+    'server',
+    'transfer-encoding',
+    'x-game-id',
+]
+
+# Every forwarded request holds one of the front's threads until the shard
+# answers, and bodies are read whole before they are passed on. So the
+# front cuts `wait` on the moves endpoint down to this many seconds, and
+# long-polling clients poll again sooner, rather than parked requests
+# using up the threads.
+FRONT_MAX_WAIT: float = float(os.environ.get('FRONT_MAX_WAIT', 1))
+# Longest a shard may take to answer, in seconds
+SHARD_TIMEOUT: float = 30
+
+ShardResponse = Tuple[int, List[Tuple[str, str]], bytes]
+
+
+class ShardClient:
+    # Forwards requests to the shard workers over keep-alive connections,
+    # one per thread and shard, since http.client connections are not
+    # thread-safe.
+    def __init__(self, shard_urls: List[str]) -> None:
+        self.ring: HashRing = HashRing(shard_urls)
+        self.local: threading.local = threading.local()
+
+    def connection(self, shard_url: str) -> http.client.HTTPConnection:
+        connections: Dict[str, http.client.HTTPConnection] = getattr(
+            self.local,
+            'connections',
+            None,
+        )
+        if connections is None:
+            connections = self.local.connections = {}
+        if shard_url not in connections:
+            netloc: str = urlsplit(shard_url).netloc
+            connections[shard_url] = http.client.HTTPConnection(
+                netloc,
+                timeout=SHARD_TIMEOUT,
+            )
+        return connections[shard_url]
+
+    def request(
+        self,
+        shard_url: str,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes = b'',
+    ) -> ShardResponse:
+        # One retry on a fresh connection, in case the kept-alive one was
+        # closed by the worker in the meantime
+        for attempt in range(2):
+            connection: http.client.HTTPConnection = self.connection(
+                shard_url,
+            )
+            try:
+                connection.request(method, path, body or None, headers)
+                response: http.client.HTTPResponse = connection.getresponse()
+                return (
+                    response.status,
+                    response.getheaders(),
+                    response.read(),
+                )
+            except socket.timeout:
+                # Not retried, since the shard may have acted on it
+                connection.close()
+                del self.local.connections[shard_url]
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail='Shard timed out.',
+                )
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                del self.local.connections[shard_url]
+                if attempt == 1:
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail='Shard unavailable.',
+                    )
+
+
+def forwarded_headers(request: Request) -> Dict[str, str]:
+    return {
+        name: value
+        for name, value in request.headers.items()
+        if name not in HOP_BY_HOP_HEADERS
+    }
+
+
+def capped_query(request: Request) -> str:
+    if 'wait' not in request.query_params:
+        return request.url.query
+    params: List[Tuple[str, str]] = []
+    for name, value in request.query_params.multi_items():
+        if name == 'wait':
+            try:
+                value = str(min(float(value), FRONT_MAX_WAIT))
+            except ValueError:
+                # Left for the shard to reject
+                pass
+        params.append((name, value))
+    return urlencode(params)
+
+
+def invalid_batch(error: ValidationError) -> Response:
+    # As a worker answers a body that fails validation
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={'detail': [
+            dict(detail, loc=('body',) + detail['loc'])
+            for detail in error.errors()
+        ]},
+    )
+
+
+def as_response(shard_response: ShardResponse) -> Response:
+    status_code, headers, body = shard_response
+    response: Response = Response(content=body, status_code=status_code)
+    for name, value in headers:
+        if name.lower() not in HOP_BY_HOP_HEADERS:
+            response.headers.append(name, value)
+    return response
+
+
+shards: Optional[ShardClient] = None
+app: FastAPI = FastAPI()
+
+@app.on_event('startup')
+def connect_to_shards():
+    global shards
+    shards = ShardClient(os.environ['SHARD_URLS'].split(','))
+
+@app.exception_handler(RequestValidationError)
+def override_fastapi_default_422_response_with_400_on_invalid_payloads(
+    request: Request,
+    exception: RequestValidationError,
+) -> None:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={'detail': exception.errors()},
+    )
+
+@app.get('/drop_token')
+async def get_all_in_progress_games(
+    request: Request,
+    limit: Optional[int] = Query(None, gt=0),
+    after: Optional[str] = None,
+) -> Response:
+    # Listed shard by shard, in SHARD_URLS order, so `after` resumes in the
+    # shard owning that game and then moves on to the following ones. Every
+    # shard is asked at once; at most `limit` from each is enough.
+    shard_urls: List[str] = shards.ring.shards
+    if after is not None:
+        first: int = shard_urls.index(shards.ring.shard_for(after))
+        shard_urls = shard_urls[first:]
+    headers: Dict[str, str] = forwarded_headers(request)
+    shard_responses: List[ShardResponse] = await asyncio.gather(*(
+        run_in_threadpool(
+            shards.request,
+            shard_url,
+            'GET',
+            '/drop_token?' + urlencode({
+                key: value
+                for key, value in (
+                    ('limit', limit),
+                    ('after', after if position == 0 else None),
+                )
+                if value is not None
+            }),
+            headers,
+        )
+        for position, shard_url in enumerate(shard_urls)
+    ))
+    ids_of_games_in_progress: List[str] = []
+    for shard_response in shard_responses:
+        if shard_response[0] != status.HTTP_200_OK:
+            return as_response(shard_response)
+        ids_of_games_in_progress += json.loads(shard_response[2])['games']
+    if limit is not None:
+        ids_of_games_in_progress = ids_of_games_in_progress[:limit]
+    payload: Dict[str, List[str]] = {'games': ids_of_games_in_progress}
+    return JSONResponse(content=payload)
+
+@app.post('/drop_token')
+async def create_new_game(request: Request) -> Response:
+    # The ID is picked here so the game lands on the shard it hashes to
+    game_id: str = str(uuid.uuid4())
+    headers: Dict[str, str] = forwarded_headers(request)
+    headers['x-game-id'] = game_id
+    return as_response(await run_in_threadpool(
+        shards.request,
+        shards.ring.shard_for(game_id),
+        'POST',
+        '/drop_token',
+        headers,
+        await request.body(),
+    ))
+
+async def scatter(
+    request: Request,
+    path: str,
+    field: str,
+    batch_model: Type[BaseModel],
+) -> Response:
+    # Splits a batch by the shard of each item's game, sends every shard
+    # its part at once and puts the results back in the original order.
+    # Items of one game keep their order, since they go to one shard.
+    body: bytes = await request.body()
+    try:
+        # Checked here, so that no shard applies part of a bad batch
+        batch_model.parse_raw(body)
+    except ValidationError as error:
+        return invalid_batch(error)
+    headers: Dict[str, str] = forwarded_headers(request)
+    items: list = json.loads(body)[field]
+    indexes_by_shard: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        game_id: str = item['gameId'] if isinstance(item, dict) else item
+        indexes_by_shard.setdefault(
+            shards.ring.shard_for(game_id),
+            [],
+        ).append(index)
+    shard_responses: List[ShardResponse] = await asyncio.gather(*(
+        run_in_threadpool(
+            shards.request,
+            shard_url,
+            'POST',
+            path,
+            headers,
+            json.dumps({field: [items[index] for index in indexes]}).encode(),
+        )
+        for shard_url, indexes in indexes_by_shard.items()
+    ))
+    results: list = [None] * len(items)
+    for indexes, shard_response in zip(
+        indexes_by_shard.values(),
+        shard_responses,
+    ):
+        if shard_response[0] != status.HTTP_200_OK:
+            return as_response(shard_response)
+        shard_results: list = json.loads(shard_response[2])['results']
+        for index, result in zip(indexes, shard_results):
+            results[index] = result
+    return JSONResponse(content={'results': results})
+
+@app.post('/drop_token/batch/games')
+async def create_new_games(request: Request) -> Response:
+    # Like create_new_game, the IDs are picked here and each shard is sent
+    # the games that hash to it
+    body: bytes = await request.body()
+    headers: Dict[str, str] = forwarded_headers(request)
+    try:
+        # Checked here, so that no shard creates games from a bad batch
+        NewGames.parse_raw(body)
+    except ValidationError as error:
+        return invalid_batch(error)
+    new_games: list = json.loads(body)['games']
+    game_ids: List[str] = [str(uuid.uuid4()) for _ in new_games]
+    indexes_by_shard: Dict[str, List[int]] = {}
+    for index, game_id in enumerate(game_ids):
+        indexes_by_shard.setdefault(
+            shards.ring.shard_for(game_id),
+            [],
+        ).append(index)
+    shard_responses: List[ShardResponse] = await asyncio.gather(*(
+        run_in_threadpool(
+            shards.request,
+            shard_url,
+            'POST',
+            '/drop_token/batch/games',
+            headers,
+            json.dumps({
+                'games': [new_games[index] for index in indexes],
+                'gameIds': [game_ids[index] for index in indexes],
+            }).encode(),
+        )
+        for shard_url, indexes in indexes_by_shard.items()
+    ))
+    for shard_response in shard_responses:
+        if shard_response[0] != status.HTTP_200_OK:
+            return as_response(shard_response)
+    payload: Dict[str, List[str]] = {'gameIds': game_ids}
+    return JSONResponse(content=payload)
+
+@app.post('/drop_token/batch/moves')
+async def make_moves(request: Request) -> Response:
+    return await scatter(
+        request,
+        '/drop_token/batch/moves',
+        'moves',
+        BatchMoves,
+    )
+
+@app.post('/drop_token/batch/status')
+async def get_games(request: Request) -> Response:
+    return await scatter(
+        request,
+        '/drop_token/batch/status',
+        'gameIds',
+        GameIds,
+    )
+
+@app.get('/drop_token/events')
+def follow_lobby() -> None:
+    # Every worker only streams its own games
+    raise HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail='Lobby events are not available in sharded mode.',
+    )
+
+@app.api_route('/drop_token/{game_id}', methods=['GET'])
+@app.api_route('/drop_token/{game_id}/{rest:path}', methods=[
+    'GET',
+    'POST',
+    'DELETE',
+])
+async def forward_to_shard(request: Request, game_id: str) -> Response:
+    path: str = request.url.path
+    query: str = capped_query(request)
+    if query:
+        path += f'?{query}'
+    return as_response(await run_in_threadpool(
+        shards.request,
+        shards.ring.shard_for(game_id),
+        request.method,
+        path,
+        forwarded_headers(request),
+        await request.body(),
+    ))
+
+
+def start_workers(
+    count: int,
+    base_port: int,
+) -> Tuple[List[str], List[subprocess.Popen]]:
+    shard_urls: List[str] = []
+    workers: List[subprocess.Popen] = []
+    for shard in range(count):
+        port: int = base_port + shard
+        env: Dict[str, str] = dict(os.environ, SHARD_WORKER='1')
+        for variable in ('JOURNAL_DIR', 'ARCHIVE_DIR'):
+            if variable in os.environ:
+                env[variable] = os.path.join(
+                    os.environ[variable],
+                    f'shard-{shard}',
+                )
+        workers.append(subprocess.Popen(
+            [
+                sys.executable,
+                '-m',
+                'uvicorn',
+                '--host=127.0.0.1',
+                f'--port={port}',
+                'main:app',
+            ],
+            env=env,
+        ))
+        shard_urls.append(f'http://127.0.0.1:{port}')
+    return shard_urls, workers
+
+
+def wait_until_listening(port: int, timeout: float = 30) -> None:
+    deadline: float = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--shards', type=int, default=os.cpu_count())
+    parser.add_argument('--shard-base-port', type=int, default=9000)
+    args: argparse.Namespace = parser.parse_args()
+    shard_urls, workers = start_workers(args.shards, args.shard_base_port)
+    os.environ['SHARD_URLS'] = ','.join(shard_urls)
+    try:
+        for shard in range(args.shards):
+            wait_until_listening(args.shard_base_port + shard)
+        uvicorn.run(app, host=args.host, port=args.port)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
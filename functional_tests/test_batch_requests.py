@@ -0,0 +1,93 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+from requests.models import Response
+
+from main import app
+
+
+def test_batch_moves_are_answered_item_by_item():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        batch_res: Response = test_client.post(
+            '/drop_token/batch/moves',
+            json={
+                'moves': [
+                    {'gameId': game_id, 'playerId': 'foo', 'column': 0},
+                    {'gameId': game_id, 'playerId': 'foo', 'column': 1},
+                    {'gameId': game_id, 'playerId': 'bar', 'column': 4},
+                    {'gameId': game_id, 'playerId': 'bar', 'column': 1},
+                    {'gameId': game_id, 'playerId': 'baz', 'column': 1},
+                    {'gameId': 'foobar', 'playerId': 'foo', 'column': 1},
+                    {'gameId': game_id, 'playerId': 'foo', 'type': 'QUIT'},
+                    {'gameId': game_id, 'playerId': 'bar', 'type': 'QUIT'},
+                    {'gameId': game_id, 'playerId': 'bar', 'column': 2},
+                ],
+            },
+        )
+        assert batch_res.status_code == status.HTTP_200_OK
+        assert batch_res.json() == {
+            'results': [
+                {'status': 200, 'move': f'{game_id}/moves/0'},
+                {
+                    'status': 409,
+                    'detail': 'Wait for other player to make a move.',
+                },
+                {'status': 400, 'detail': 'Column out of bounds.'},
+                {'status': 200, 'move': f'{game_id}/moves/1'},
+                {'status': 404, 'detail': 'Player not found.'},
+                {'status': 404, 'detail': 'Game not found.'},
+                {'status': 202},
+                {'status': 410, 'detail': 'Game is done.'},
+                {'status': 400, 'detail': 'Game is done.'},
+            ],
+        }
+
+def test_batch_moves_with_invalid_items():
+    with TestClient(app) as test_client:
+        for moves in (
+            [{'gameId': 'foobar', 'playerId': 'foo'}],
+            [{'gameId': 'foobar', 'playerId': 'foo', 'type': 'JUMP'}],
+            [{'gameId': 'foobar', 'playerId': 'foo', 'column': 0}] * 1001,
+        ):
+            batch_res: Response = test_client.post(
+                '/drop_token/batch/moves',
+                json={'moves': moves},
+            )
+            assert batch_res.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_batch_status():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.delete(f'/drop_token/{game_id}/bar')
+        batch_res: Response = test_client.post(
+            '/drop_token/batch/status',
+            json={'gameIds': [game_id, 'foobar']},
+        )
+        assert batch_res.status_code == status.HTTP_200_OK
+        assert batch_res.json() == {
+            'results': [
+                {
+                    'status': 200,
+                    'players': ['foo', 'bar'],
+                    'state': 'DONE',
+                    'winner': 'foo',
+                },
+                {'status': 404, 'detail': 'Game not found.'},
+            ],
+        }
@@ -1,10 +1,14 @@
 import re
-from typing import Callable
+import uuid
+from typing import Callable, List
 
 from fastapi import status
 from fastapi.testclient import TestClient
 from requests.models import Response
 
+import main
+from game_store import InMemoryGameStore
+from journal import Journal
 from main import app
 
 
@@ -110,3 +114,64 @@ def test_create_game_invalid_dimensions():
                 },
             ]
         }
+
+def test_create_games_in_bulk():
+    with TestClient(app) as test_client:
+        create_games_res: Response = test_client.post(
+            '/drop_token/batch/games',
+            json={
+                'games': [
+                    {'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+                    {'players': ['baz', 'qux'], 'columns': 7, 'rows': 6},
+                ],
+            },
+        )
+        assert create_games_res.status_code == status.HTTP_200_OK
+        game_ids: List[str] = create_games_res.json()['gameIds']
+        assert len(set(game_ids)) == 2
+        assert all(uuid.UUID(game_id).version == 4 for game_id in game_ids)
+        get_game_res: Response = test_client.get(f'/drop_token/{game_ids[1]}')
+        assert get_game_res.json() == {
+            'players': ['baz', 'qux'],
+            'state': 'IN_PROGRESS',
+        }
+        assert test_client.get('/drop_token').json() == {'games': game_ids}
+
+def test_create_games_in_bulk_with_an_invalid_game():
+    with TestClient(app) as test_client:
+        create_games_res: Response = test_client.post(
+            '/drop_token/batch/games',
+            json={
+                'games': [
+                    {'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+                    {'players': ['foo', 'foo'], 'columns': 4, 'rows': 4},
+                ],
+            },
+        )
+        assert create_games_res.status_code == status.HTTP_400_BAD_REQUEST
+        assert test_client.get('/drop_token').json() == {'games': []}
+
+def test_create_game_that_does_not_fit_the_journal(monkeypatch, tmp_path):
+    store: InMemoryGameStore = InMemoryGameStore(Journal(str(tmp_path)))
+    monkeypatch.setattr(main, 'games', store)
+    with TestClient(app) as test_client:
+        too_many_rows_res: Response = test_client.post(
+            '/drop_token',
+            json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 2 ** 64},
+        )
+        assert too_many_rows_res.status_code == status.HTTP_400_BAD_REQUEST
+        long_name_res: Response = test_client.post(
+            '/drop_token/batch/games',
+            json={
+                'games': [
+                    {'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+                    {
+                        'players': ['foo', 'b' * 65536],
+                        'columns': 4,
+                        'rows': 4,
+                    },
+                ],
+            },
+        )
+        assert long_name_res.status_code == status.HTTP_400_BAD_REQUEST
+        assert test_client.get('/drop_token').json() == {'games': []}
@@ -1,3 +1,5 @@
+from typing import List
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from requests.models import Response
@@ -116,3 +118,51 @@ def test_get_games_after_one_is_created_and_after_a_player_wins():
         get_games_res_2: Response = test_client.get('/drop_token')
         assert get_games_res_2.status_code == status.HTTP_200_OK
         assert get_games_res_2.json() == {'games': []}
+
+def test_get_games_paginated_with_limit_and_after():
+    with TestClient(app) as test_client:
+        game_ids: List[str] = [
+            test_client.post(
+                '/drop_token',
+                json={
+                    'players': ['foo', 'bar'],
+                    'columns': 4,
+                    'rows': 4,
+                },
+            ).json()['gameId']
+            for _ in range(5)
+        ]
+        test_client.delete(f'/drop_token/{game_ids[1]}/foo')
+        first_page_res: Response = test_client.get(
+            '/drop_token',
+            params={'limit': 2},
+        )
+        assert first_page_res.status_code == status.HTTP_200_OK
+        assert first_page_res.json() == {'games': [game_ids[0], game_ids[2]]}
+        second_page_res: Response = test_client.get(
+            '/drop_token',
+            params={'limit': 2, 'after': game_ids[2]},
+        )
+        assert second_page_res.status_code == status.HTTP_200_OK
+        assert second_page_res.json() == {'games': [game_ids[3], game_ids[4]]}
+        after_finished_game_res: Response = test_client.get(
+            '/drop_token',
+            params={'after': game_ids[1]},
+        )
+        assert after_finished_game_res.json() == {
+            'games': [game_ids[2], game_ids[3], game_ids[4]],
+        }
+
+def test_get_games_after_nonexistent_game():
+    with TestClient(app) as test_client:
+        res: Response = test_client.get(
+            '/drop_token',
+            params={'after': 'doesnt-exist'},
+        )
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+        assert res.json() == {'detail': 'Game not found.'}
+
+def test_get_games_with_non_positive_limit():
+    with TestClient(app) as test_client:
+        res: Response = test_client.get('/drop_token', params={'limit': 0})
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
@@ -2,6 +2,9 @@ from fastapi import status
 from fastapi.testclient import TestClient
 from requests.models import Response
 
+import main
+from game_archive import GameArchive
+from game_store import InMemoryGameStore
 from main import app
 
 
@@ -137,3 +140,77 @@ def test_get_game_with_a_winner():
             'state': 'DONE',
             'winner': 'bar',
         }
+
+def test_get_game_is_not_modified_until_a_move_is_made():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        get_game_res: Response = test_client.get(f'/drop_token/{game_id}')
+        etag: str = get_game_res.headers['etag']
+        not_modified_res: Response = test_client.get(
+            f'/drop_token/{game_id}',
+            headers={'If-None-Match': etag},
+        )
+        assert not_modified_res.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified_res.headers['etag'] == etag
+        assert not_modified_res.content == b''
+        test_client.delete(f'/drop_token/{game_id}/foo')
+        modified_res: Response = test_client.get(
+            f'/drop_token/{game_id}',
+            headers={'If-None-Match': etag},
+        )
+        assert modified_res.status_code == status.HTTP_200_OK
+        assert modified_res.headers['etag'] != etag
+        assert modified_res.json() == {
+            'players': ['foo', 'bar'],
+            'state': 'DONE',
+            'winner': 'bar',
+        }
+
+def test_get_game_that_was_archived(monkeypatch, tmp_path):
+    store: InMemoryGameStore = InMemoryGameStore(
+        archive=GameArchive(str(tmp_path)),
+    )
+    monkeypatch.setattr(main, 'games', store)
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 1})
+        test_client.delete(f'/drop_token/{game_id}/bar')
+        assert store.archive_finished(store.finished[game_id] + 3601) == 1
+        assert game_id not in store.games
+        get_game_res: Response = test_client.get(f'/drop_token/{game_id}')
+        assert get_game_res.status_code == status.HTTP_200_OK
+        assert get_game_res.json() == {
+            'players': ['foo', 'bar'],
+            'state': 'DONE',
+            'winner': 'foo',
+        }
+        get_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+        )
+        assert get_moves_res.json() == {
+            'moves': [
+                {'type': 'MOVE', 'player': 'foo', 'column': 1},
+                {'type': 'QUIT', 'player': 'bar'},
+            ],
+        }
+        move_res: Response = test_client.post(
+            f'/drop_token/{game_id}/foo',
+            json={'column': 2},
+        )
+        assert move_res.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,8 +1,16 @@
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
 from fastapi import status
 from fastapi.testclient import TestClient
 from requests.models import Response
 
+import main
+from move_log import MoveLog
 from main import app
+from response_cache import ResponseCache
 
 
 def test_get_moves_on_nonexistent_game():
@@ -122,6 +130,67 @@ def test_get_moves_with_start_and_until_query_params():
             ],
         }
 
+def test_get_moves_body_is_compact_json():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'b\u00e4r'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        test_client.delete(f'/drop_token/{game_id}/b\u00e4r')
+        get_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+        )
+        assert get_moves_res.status_code == status.HTTP_200_OK
+        assert get_moves_res.headers['content-type'] == 'application/json'
+        assert get_moves_res.content == (
+            '{"moves":[{"type":"MOVE","player":"foo","column":3},'
+            '{"type":"QUIT","player":"b\u00e4r"}]}'
+        ).encode('utf-8')
+
+def test_get_moves_streams_long_ranges_in_chunks(monkeypatch):
+    monkeypatch.setattr(main, 'MOVES_PER_CHUNK', 2)
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        test_client.post(f'/drop_token/{game_id}/bar', json={'column': 2})
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 0})
+        test_client.post(f'/drop_token/{game_id}/bar', json={'column': 1})
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        get_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'start': 1},
+        )
+        assert get_moves_res.status_code == status.HTTP_200_OK
+        assert 'content-length' not in get_moves_res.headers
+        assert get_moves_res.headers['etag'] == '"5-IN_PROGRESS"'
+        assert get_moves_res.content == (
+            b'{"moves":[{"type":"MOVE","player":"bar","column":2},'
+            b'{"type":"MOVE","player":"foo","column":0},'
+            b'{"type":"MOVE","player":"bar","column":1},'
+            b'{"type":"MOVE","player":"foo","column":3}]}'
+        )
+        short_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'start': 3},
+        )
+        assert short_res.headers['content-length'] == str(
+            len(short_res.content),
+        )
+
 def test_get_moves_with_start_equal_until():
     with TestClient(app) as test_client:
         create_game_res: Response = test_client.post(
@@ -243,3 +312,290 @@ def test_get_moves_unprocessable_query_params():
                 },
             ],
         }
+
+def test_get_moves_is_not_modified_until_a_move_is_made():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        get_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+        )
+        etag: str = get_moves_res.headers['etag']
+        not_modified_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            headers={'If-None-Match': f'"stale", W/{etag}'},
+        )
+        assert not_modified_res.status_code == status.HTTP_304_NOT_MODIFIED
+        test_client.post(f'/drop_token/{game_id}/bar', json={'column': 2})
+        modified_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            headers={'If-None-Match': etag},
+        )
+        assert modified_res.status_code == status.HTTP_200_OK
+        assert modified_res.json() == {
+            'moves': [
+                {'type': 'MOVE', 'player': 'foo', 'column': 3},
+                {'type': 'MOVE', 'player': 'bar', 'column': 2},
+            ],
+        }
+
+def test_get_moves_after_waits_for_the_next_move():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        with ThreadPoolExecutor(1) as executor:
+            waiting: Future = executor.submit(
+                test_client.get,
+                f'/drop_token/{game_id}/moves',
+                params={'after': 0, 'wait': 30},
+            )
+            time.sleep(0.2)
+            assert not waiting.done()
+            started: float = time.monotonic()
+            test_client.post(f'/drop_token/{game_id}/bar', json={'column': 2})
+            get_moves_res: Response = waiting.result(timeout=5)
+        assert time.monotonic() - started < 1
+        assert get_moves_res.status_code == status.HTTP_200_OK
+        assert get_moves_res.json() == {
+            'moves': [{'type': 'MOVE', 'player': 'bar', 'column': 2}],
+        }
+
+def test_get_moves_after_returns_at_once_if_there_are_moves_or_game_is_done():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        get_moves_res_1: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': -1, 'wait': 30},
+        )
+        assert get_moves_res_1.json() == {
+            'moves': [{'type': 'MOVE', 'player': 'foo', 'column': 3}],
+        }
+        test_client.delete(f'/drop_token/{game_id}/foo')
+        get_moves_res_2: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': 1, 'wait': 30},
+        )
+        assert get_moves_res_2.status_code == status.HTTP_200_OK
+        assert get_moves_res_2.json() == {'moves': []}
+
+def test_get_moves_after_times_out_with_no_moves():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        get_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': -1, 'wait': 0.1},
+        )
+        assert get_moves_res.status_code == status.HTTP_200_OK
+        assert get_moves_res.json() == {'moves': []}
+        bad_query_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': -1, 'start': 0},
+        )
+        assert bad_query_res.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_finished_game_is_served_from_the_response_cache(monkeypatch):
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        test_client.post(f'/drop_token/{game_id}/bar', json={'column': 2})
+        test_client.delete(f'/drop_token/{game_id}/foo')
+        first_res: Response = test_client.get(f'/drop_token/{game_id}')
+
+        def no_store_reads(game_id: str) -> None:
+            raise AssertionError('The store was read.')
+
+        monkeypatch.setattr(main.games, 'get', no_store_reads)
+        game_res: Response = test_client.get(f'/drop_token/{game_id}')
+        assert game_res.content == first_res.content
+        assert game_res.json() == {
+            'players': ['foo', 'bar'],
+            'state': 'DONE',
+            'winner': 'bar',
+        }
+        assert game_res.headers['etag'] == '"3-DONE"'
+        moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': 0, 'wait': 5},
+        )
+        assert moves_res.json() == {
+            'moves': [
+                {'type': 'MOVE', 'player': 'bar', 'column': 2},
+                {'type': 'QUIT', 'player': 'foo'},
+            ],
+        }
+        all_moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            headers={'If-None-Match': '"3-DONE"'},
+        )
+        assert all_moves_res.status_code == status.HTTP_304_NOT_MODIFIED
+        move_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves/0',
+        )
+        assert move_res.json() == {
+            'type': 'MOVE',
+            'player': 'foo',
+            'column': 3,
+        }
+        bad_move_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves/3',
+        )
+        assert bad_move_res.status_code == status.HTTP_404_NOT_FOUND
+
+def test_finished_game_bigger_than_the_response_cache(monkeypatch):
+    monkeypatch.setattr(main, 'response_cache', ResponseCache(512))
+
+    def no_freezing(*args: object) -> None:
+        raise AssertionError('The game was frozen.')
+
+    monkeypatch.setattr(main, 'FrozenGame', no_freezing)
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 8,
+                'rows': 8,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        columns: List[int] = [0, 1, 2, 3, 4, 5, 6, 7] * 2
+        for move_number, column in enumerate(columns):
+            player: str = ('foo', 'bar')[move_number % 2]
+            test_client.post(
+                f'/drop_token/{game_id}/{player}',
+                json={'column': column},
+            )
+        test_client.delete(f'/drop_token/{game_id}/foo')
+        for _ in range(2):
+            game_res: Response = test_client.get(f'/drop_token/{game_id}')
+            assert game_res.json() == {
+                'players': ['foo', 'bar'],
+                'state': 'DONE',
+                'winner': 'bar',
+            }
+            moves_res: Response = test_client.get(
+                f'/drop_token/{game_id}/moves',
+            )
+            assert moves_res.headers['etag'] == '"17-DONE"'
+            assert len(moves_res.json()['moves']) == 17
+            move_res: Response = test_client.get(
+                f'/drop_token/{game_id}/moves/16',
+            )
+            assert move_res.json() == {'type': 'QUIT', 'player': 'foo'}
+        assert main.response_cache.entries == {}
+
+def test_reading_a_game_without_moves_makes_no_move_log(
+    monkeypatch,
+    tmp_path,
+):
+    monkeypatch.setenv('MOVE_LOG_DIR', str(tmp_path))
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        moves_res: Response = test_client.get(f'/drop_token/{game_id}/moves')
+        assert moves_res.status_code == status.HTTP_404_NOT_FOUND
+        after_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': -1},
+        )
+        assert after_res.json() == {'moves': []}
+        move_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves/0',
+        )
+        assert move_res.status_code == status.HTTP_404_NOT_FOUND
+        assert list(tmp_path.iterdir()) == []
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 1})
+        assert [path.name for path in tmp_path.iterdir()] == [
+            f'{game_id}.moves',
+        ]
+
+def test_moves_are_read_off_the_event_loop(monkeypatch):
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 1})
+        get_range_json: Callable[[MoveLog, int, int], bytes] = (
+            MoveLog.get_range_json
+        )
+        on_event_loop: List[bool] = []
+
+        def recording_get_range_json(
+            move_log: MoveLog,
+            start: int,
+            end: int,
+        ) -> bytes:
+            try:
+                asyncio.get_running_loop()
+                on_event_loop.append(True)
+            except RuntimeError:
+                on_event_loop.append(False)
+            return get_range_json(move_log, start, end)
+
+        monkeypatch.setattr(
+            MoveLog,
+            'get_range_json',
+            recording_get_range_json,
+        )
+        for params in ({}, {'after': 0, 'wait': 0.2}):
+            test_client.get(f'/drop_token/{game_id}/moves', params=params)
+        test_client.post(f'/drop_token/{game_id}/bar', json={'column': 1})
+        test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': 0, 'wait': 1},
+        )
+        assert on_event_loop and not any(on_event_loop)
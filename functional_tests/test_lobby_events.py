@@ -0,0 +1,100 @@
+import json
+import socket
+import subprocess
+import sys
+from typing import Dict, Iterator, List
+
+import pytest
+import requests
+from fastapi import status
+from requests.models import Response
+
+from front import wait_until_listening
+
+
+# A real server, since the test client only returns a response once the
+# stream has ended
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@pytest.fixture(scope='module')
+def base_url() -> Iterator[str]:
+    port: int = free_port()
+    server: subprocess.Popen = subprocess.Popen([
+        sys.executable,
+        '-m',
+        'uvicorn',
+        '--host=127.0.0.1',
+        f'--port={port}',
+        'main:app',
+    ])
+    try:
+        wait_until_listening(port)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.terminate()
+        server.wait()
+
+def read_event(lines: Iterator[str]) -> Dict[str, str]:
+    event: Dict[str, str] = {}
+    for line in lines:
+        if not line:
+            return event
+        field, _, value = line.partition(': ')
+        event[field] = value
+
+def test_lobby_events(base_url):
+    first_game_id: str = requests.post(
+        f'{base_url}/drop_token',
+        json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+    ).json()['gameId']
+    with requests.get(
+        f'{base_url}/drop_token/events',
+        stream=True,
+        timeout=10,
+    ) as stream:
+        assert stream.status_code == status.HTTP_200_OK
+        assert stream.headers['content-type'].startswith('text/event-stream')
+        lines: Iterator[str] = stream.iter_lines(decode_unicode=True)
+        assert read_event(lines) == {
+            'event': 'snapshot',
+            'data': f'{{"games":["{first_game_id}"]}}',
+        }
+        second_game_id: str = requests.post(
+            f'{base_url}/drop_token',
+            json={'players': ['baz', 'qux'], 'columns': 1, 'rows': 1},
+        ).json()['gameId']
+        created: Dict[str, str] = read_event(lines)
+        assert created['event'] == 'game-created'
+        assert json.loads(created['data']) == {
+            'gameId': second_game_id,
+            'players': ['baz', 'qux'],
+        }
+        move_res: Response = requests.post(
+            f'{base_url}/drop_token/{second_game_id}/baz',
+            json={'column': 0},
+        )
+        assert move_res.status_code == status.HTTP_200_OK
+        finished: Dict[str, str] = read_event(lines)
+        assert finished['event'] == 'game-finished'
+        assert json.loads(finished['data']) == {
+            'gameId': second_game_id,
+            'winner': None,
+        }
+        requests.delete(f'{base_url}/drop_token/{first_game_id}/foo')
+        events: List[Dict[str, str]] = [read_event(lines), read_event(lines)]
+        assert [event['event'] for event in events] == [
+            'player-quit',
+            'game-finished',
+        ]
+        assert json.loads(events[0]['data']) == {
+            'gameId': first_game_id,
+            'player': 'foo',
+        }
+        assert json.loads(events[1]['data']) == {
+            'gameId': first_game_id,
+            'winner': 'bar',
+        }
@@ -220,3 +220,35 @@ def test_post_move_success():
         assert first_move_res.json() == {'move': f'{game_id}/moves/0'}
         assert second_move_res.status_code == status.HTTP_200_OK
         assert second_move_res.json() == {'move': f'{game_id}/moves/1'}
+
+def test_post_move_on_very_large_board():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 100000,
+                'rows': 100000,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        for column in (99996, 99997, 99998):
+            test_client.post(
+                f'/drop_token/{game_id}/foo',
+                json={'column': column},
+            )
+            test_client.post(
+                f'/drop_token/{game_id}/bar',
+                json={'column': column},
+            )
+        winning_move_res: Response = test_client.post(
+            f'/drop_token/{game_id}/foo',
+            json={'column': 99999},
+        )
+        assert winning_move_res.status_code == status.HTTP_200_OK
+        get_game_res: Response = test_client.get(f'/drop_token/{game_id}')
+        assert get_game_res.json() == {
+            'players': ['foo', 'bar'],
+            'state': 'DONE',
+            'winner': 'foo',
+        }
@@ -0,0 +1,215 @@
+import socket
+import time
+from typing import Dict, Iterator, List
+
+import pytest
+import requests
+from fastapi import status
+from fastapi.testclient import TestClient
+from requests.models import Response
+
+import front as front_module
+from front import app, start_workers, wait_until_listening
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@pytest.fixture(scope='module')
+def shard_urls() -> Iterator[List[str]]:
+    base_port: int = free_port()
+    urls, workers = start_workers(2, base_port)
+    try:
+        for shard in range(2):
+            wait_until_listening(base_port + shard)
+        yield urls
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+@pytest.fixture
+def front(shard_urls, monkeypatch) -> Iterator[TestClient]:
+    monkeypatch.setenv('SHARD_URLS', ','.join(shard_urls))
+    with TestClient(app) as test_client:
+        yield test_client
+
+def test_games_are_spread_over_shards_and_listed_together(front):
+    game_ids: List[str] = [
+        front.post(
+            '/drop_token',
+            json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+        ).json()['gameId']
+        for _ in range(20)
+    ]
+    res: Response = front.get('/drop_token')
+    assert res.status_code == status.HTTP_200_OK
+    listed: List[str] = res.json()['games']
+    assert sorted(listed) == sorted(game_ids)
+    page_1: List[str] = front.get(
+        '/drop_token',
+        params={'limit': 7},
+    ).json()['games']
+    page_2: List[str] = front.get(
+        '/drop_token',
+        params={'after': page_1[-1]},
+    ).json()['games']
+    assert page_1 + page_2 == listed
+
+def test_game_requests_reach_the_owning_shard(front):
+    game_id: str = front.post(
+        '/drop_token',
+        json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+    ).json()['gameId']
+    move_res: Response = front.post(
+        f'/drop_token/{game_id}/foo',
+        json={'column': 0},
+    )
+    assert move_res.status_code == status.HTTP_200_OK
+    assert move_res.json() == {'move': f'{game_id}/moves/0'}
+    assert front.get(f'/drop_token/{game_id}').json() == {
+        'players': ['foo', 'bar'],
+        'state': 'IN_PROGRESS',
+    }
+    assert front.get(f'/drop_token/{game_id}/moves/0').json() == {
+        'type': 'MOVE',
+        'player': 'foo',
+        'column': 0,
+    }
+    assert front.post(
+        f'/drop_token/{game_id}/foo',
+        json={'column': 0},
+    ).status_code == status.HTTP_409_CONFLICT
+    quit_res: Response = front.delete(f'/drop_token/{game_id}/bar')
+    assert quit_res.status_code == status.HTTP_202_ACCEPTED
+    missing_res: Response = front.get('/drop_token/not-a-game')
+    assert missing_res.status_code == status.HTTP_404_NOT_FOUND
+
+def test_batches_are_split_between_shards(front):
+    game_ids: List[str] = [
+        front.post(
+            '/drop_token',
+            json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+        ).json()['gameId']
+        for _ in range(6)
+    ]
+    moves_res: Response = front.post(
+        '/drop_token/batch/moves',
+        json={
+            'moves': [
+                {'gameId': game_id, 'playerId': player, 'column': 0}
+                for game_id in game_ids
+                for player in ('foo', 'bar')
+            ],
+        },
+    )
+    assert moves_res.status_code == status.HTTP_200_OK
+    assert moves_res.json() == {
+        'results': [
+            {'status': 200, 'move': f'{game_id}/moves/{move_number}'}
+            for game_id in game_ids
+            for move_number in (0, 1)
+        ],
+    }
+    status_res: Response = front.post(
+        '/drop_token/batch/status',
+        json={'gameIds': game_ids[::-1]},
+    )
+    statuses: List[int] = [
+        result['status'] for result in status_res.json()['results']
+    ]
+    assert statuses == [200] * 6
+    invalid_res: Response = front.post(
+        '/drop_token/batch/status',
+        json={'gameIds': 'nope'},
+    )
+    assert invalid_res.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_invalid_batches_reach_no_shard(front, shard_urls):
+    game_ids: List[str] = [
+        front.post(
+            '/drop_token',
+            json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+        ).json()['gameId']
+        for _ in range(6)
+    ]
+    batch: Dict[str, list] = {
+        'moves': [
+            {'gameId': game_id, 'playerId': 'foo', 'column': 0}
+            for game_id in game_ids
+        ] + [{'gameId': game_ids[0], 'playerId': 'bar'}],
+    }
+    invalid_res: Response = front.post('/drop_token/batch/moves', json=batch)
+    assert invalid_res.status_code == status.HTTP_400_BAD_REQUEST
+    worker_res: requests.Response = requests.post(
+        f'{shard_urls[0]}/drop_token/batch/moves',
+        json=batch,
+    )
+    assert invalid_res.json() == worker_res.json()
+    too_long_res: Response = front.post(
+        '/drop_token/batch/moves',
+        json={'moves': batch['moves'][:1] * 1001},
+    )
+    assert too_long_res.status_code == status.HTTP_400_BAD_REQUEST
+    for game_id in game_ids:
+        moves_res: Response = front.get(f'/drop_token/{game_id}/moves')
+        assert moves_res.status_code == status.HTTP_404_NOT_FOUND
+        assert moves_res.json() == {'detail': 'Invalid range.'}
+
+def test_bulk_created_games_land_on_their_shards(front):
+    create_games_res: Response = front.post(
+        '/drop_token/batch/games',
+        json={
+            'games': [
+                {'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+            ] * 10,
+        },
+    )
+    assert create_games_res.status_code == status.HTTP_200_OK
+    game_ids: List[str] = create_games_res.json()['gameIds']
+    assert len(set(game_ids)) == 10
+    for game_id in game_ids:
+        get_game_res: Response = front.get(f'/drop_token/{game_id}')
+        assert get_game_res.status_code == status.HTTP_200_OK
+    invalid_res: Response = front.post(
+        '/drop_token/batch/games',
+        json={'games': [{'players': ['foo'], 'columns': 4, 'rows': 4}]},
+    )
+    assert invalid_res.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_long_polls_are_cut_short_at_the_front(front, monkeypatch):
+    monkeypatch.setattr(front_module, 'FRONT_MAX_WAIT', 0.1)
+    game_id: str = front.post(
+        '/drop_token',
+        json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+    ).json()['gameId']
+    started: float = time.monotonic()
+    moves_res: Response = front.get(
+        f'/drop_token/{game_id}/moves',
+        params={'after': -1, 'wait': 60},
+    )
+    assert time.monotonic() - started < 5
+    assert moves_res.json() == {'moves': []}
+    bad_wait_res: Response = front.get(
+        f'/drop_token/{game_id}/moves',
+        params={'after': -1, 'wait': 'soon'},
+    )
+    assert bad_wait_res.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_slow_shards_time_out(shard_urls, monkeypatch):
+    monkeypatch.setenv('SHARD_URLS', ','.join(shard_urls))
+    monkeypatch.setattr(front_module, 'FRONT_MAX_WAIT', 60)
+    monkeypatch.setattr(front_module, 'SHARD_TIMEOUT', 0.2)
+    with TestClient(app) as test_client:
+        game_id: str = test_client.post(
+            '/drop_token',
+            json={'players': ['foo', 'bar'], 'columns': 4, 'rows': 4},
+        ).json()['gameId']
+        moves_res: Response = test_client.get(
+            f'/drop_token/{game_id}/moves',
+            params={'after': -1, 'wait': 5},
+        )
+        assert moves_res.status_code == status.HTTP_504_GATEWAY_TIMEOUT
@@ -0,0 +1,128 @@
+from typing import Callable, List
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from requests.models import Response
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from game_events import FeedMessage
+from game_objects import TwoPlayerGame
+from main import app
+
+
+def test_spectate_nonexistent_game():
+    with TestClient(app) as test_client:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            with test_client.websocket_connect('/drop_token/foobar/ws'):
+                pass
+        assert disconnect.value.code == status.WS_1008_POLICY_VIOLATION
+
+def test_spectate_game_from_the_middle_to_the_end():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        with test_client.websocket_connect(
+            f'/drop_token/{game_id}/ws',
+        ) as websocket:
+            assert websocket.receive_json() == {
+                'type': 'MOVE',
+                'player': 'foo',
+                'column': 3,
+                'moveNumber': 0,
+            }
+            test_client.post(f'/drop_token/{game_id}/bar', json={'column': 2})
+            assert websocket.receive_json() == {
+                'type': 'MOVE',
+                'player': 'bar',
+                'column': 2,
+                'moveNumber': 1,
+            }
+            test_client.delete(f'/drop_token/{game_id}/foo')
+            assert websocket.receive_json() == {
+                'type': 'QUIT',
+                'player': 'foo',
+                'moveNumber': 2,
+            }
+            assert websocket.receive_json() == {
+                'state': 'DONE',
+                'winner': 'bar',
+            }
+            assert websocket.receive()['type'] == 'websocket.close'
+
+def test_spectate_game_that_is_over():
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.delete(f'/drop_token/{game_id}/bar')
+        with test_client.websocket_connect(
+            f'/drop_token/{game_id}/ws',
+        ) as websocket:
+            assert websocket.receive_json() == {
+                'type': 'QUIT',
+                'player': 'bar',
+                'moveNumber': 0,
+            }
+            assert websocket.receive_json() == {
+                'state': 'DONE',
+                'winner': 'foo',
+            }
+
+def test_move_made_while_joining_is_sent_once(monkeypatch):
+    original_feed_messages: Callable[
+        [TwoPlayerGame, int],
+        List[FeedMessage],
+    ] = main.feed_messages
+    joined: List[bool] = []
+
+    def feed_messages_racing_a_move(
+        game: TwoPlayerGame,
+        first_move: int,
+    ) -> List[FeedMessage]:
+        if first_move == 0 and not joined:
+            # A move lands just before the snapshot is built
+            joined.append(True)
+            main.play_move(game.game_id, 'bar', 2)
+        return original_feed_messages(game, first_move)
+
+    monkeypatch.setattr(main, 'feed_messages', feed_messages_racing_a_move)
+    with TestClient(app) as test_client:
+        create_game_res: Response = test_client.post(
+            '/drop_token',
+            json={
+                'players': ['foo', 'bar'],
+                'columns': 4,
+                'rows': 4,
+            },
+        )
+        game_id: str = create_game_res.json()['gameId']
+        test_client.post(f'/drop_token/{game_id}/foo', json={'column': 3})
+        with test_client.websocket_connect(
+            f'/drop_token/{game_id}/ws',
+        ) as websocket:
+            move_numbers: List[int] = [
+                websocket.receive_json()['moveNumber'] for _ in range(2)
+            ]
+            assert move_numbers == [0, 1]
+            test_client.delete(f'/drop_token/{game_id}/foo')
+            assert websocket.receive_json() == {
+                'type': 'QUIT',
+                'player': 'foo',
+                'moveNumber': 2,
+            }
@@ -0,0 +1,91 @@
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import BinaryIO, Dict, List, Optional
+
+from game_objects import TwoPlayerGame
+from journal import FRAME
+
+
+ARCHIVE_NAME: str = 'games.archive'
+# A record's payload: the game ID, length-prefixed, then the pickled game
+GAME_ID_LENGTH: struct.Struct = struct.Struct('<H')
+
+
+class GameArchive:
+    # Finished games moved out of memory, pickled without their boards into
+    # one append-only file, framed like journal records. Only the offset of
+    # each game stays in memory; reading one back costs a read and an
+    # unpickle. Opening the archive reads it through once to rebuild the
+    # offsets, dropping a tail torn by a crash.
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path: str = os.path.join(directory, ARCHIVE_NAME)
+        self.offsets: Dict[str, int] = {}
+        # Held while appending to the file
+        self.lock: threading.Lock = threading.Lock()
+        with open(self.path, 'a+b') as archive_file:
+            archive_file.seek(0)
+            self.load_offsets(archive_file)
+
+    def load_offsets(self, archive_file: BinaryIO) -> None:
+        offset: int = 0
+        while True:
+            header: bytes = archive_file.read(FRAME.size)
+            if len(header) < FRAME.size:
+                break
+            length, checksum = FRAME.unpack(header)
+            payload: bytes = archive_file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            (id_length,) = GAME_ID_LENGTH.unpack_from(payload)
+            game_id: str = payload[
+                GAME_ID_LENGTH.size:GAME_ID_LENGTH.size + id_length
+            ].decode('utf-8')
+            self.offsets[game_id] = offset
+            offset += FRAME.size + length
+        archive_file.truncate(offset)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.offsets
+
+    def add_many(self, games: List[TwoPlayerGame]) -> None:
+        # On disk when this returns, so the games may leave memory
+        records: bytearray = bytearray()
+        relative_offsets: Dict[str, int] = {}
+        for game in games:
+            encoded_id: bytes = game.game_id.encode('utf-8')
+            payload: bytes = (
+                GAME_ID_LENGTH.pack(len(encoded_id))
+                + encoded_id
+                + pickle.dumps(game.without_board(), protocol=4)
+            )
+            relative_offsets[game.game_id] = len(records)
+            records += FRAME.pack(len(payload), zlib.crc32(payload))
+            records += payload
+        with self.lock:
+            with open(self.path, 'ab') as archive_file:
+                start: int = archive_file.tell()
+                archive_file.write(records)
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+            for game_id, relative_offset in relative_offsets.items():
+                self.offsets[game_id] = start + relative_offset
+
+    def get(self, game_id: str) -> Optional[TwoPlayerGame]:
+        offset: Optional[int] = self.offsets.get(game_id)
+        if offset is None:
+            return None
+        with open(self.path, 'rb') as archive_file:
+            archive_file.seek(offset)
+            length, _ = FRAME.unpack(archive_file.read(FRAME.size))
+            payload: bytes = archive_file.read(length)
+        (id_length,) = GAME_ID_LENGTH.unpack_from(payload)
+        return pickle.loads(payload[GAME_ID_LENGTH.size + id_length:])
+
+    def clear(self) -> None:
+        with self.lock:
+            os.truncate(self.path, 0)
+            self.offsets.clear()
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Move number of a move message, None for the end of the game, and the
+# message as already serialized
+FeedMessage = Tuple[Optional[int], str]
+
+# Messages a spectator may fall behind by before it is dropped
+SUBSCRIBER_QUEUE_SIZE: int = 64
+
+# Subscribers under this key follow the lobby, every game's creation and
+# end, instead of one game. Game IDs are UUIDs, so it never clashes.
+LOBBY: str = 'lobby'
+
+
+class Subscriber:
+    # One spectator's queue of messages, on the spectator's event loop.
+    # A None in the queue means the spectator fell too far behind.
+    def __init__(self, maxsize: int) -> None:
+        self.loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def deliver(self, messages: List[FeedMessage]) -> None:
+        # Runs on the subscriber's loop, never blocking the publisher
+        try:
+            for message in messages:
+                self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class GameEvents:
+    # Requests parked until a game changes, and spectators following one.
+    # Each waiter is an asyncio future and each spectator an asyncio queue
+    # on its own event loop, so waiting costs no thread, while notify()
+    # and publish() may be called from any thread, such as the threadpool
+    # running the synchronous endpoints.
+    def __init__(self) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.waiters: Dict[str, List[asyncio.Future]] = {}
+        self.subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, game_id: str) -> asyncio.Future:
+        # Subscribe before checking the game, so no change is missed
+        # between the check and the wait
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        with self.lock:
+            self.waiters.setdefault(game_id, []).append(future)
+        return future
+
+    def unsubscribe(self, game_id: str, future: asyncio.Future) -> None:
+        with self.lock:
+            futures: List[asyncio.Future] = self.waiters.get(game_id, [])
+            if future in futures:
+                futures.remove(future)
+            if not futures:
+                self.waiters.pop(game_id, None)
+
+    def notify(self, game_id: str) -> None:
+        with self.lock:
+            futures: List[asyncio.Future] = self.waiters.pop(game_id, [])
+        for future in futures:
+            call_soon_threadsafe(future.get_loop(), wake, future)
+
+    def add_subscriber(
+        self,
+        game_id: str,
+        maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+    ) -> Subscriber:
+        subscriber: Subscriber = Subscriber(maxsize)
+        with self.lock:
+            self.subscribers.setdefault(game_id, []).append(subscriber)
+        return subscriber
+
+    def remove_subscriber(self, game_id: str, subscriber: Subscriber) -> None:
+        with self.lock:
+            subscribers: List[Subscriber] = self.subscribers.get(game_id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self.subscribers.pop(game_id, None)
+
+    def has_subscribers(self, game_id: str) -> bool:
+        # So that nothing is serialized for a game nobody watches
+        return game_id in self.subscribers
+
+    def publish(self, game_id: str, messages: List[FeedMessage]) -> None:
+        # Every spectator gets the same serialized messages
+        if not messages:
+            return
+        with self.lock:
+            subscribers: List[Subscriber] = list(
+                self.subscribers.get(game_id, []),
+            )
+        for subscriber in subscribers:
+            call_soon_threadsafe(
+                subscriber.loop,
+                subscriber.deliver,
+                messages,
+            )
+
+
+def call_soon_threadsafe(
+    loop: asyncio.AbstractEventLoop,
+    callback: Callable[..., None],
+    *args: Any,
+) -> None:
+    # The loop may have closed since its waiter or subscriber was listed,
+    # in which case there is nobody left to tell
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
+
+
+def wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,57 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+
+class InProgressGameIndex:
+    # IDs of in-progress games, in creation order, so listing them costs
+    # O(in-progress games) instead of a scan of every game ever hosted.
+    def __init__(self) -> None:
+        self.next_sequence: int = 0
+        # Creation order of every indexed game, finished or not, so that a
+        # finished game still works as a pagination cursor
+        self.sequence_by_id: Dict[str, int] = {}
+        self.in_progress: Dict[int, str] = {}
+        # Ascending; sequences of finished games are dropped lazily
+        self.sequences: List[int] = []
+
+    def add(self, game_id: str) -> None:
+        sequence: int = self.next_sequence
+        self.next_sequence += 1
+        self.sequence_by_id[game_id] = sequence
+        self.in_progress[sequence] = game_id
+        self.sequences.append(sequence)
+
+    def remove(self, game_id: str) -> None:
+        sequence: Optional[int] = self.sequence_by_id.get(game_id)
+        if sequence is None or sequence not in self.in_progress:
+            return
+        del self.in_progress[sequence]
+        # Compact once finished games make up more than half of the list
+        if len(self.sequences) > 2 * len(self.in_progress):
+            self.sequences = list(self.in_progress)
+
+    def clear(self) -> None:
+        self.sequence_by_id.clear()
+        self.in_progress.clear()
+        self.sequences.clear()
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.sequence_by_id
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[str]:
+        # In-progress IDs created after the game `after`, at most `limit`
+        start: int = 0
+        if after is not None:
+            start = bisect_right(self.sequences, self.sequence_by_id[after])
+        game_ids: List[str] = []
+        for position in range(start, len(self.sequences)):
+            if limit is not None and len(game_ids) >= limit:
+                break
+            sequence: int = self.sequences[position]
+            if sequence in self.in_progress:
+                game_ids.append(self.in_progress[sequence])
+        return game_ids
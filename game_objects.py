@@ -1,5 +1,8 @@
-from typing import Dict, List, Optional, Union
+import copy
+from enum import Enum
+from typing import Dict, List, Optional, Set, Tuple, Union
 
+from boards import BOARD_ENGINES, Board, make_board
 from exceptions import (
     ColumnFullException,
     ColumnOutOfBoundsException,
@@ -8,108 +11,231 @@ from exceptions import (
     IllegalTurnException,
     PlayerNotFoundException,
 )
-from helpers import check_winner
+from move_log import AnyMoveLog, make_move_log
 from payload_schema import NewGame
 
 
+class GameState(str, Enum):
+    # A str so states compare and serialize as plain strings, while every
+    # game shares the same two objects
+    IN_PROGRESS = 'IN_PROGRESS'
+    DONE = 'DONE'
+
+
+# Bits of TwoPlayerGame.active_players
+BOTH_PLAYERS_ACTIVE: int = 0b11
+
+
+def move_slice(
+    num_moves: int,
+    start: Optional[int] = None,
+    until: Optional[int] = None,
+) -> Tuple[int, int]:
+    # Default start to 0 and until to end of moves
+    slice_start: int = 0 if start is None else start
+    slice_end: int = num_moves if until is None else until + 1
+    within_bounds: bool = slice_start >= 0 and slice_end <= num_moves
+    result_will_be_nonempty: bool = slice_start < slice_end
+    can_slice: bool = within_bounds and result_will_be_nonempty
+    if not can_slice:
+        raise FetchMoveException('Invalid range.')
+    return slice_start, slice_end
+
+
+def check_move_number(num_moves: int, move_index: int) -> None:
+    within_bounds: bool = move_index >= 0 and move_index < num_moves
+    if not within_bounds:
+        raise FetchMoveException('Invalid move number.')
+
+
 class TwoPlayerGame:
+    # Slotted and lazily allocated so that an idle game costs little more
+    # than its players: the board and the move log are only created on
+    # first use.
+    __slots__ = (
+        'game_id',
+        'players',
+        'active_players',
+        'state',
+        'winner_index',
+        'turn_index',
+        'rows',
+        'columns',
+        'win_condition',
+        'board_engine',
+        'move_log_dir',
+        '_board',
+        '_moves',
+    )
+
     def __init__(
         self,
         game_id: str,
         new_game: NewGame,
         win_condition: int,
+        board_engine: str = 'list',
+        move_log_dir: Optional[str] = None,
     ) -> None:
+        if board_engine not in BOARD_ENGINES:
+            raise ValueError(f'Unknown board engine {board_engine!r}.')
         self.game_id: str = game_id
-        self.moves: List[Dict[str, Union[int, str]]] = []
-        self.original_players: List[str] = [*new_game.players]
-        self.players: List[str] = [*new_game.players]
-        self.state: str = 'IN_PROGRESS'
-        self.winner: Optional[str] = None
+        self.players: Tuple[str, str] = tuple(new_game.players)
+        self.active_players: int = BOTH_PLAYERS_ACTIVE
+        self.state: GameState = GameState.IN_PROGRESS
+        self.winner_index: int = -1
         self.turn_index: int = 0
-        self.board: List[List[int]] = [
-            [*ref] for ref in ([[-1] * new_game.columns] * new_game.rows)
-        ]
-        self.row_index_of_lowest_empty_cell: List[int] = (
-            [new_game.rows - 1] * new_game.columns
-        )
+        self.rows: int = new_game.rows
+        self.columns: int = new_game.columns
         self.win_condition: int = win_condition
+        self.board_engine: str = board_engine
+        self.move_log_dir: Optional[str] = move_log_dir
+        self._board: Optional[Board] = None
+        self._moves: Optional[AnyMoveLog] = None
+
+    @property
+    def board(self) -> Board:
+        if self._board is None:
+            self._board = make_board(
+                self.board_engine,
+                self.rows,
+                self.columns,
+                self.win_condition,
+            )
+            # Rebuilt from the moves for a game stored without_board()
+            for move_index in range(self.num_moves()):
+                player_index, is_quit, column = self.moves.entry(move_index)
+                if not is_quit:
+                    self._board.drop(column, player_index)
+        return self._board
+
+    @property
+    def moves(self) -> AnyMoveLog:
+        # Only first made by a move, under the store's lock; readers check
+        # num_moves() before touching it
+        if self._moves is None:
+            self._moves = make_move_log(
+                self.players,
+                self.game_id,
+                self.move_log_dir,
+            )
+        return self._moves
+
+    @property
+    def winner(self) -> Optional[str]:
+        if self.winner_index < 0:
+            return None
+        return self.players[self.winner_index]
+
+    def is_active(self, player: str) -> bool:
+        return (
+            player in self.players
+            and bool(self.active_players & (1 << self.players.index(player)))
+        )
 
     def make_move(self, player: str, column: int) -> int:
-        if player not in self.players:
+        if not self.is_active(player):
             raise PlayerNotFoundException('Player not found.')
 
-        if self.state == 'DONE':
+        if self.state == GameState.DONE:
             raise GameCompletedException('Game is done.')
 
         whose_turn: str = self.players[self.turn_index]
         if player != whose_turn:
             raise IllegalTurnException('Wait for other player to make a move.')
 
-        num_columns: int = len(self.board[0])
-        out_of_bounds: bool = column < 0 or column >= num_columns
+        out_of_bounds: bool = column < 0 or column >= self.columns
         if out_of_bounds:
             raise ColumnOutOfBoundsException('Column out of bounds.')
 
-        row_index_to_fill: int = self.row_index_of_lowest_empty_cell[column]
-        num_rows: int = len(self.board)
-        if row_index_to_fill < 0:
+        if self.board.is_column_full(column):
             raise ColumnFullException('Column is full.')
 
-        self.board[row_index_to_fill][column] = self.turn_index
+        row_index_filled: int = self.board.drop(column, self.turn_index)
         move_number: int = len(self.moves)
-        self.moves.append({
-            'type': 'MOVE',
-            'player': player,
-            'column': column,
-        })
-        self.row_index_of_lowest_empty_cell[column] -= 1
-
-        all_columns_are_full: bool = all(
-            row_index < 0
-            for row_index in self.row_index_of_lowest_empty_cell
+        self.moves.append_move(self.turn_index, column)
+
+        if self.board.is_full():
+            self.state = GameState.DONE
+
+        won: bool = self.board.is_winning_drop(
+            self.turn_index,
+            row_index_filled,
+            column,
         )
-        if all_columns_are_full:
-            self.state = 'DONE'
+        if won:
+            self.state = GameState.DONE
+            self.winner_index = self.turn_index
 
-        if check_winner(self.board, self.turn_index, self.win_condition):
-            self.state = 'DONE'
-            self.winner = player
+        # Call it a draw as soon as every line is blocked for both players
+        someone_can_still_win: bool = (
+            self.board.can_still_win(0) or self.board.can_still_win(1)
+        )
+        if not someone_can_still_win:
+            self.state = GameState.DONE
 
         self.turn_index = (self.turn_index + 1) % 2
         return move_number
 
+    def without_board(self) -> 'TwoPlayerGame':
+        # A shallow copy to store compactly; its board comes back on use
+        stripped: TwoPlayerGame = copy.copy(self)
+        stripped._board = None
+        return stripped
+
+    def frozen_copy(self) -> 'TwoPlayerGame':
+        # Without its board, and with moves that stay as they are now while
+        # this game goes on, so it can be pickled without holding it still
+        frozen: TwoPlayerGame = self.without_board()
+        if self._moves is not None and self.state != GameState.DONE:
+            frozen._moves = self._moves.copy()
+        return frozen
+
+    def version(self) -> str:
+        # Changes whenever anything a client can read about the game does
+        return f'{self.num_moves()}-{self.state.value}'
+
+    def num_moves(self) -> int:
+        # Without allocating a move log for an idle game
+        return 0 if self._moves is None else len(self._moves)
+
+    def open_threats(self, player: str) -> Set[Tuple[int, int]]:
+        # (row, column) cells that would complete a line for the player
+        if player not in self.players:
+            raise PlayerNotFoundException('Player not found.')
+        return self.board.open_threats(self.players.index(player))
+
+    def move_slice(
+        self,
+        start: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        return move_slice(self.num_moves(), start, until)
+
     def get_moves(
         self,
         start: Optional[int] = None,
         until: Optional[int] = None,
     ) -> List[Dict[str, Union[int, str]]]:
-        # Default start to 0 and until to end of moves
-        slice_start: int = 0 if start is None else start
-        slice_end: int = len(self.moves) if until is None else until + 1
-        within_bounds: bool = slice_start >= 0 and slice_end <= len(self.moves)
-        result_will_be_nonempty: bool = slice_start < slice_end
-        can_slice: bool = within_bounds and result_will_be_nonempty
-        if not can_slice:
-            raise FetchMoveException('Invalid range.')
-        slice_arg: slice = slice(slice_start, slice_end)
-        moves_sublist: List[Dict[str, Union[int, str]]] = self.moves[slice_arg]
+        moves_sublist: List[Dict[str, Union[int, str]]] = (
+            self.moves.get_range(*self.move_slice(start, until))
+        )
         return moves_sublist
 
     def get_move(self, move_index: int) -> Dict[str, Union[int, str]]:
-        within_bounds: bool = move_index >= 0 and move_index < len(self.moves)
-        if not within_bounds:
-            raise FetchMoveException('Invalid move number.')
-        return self.moves[move_index]
+        check_move_number(self.num_moves(), move_index)
+        return self.moves.get(move_index)
+
+    def get_move_json(self, move_index: int) -> bytes:
+        check_move_number(self.num_moves(), move_index)
+        return self.moves.get_json(move_index)
 
     def delete_player(self, player: str) -> None:
-        if player not in self.players:
+        if not self.is_active(player):
             raise PlayerNotFoundException('Player not found.')
-        if self.state == 'DONE':
+        if self.state == GameState.DONE:
             raise GameCompletedException('Game is done.')
-        self.moves.append({
-            'type': 'QUIT',
-            'player': player,
-        })
-        self.players = [p for p in self.players if p != player]
-        self.state = 'DONE'
-        self.winner = self.players[0]
+        player_index: int = self.players.index(player)
+        self.moves.append_quit(player_index)
+        self.active_players &= ~(1 << player_index)
+        self.state = GameState.DONE
+        self.winner_index = 1 - player_index
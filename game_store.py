@@ -0,0 +1,471 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import ContextManager, Dict, Iterator, List, Optional
+
+from exceptions import GameNotFoundException
+from game_archive import GameArchive
+from game_index import InProgressGameIndex
+from game_objects import GameState, TwoPlayerGame
+from journal import Journal, Record, encode_create
+from payload_schema import NewGame
+
+
+class GameStore(ABC):
+    # Every endpoint reads and writes games through one of these. Mutations
+    # go through update(), which hands out the game and persists it once
+    # the block exits without raising.
+    @abstractmethod
+    def add(self, game: TwoPlayerGame) -> None:
+        pass
+
+    def add_many(self, games: List[TwoPlayerGame]) -> None:
+        # Stores that can add games in bulk more cheaply override this
+        for game in games:
+            self.add(game)
+
+    @abstractmethod
+    def get(self, game_id: str) -> TwoPlayerGame:
+        pass
+
+    @abstractmethod
+    def update(self, game_id: str) -> ContextManager[TwoPlayerGame]:
+        pass
+
+    @abstractmethod
+    def in_progress(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[str]:
+        # IDs of in-progress games created after the game `after`
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+# Seconds between two looks for finished games to archive
+ARCHIVE_INTERVAL: float = 1
+# Most games archived in one write
+ARCHIVE_BATCH: int = 10_000
+
+
+class InMemoryGameStore(GameStore):
+    # State lives in this process only, and is dropped on close. With a
+    # journal, every mutation is also logged and waited on until it is on
+    # disk, a snapshot is taken every `snapshot_every` records, and the
+    # store starts from whatever the journal already holds.
+    #
+    # With an archive, a background thread moves finished games out of
+    # memory once they have been finished for `archive_after` seconds, or
+    # once more than `keep_finished` are held, oldest first. Archived games
+    # are still found by get(), read-only since a finished game can't
+    # change. The archive is only kept across restarts with a journal.
+    def __init__(
+        self,
+        journal: Optional[Journal] = None,
+        snapshot_every: int = 100_000,
+        move_log_dir: Optional[str] = None,
+        archive: Optional[GameArchive] = None,
+        archive_after: float = 3600,
+        keep_finished: int = 100_000,
+    ) -> None:
+        self.games: Dict[str, TwoPlayerGame] = {}
+        self.in_progress_games: InProgressGameIndex = InProgressGameIndex()
+        self.lock: threading.Lock = threading.Lock()
+        self.journal: Optional[Journal] = journal
+        self.snapshot_every: int = snapshot_every
+        # Set while a snapshot is being taken
+        self.snapshotting: bool = False
+        # Where replayed games keep their move logs, as in create_new_game
+        self.move_log_dir: Optional[str] = move_log_dir
+        self.archive: Optional[GameArchive] = archive
+        self.archive_after: float = archive_after
+        self.keep_finished: int = keep_finished
+        # IDs of the finished games still in memory, by time.monotonic() at
+        # which they finished, oldest first
+        self.finished: OrderedDict = OrderedDict()
+        if archive is not None and journal is None:
+            archive.clear()
+        if journal is not None:
+            self.recover(journal)
+        self.stopping: threading.Event = threading.Event()
+        if archive is not None:
+            self.archiver: threading.Thread = threading.Thread(
+                target=self.archive_forever,
+                daemon=True,
+            )
+            self.archiver.start()
+
+    def recover(self, journal: Journal) -> None:
+        snapshot: Optional[bytes] = journal.read_snapshot()
+        # Games archived since they were logged stay in the archive
+        if snapshot is not None:
+            for game in pickle.loads(snapshot):
+                if not self.is_archived(game.game_id):
+                    self.index(game)
+        replayed: int = 0
+        for record in journal.replay():
+            if not self.is_archived(record[1]):
+                self.apply(record)
+            replayed += 1
+        if replayed:
+            self.take_snapshot()
+
+    def is_archived(self, game_id: str) -> bool:
+        return self.archive is not None and game_id in self.archive
+
+    def index(self, game: TwoPlayerGame) -> None:
+        self.games[game.game_id] = game
+        self.in_progress_games.add(game.game_id)
+        if game.state == GameState.DONE:
+            self.finish(game.game_id)
+
+    def finish(self, game_id: str) -> None:
+        self.in_progress_games.remove(game_id)
+        if self.archive is not None:
+            self.finished.setdefault(game_id, time.monotonic())
+
+    def apply(self, record: Record) -> None:
+        kind: str = record[0]
+        if kind == 'CREATE':
+            _, game_id, players, rows, columns, win_condition, engine = record
+            new_game: NewGame = NewGame.construct(
+                players=list(players),
+                rows=rows,
+                columns=columns,
+            )
+            self.index(TwoPlayerGame(
+                game_id,
+                new_game,
+                win_condition,
+                engine,
+                self.move_log_dir,
+            ))
+            return
+        game: TwoPlayerGame = self.games[record[1]]
+        if kind == 'MOVE':
+            _, _, player_index, column = record
+            game.make_move(game.players[player_index], column)
+        else:
+            game.delete_player(game.players[record[2]])
+        if game.state == GameState.DONE:
+            self.finish(game.game_id)
+
+    def take_snapshot(self, only_if_due: bool = False) -> None:
+        # The games are copied and the segment switched under the lock, so
+        # the snapshot matches the log exactly; pickling and writing it out
+        # are not. One snapshot runs at a time, and with only_if_due only
+        # once snapshot_every records have been logged since the last.
+        with self.lock:
+            due: bool = (
+                self.journal.records_in_segment >= self.snapshot_every
+            )
+            if self.snapshotting or (only_if_due and not due):
+                return
+            self.snapshotting = True
+            games: List[TwoPlayerGame] = [
+                game.frozen_copy() for game in self.games.values()
+            ]
+            number: int = self.journal.rotate()
+        try:
+            snapshot: bytes = pickle.dumps(games, protocol=4)
+            self.journal.write_snapshot(number, snapshot)
+        finally:
+            self.snapshotting = False
+
+    def log_moves(self, game: TwoPlayerGame, since: int) -> int:
+        ticket: int = self.journal.appended
+        for move_index in range(since, game.num_moves()):
+            player_index, is_quit, column = game.moves.entry(move_index)
+            if is_quit:
+                ticket = self.journal.append_quit(game.game_id, player_index)
+            else:
+                ticket = self.journal.append_move(
+                    game.game_id,
+                    player_index,
+                    column,
+                )
+        return ticket
+
+    def add(self, game: TwoPlayerGame) -> None:
+        self.add_many([game])
+
+    def add_many(self, games: List[TwoPlayerGame]) -> None:
+        # One lock and one wait for the disk for the whole lot. Records are
+        # encoded first, so a game that can't be logged adds none of them.
+        payloads: List[bytes] = []
+        if self.journal is not None:
+            payloads = [
+                encode_create(
+                    game.game_id,
+                    game.players,
+                    game.rows,
+                    game.columns,
+                    game.win_condition,
+                    game.board_engine,
+                )
+                for game in games
+            ]
+        with self.lock:
+            for game in games:
+                self.index(game)
+            if self.journal is not None:
+                ticket: int = self.journal.appended
+                for payload in payloads:
+                    ticket = self.journal.append(payload)
+        if self.journal is not None:
+            self.journal.wait(ticket)
+
+    def get(self, game_id: str) -> TwoPlayerGame:
+        # Games leave self.games only once they are in the archive
+        game: Optional[TwoPlayerGame] = self.games.get(game_id)
+        if game is None and self.archive is not None:
+            game = self.archive.get(game_id)
+        if game is None:
+            raise GameNotFoundException('Game not found.')
+        return game
+
+    @contextmanager
+    def update(self, game_id: str) -> Iterator[TwoPlayerGame]:
+        # An archived game is finished, so every change to it is refused
+        with self.lock:
+            game: TwoPlayerGame = self.get(game_id)
+            moves_before: int = game.num_moves()
+            yield game
+            if game.state == GameState.DONE:
+                self.finish(game_id)
+            if self.journal is not None:
+                ticket: int = self.log_moves(game, moves_before)
+        if self.journal is not None:
+            # Only wait for the disk once other requests can go ahead
+            self.journal.wait(ticket)
+            if self.journal.records_in_segment >= self.snapshot_every:
+                self.take_snapshot(only_if_due=True)
+
+    def in_progress(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[str]:
+        # The index is changed under the lock, compactions included
+        with self.lock:
+            if after is not None and after not in self.in_progress_games:
+                raise GameNotFoundException('Game not found.')
+            return self.in_progress_games.page(limit, after)
+
+    def archive_finished(self, now: Optional[float] = None) -> int:
+        # Archives the finished games due under the retention policy, at
+        # most ARCHIVE_BATCH at a time, and returns how many. They stay in
+        # memory until they are on disk, so get() always finds them.
+        now = time.monotonic() if now is None else now
+        due: List[TwoPlayerGame] = []
+        with self.lock:
+            for game_id, finished_at in self.finished.items():
+                over_limit: bool = (
+                    len(self.finished) - len(due) > self.keep_finished
+                )
+                expired: bool = now - finished_at >= self.archive_after
+                if len(due) == ARCHIVE_BATCH or not (over_limit or expired):
+                    break
+                due.append(self.games[game_id])
+        if not due:
+            return 0
+        # Archived with their moves, whose files go once they are on disk
+        for game in due:
+            game.moves.detach()
+        self.archive.add_many(due)
+        with self.lock:
+            for game in due:
+                del self.games[game.game_id]
+                del self.finished[game.game_id]
+        for game in due:
+            game.moves.remove()
+        return len(due)
+
+    def archive_forever(self) -> None:
+        while not self.stopping.wait(ARCHIVE_INTERVAL):
+            while self.archive_finished() == ARCHIVE_BATCH:
+                pass
+
+    def close(self) -> None:
+        if self.archive is not None:
+            self.stopping.set()
+            self.archiver.join()
+            if self.journal is None:
+                self.archive.clear()
+        if self.journal is not None:
+            self.journal.close()
+        else:
+            # Nothing will read the games' move files again
+            for game in self.games.values():
+                if game.num_moves():
+                    game.moves.remove()
+        self.games.clear()
+        self.in_progress_games.clear()
+        self.finished.clear()
+
+
+class SqliteGameStore(GameStore):
+    # Games are pickled into one SQLite database in WAL mode, so several
+    # worker processes on one host can share them. Readers never block the
+    # writer, and update() takes the write lock up front (BEGIN IMMEDIATE)
+    # so concurrent moves on a game are serialized across processes.
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.local: threading.local = threading.local()
+        connection: sqlite3.Connection = self.connection()
+        # sequence keeps creation order for listing and pagination
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS games ('
+            'sequence INTEGER PRIMARY KEY, '
+            'game_id TEXT NOT NULL UNIQUE, '
+            'state TEXT NOT NULL, '
+            'game BLOB NOT NULL)'
+        )
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS in_progress_games '
+            "ON games (sequence) WHERE state = 'IN_PROGRESS'"
+        )
+
+    def connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        connection: Optional[sqlite3.Connection] = getattr(
+            self.local,
+            'connection',
+            None,
+        )
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=30,
+                isolation_level=None,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def add(self, game: TwoPlayerGame) -> None:
+        self.add_many([game])
+
+    def add_many(self, games: List[TwoPlayerGame]) -> None:
+        # One transaction, so one sync to disk for the whole lot
+        connection: sqlite3.Connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT INTO games (game_id, state, game) VALUES (?, ?, ?)',
+                (
+                    (
+                        game.game_id,
+                        game.state.value,
+                        pickle.dumps(game, protocol=4),
+                    )
+                    for game in games
+                ),
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def get(self, game_id: str) -> TwoPlayerGame:
+        row: Optional[tuple] = self.connection().execute(
+            'SELECT game FROM games WHERE game_id = ?',
+            (game_id,),
+        ).fetchone()
+        if row is None:
+            raise GameNotFoundException('Game not found.')
+        return pickle.loads(row[0])
+
+    @contextmanager
+    def update(self, game_id: str) -> Iterator[TwoPlayerGame]:
+        connection: sqlite3.Connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            game: TwoPlayerGame = self.get(game_id)
+            yield game
+            connection.execute(
+                'UPDATE games SET state = ?, game = ? WHERE game_id = ?',
+                (game.state.value, pickle.dumps(game, protocol=4), game_id),
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def in_progress(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[str]:
+        connection: sqlite3.Connection = self.connection()
+        after_sequence: int = 0
+        if after is not None:
+            row: Optional[tuple] = connection.execute(
+                'SELECT sequence FROM games WHERE game_id = ?',
+                (after,),
+            ).fetchone()
+            if row is None:
+                raise GameNotFoundException('Game not found.')
+            after_sequence = row[0]
+        rows: List[tuple] = connection.execute(
+            'SELECT game_id FROM games '
+            "WHERE state = 'IN_PROGRESS' AND sequence > ? "
+            'ORDER BY sequence LIMIT ?',
+            (after_sequence, -1 if limit is None else limit),
+        ).fetchall()
+        return [game_id for game_id, in rows]
+
+    def close(self) -> None:
+        # Only this thread's connection; the others close with their threads
+        connection: Optional[sqlite3.Connection] = getattr(
+            self.local,
+            'connection',
+            None,
+        )
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+def make_game_store() -> GameStore:
+    # GAME_STORE=sqlite shares games between processes through SQLITE_PATH,
+    # and GAME_STORE=shared_memory through a shared memory table on this
+    # host. In memory, JOURNAL_DIR makes games survive restarts and crashes.
+    backend: str = os.environ.get('GAME_STORE', 'memory')
+    if backend == 'memory':
+        # ARCHIVE_DIR moves finished games out of memory after ARCHIVE_AFTER
+        # seconds, or past ARCHIVE_KEEP of them
+        journal_dir: Optional[str] = os.environ.get('JOURNAL_DIR')
+        archive_dir: Optional[str] = os.environ.get('ARCHIVE_DIR')
+        return InMemoryGameStore(
+            None if journal_dir is None else Journal(journal_dir),
+            int(os.environ.get('SNAPSHOT_EVERY', '100000'), 10),
+            os.environ.get('MOVE_LOG_DIR'),
+            None if archive_dir is None else GameArchive(archive_dir),
+            float(os.environ.get('ARCHIVE_AFTER', '3600')),
+            int(os.environ.get('ARCHIVE_KEEP', '100000'), 10),
+        )
+    if backend == 'sqlite':
+        return SqliteGameStore(
+            os.environ.get('SQLITE_PATH', 'drop_token.sqlite3'),
+        )
+    if backend == 'shared_memory':
+        # Imported here so that the other stores never load numpy
+        from shared_memory_store import SharedMemoryGameStore
+        return SharedMemoryGameStore(
+            os.environ.get('SHARED_MEMORY_NAME', 'drop_token'),
+            int(os.environ.get('SHARED_MEMORY_GAMES', '65536'), 10),
+            int(os.environ.get('SHARED_MEMORY_MAX_CELLS', '256'), 10),
+            int(os.environ.get('SHARED_MEMORY_CACHED_GAMES', '1024'), 10),
+        )
+    raise ValueError(f'Unknown game store {backend!r}.')
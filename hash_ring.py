@@ -0,0 +1,31 @@
+import hashlib
+from bisect import bisect_left
+from typing import List
+
+
+def ring_position(key: str) -> int:
+    return int.from_bytes(
+        hashlib.md5(key.encode('utf-8')).digest()[:8],
+        'big',
+    )
+
+
+class HashRing:
+    # Consistent hashing: every shard is placed on the ring at `replicas`
+    # points, and a key belongs to the first shard point at or after its
+    # hash. Adding or removing a shard only moves the keys of that shard.
+    def __init__(self, shards: List[str], replicas: int = 128) -> None:
+        if not shards:
+            raise ValueError('A hash ring needs at least one shard.')
+        self.shards: List[str] = list(shards)
+        points: List[tuple] = sorted(
+            (ring_position(f'{shard}#{replica}'), shard)
+            for shard in shards
+            for replica in range(replicas)
+        )
+        self.positions: List[int] = [position for position, _ in points]
+        self.owners: List[str] = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> str:
+        point: int = bisect_left(self.positions, ring_position(key))
+        return self.owners[point % len(self.owners)]
@@ -1,9 +1,9 @@
-from typing import List
+from typing import List, Tuple
 
 
 def check_winner(board: List[List[int]], target: int, how_many: int) -> bool:
     # Brute force O(r*c*k) check.
-    # This can be optimized to O(k), k=how_many, using a sliding window trick.
+    # See check_winner_at for the O(k), k=how_many, per-move check.
     rows: int = len(board)
     cols: int = len(board[0])
     for box_row in range(rows - how_many + 1):
@@ -38,3 +38,37 @@ def check_winner(board: List[List[int]], target: int, how_many: int) -> bool:
             if all(value == target for value in upward_diagonal):
                 return True
     return False
+
+
+def check_winner_at(
+    board: List[List[int]],
+    target: int,
+    how_many: int,
+    row: int,
+    col: int,
+) -> bool:
+    # O(k) check of the four lines through the cell at (row, col).
+    # Only a line through the last filled cell can have become a winner, so
+    # after a drop it agrees with the full check_winner scan. The boards
+    # track lines incrementally instead; this stays for tests and benchmarks.
+    rows: int = len(board)
+    cols: int = len(board[0])
+    directions: List[Tuple[int, int]] = [(0, 1), (1, 0), (1, 1), (-1, 1)]
+    for row_step, col_step in directions:
+        in_a_row: int = 1
+        # Walk away from (row, col) in both senses of this direction
+        for sense in (1, -1):
+            r: int = row + sense * row_step
+            c: int = col + sense * col_step
+            while (
+                in_a_row < how_many
+                and 0 <= r < rows
+                and 0 <= c < cols
+                and board[r][c] == target
+            ):
+                in_a_row += 1
+                r += sense * row_step
+                c += sense * col_step
+        if in_a_row >= how_many:
+            return True
+    return False
@@ -0,0 +1,287 @@
+import os
+import struct
+import threading
+import uuid
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from exceptions import GameTooLargeException
+
+
+# Every record is framed by its payload length and CRC32, so replay can
+# stop cleanly at a record torn by a crash.
+FRAME: struct.Struct = struct.Struct('<II')
+# kind, game id (UUID bytes), rows, columns, win condition, board engine,
+# then each player as a length-prefixed UTF-8 string
+CREATE: struct.Struct = struct.Struct('<c16sQQQB')
+PLAYER_LENGTH: struct.Struct = struct.Struct('<H')
+# kind, game id, player index, column
+MOVE: struct.Struct = struct.Struct('<c16sBQ')
+# kind, game id, player index
+QUIT: struct.Struct = struct.Struct('<c16sB')
+
+BOARD_ENGINE_CODES: List[str] = ['list', 'bitboard']
+
+CreateRecord = Tuple[str, str, Tuple[str, str], int, int, int, str]
+MoveRecord = Tuple[str, str, int, int]
+QuitRecord = Tuple[str, str, int]
+Record = Union[CreateRecord, MoveRecord, QuitRecord]
+
+
+def segment_name(number: int) -> str:
+    return f'segment-{number:08d}.log'
+
+
+def snapshot_name(number: int) -> str:
+    return f'snapshot-{number:08d}.pickle'
+
+
+def encode_create(
+    game_id: str,
+    players: Tuple[str, str],
+    rows: int,
+    columns: int,
+    win_condition: int,
+    board_engine: str,
+) -> bytes:
+    try:
+        payload: bytearray = bytearray(CREATE.pack(
+            b'C',
+            uuid.UUID(game_id).bytes,
+            rows,
+            columns,
+            win_condition,
+            BOARD_ENGINE_CODES.index(board_engine),
+        ))
+        for player in players:
+            encoded: bytes = player.encode('utf-8')
+            payload += PLAYER_LENGTH.pack(len(encoded)) + encoded
+    except struct.error:
+        raise GameTooLargeException('Game does not fit a journal record.')
+    return bytes(payload)
+
+
+class Journal:
+    # Append-only binary log of game mutations in numbered segment files,
+    # plus snapshots. snapshot-N holds everything logged before segment-N,
+    # so recovery loads the newest snapshot and replays segments N and up.
+    #
+    # Appends only fill a buffer. One background thread writes and fsyncs
+    # whatever has piled up while the previous fsync ran (group commit),
+    # and wait() blocks a caller until its record is on disk.
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+        segments: List[int] = self.numbered_files('segment-')
+        snapshots: List[int] = self.numbered_files('snapshot-')
+        self.snapshot_number: Optional[int] = (
+            snapshots[-1] if snapshots else None
+        )
+        # Never append to an old segment, whose tail may be torn
+        self.replay_segments: List[int] = [
+            number for number in segments
+            if self.snapshot_number is None or number >= self.snapshot_number
+        ]
+        self.segment_number: int = max(segments + snapshots + [0]) + 1
+        self.file: BinaryIO = self.open_segment(self.segment_number)
+        self.records_in_segment: int = 0
+
+        self.buffer: bytearray = bytearray()
+        self.appended: int = 0
+        self.synced: int = 0
+        self.closed: bool = False
+        # Why the flusher stopped, if a write failed
+        self.error: Optional[OSError] = None
+        self.condition: threading.Condition = threading.Condition()
+        # Held while touching self.file; always taken before the condition
+        self.file_lock: threading.Lock = threading.Lock()
+        self.flusher: threading.Thread = threading.Thread(
+            target=self.flush_forever,
+            daemon=True,
+        )
+        self.flusher.start()
+
+    def numbered_files(self, prefix: str) -> List[int]:
+        return sorted(
+            int(name[len(prefix):].split('.')[0])
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and not name.endswith('.tmp')
+        )
+
+    def open_segment(self, number: int) -> BinaryIO:
+        return open(os.path.join(self.directory, segment_name(number)), 'ab')
+
+    def append(self, payload: bytes) -> int:
+        # Returns a ticket to pass to wait()
+        with self.condition:
+            self.buffer += FRAME.pack(len(payload), zlib.crc32(payload))
+            self.buffer += payload
+            self.appended += 1
+            self.records_in_segment += 1
+            self.condition.notify_all()
+            return self.appended
+
+    def append_create(
+        self,
+        game_id: str,
+        players: Tuple[str, str],
+        rows: int,
+        columns: int,
+        win_condition: int,
+        board_engine: str,
+    ) -> int:
+        return self.append(encode_create(
+            game_id,
+            players,
+            rows,
+            columns,
+            win_condition,
+            board_engine,
+        ))
+
+    def append_move(self, game_id: str, player_index: int, column: int) -> int:
+        return self.append(
+            MOVE.pack(b'M', uuid.UUID(game_id).bytes, player_index, column),
+        )
+
+    def append_quit(self, game_id: str, player_index: int) -> int:
+        return self.append(
+            QUIT.pack(b'Q', uuid.UUID(game_id).bytes, player_index),
+        )
+
+    def wait(self, ticket: int) -> None:
+        # Raises the error that stopped the flusher, if any
+        with self.condition:
+            while self.synced < ticket:
+                if self.error is not None:
+                    raise self.error
+                self.condition.wait()
+
+    def write_pending(self) -> None:
+        # Caller holds file_lock
+        with self.condition:
+            data: bytes = bytes(self.buffer)
+            self.buffer.clear()
+            ticket: int = self.appended
+        if data:
+            self.file.write(data)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        with self.condition:
+            self.synced = max(self.synced, ticket)
+            self.condition.notify_all()
+
+    def flush_forever(self) -> None:
+        while True:
+            with self.condition:
+                while not self.buffer and not self.closed:
+                    self.condition.wait()
+                if self.closed and not self.buffer:
+                    return
+            try:
+                with self.file_lock:
+                    self.write_pending()
+            except OSError as error:
+                # Nothing more can be made durable, so every waiter fails
+                with self.condition:
+                    self.error = error
+                    self.condition.notify_all()
+                return
+
+    def rotate(self) -> int:
+        # Start a new segment and return its number. A snapshot of the state
+        # at the time of the call covers everything logged before it.
+        with self.file_lock:
+            self.write_pending()
+            self.file.close()
+            with self.condition:
+                self.segment_number += 1
+                self.records_in_segment = 0
+            self.file = self.open_segment(self.segment_number)
+            return self.segment_number
+
+    def write_snapshot(self, number: int, snapshot: bytes) -> None:
+        # Written aside then renamed, so a crash never leaves half a snapshot
+        path: str = os.path.join(self.directory, snapshot_name(number))
+        with open(f'{path}.tmp', 'wb') as snapshot_file:
+            snapshot_file.write(snapshot)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(f'{path}.tmp', path)
+        directory_fd: int = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+        for older in self.numbered_files('segment-'):
+            if older < number:
+                os.remove(os.path.join(self.directory, segment_name(older)))
+        for older in self.numbered_files('snapshot-'):
+            if older < number:
+                os.remove(os.path.join(self.directory, snapshot_name(older)))
+
+    def read_snapshot(self) -> Optional[bytes]:
+        if self.snapshot_number is None:
+            return None
+        path: str = os.path.join(
+            self.directory,
+            snapshot_name(self.snapshot_number),
+        )
+        with open(path, 'rb') as snapshot_file:
+            return snapshot_file.read()
+
+    def replay(self) -> Iterator[Record]:
+        # Records logged since the newest snapshot, oldest first
+        for number in self.replay_segments:
+            path: str = os.path.join(self.directory, segment_name(number))
+            with open(path, 'rb') as segment_file:
+                data: bytes = segment_file.read()
+            offset: int = 0
+            while offset + FRAME.size <= len(data):
+                length, checksum = FRAME.unpack_from(data, offset)
+                payload: bytes = data[
+                    offset + FRAME.size:offset + FRAME.size + length
+                ]
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                yield decode(payload)
+                offset += FRAME.size + length
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.flusher.join()
+        with self.file_lock:
+            if self.error is None:
+                self.write_pending()
+            self.file.close()
+
+
+def decode(payload: bytes) -> Record:
+    kind: bytes = payload[:1]
+    if kind == b'M':
+        _, game_id, player_index, column = MOVE.unpack(payload)
+        return ('MOVE', str(uuid.UUID(bytes=game_id)), player_index, column)
+    if kind == b'Q':
+        _, game_id, player_index = QUIT.unpack(payload)
+        return ('QUIT', str(uuid.UUID(bytes=game_id)), player_index)
+    _, game_id, rows, columns, win_condition, engine = CREATE.unpack_from(
+        payload,
+    )
+    offset: int = CREATE.size
+    players: List[str] = []
+    for _ in range(2):
+        (length,) = PLAYER_LENGTH.unpack_from(payload, offset)
+        offset += PLAYER_LENGTH.size
+        players.append(payload[offset:offset + length].decode('utf-8'))
+        offset += length
+    return (
+        'CREATE',
+        str(uuid.UUID(bytes=game_id)),
+        (players[0], players[1]),
+        rows,
+        columns,
+        win_condition,
+        BOARD_ENGINE_CODES[engine],
+    )
@@ -1,172 +1,705 @@
+import asyncio
+import json
 import os
 import uuid
-from typing import Dict, List, Optional, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    Union,
+)
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import (
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    status,
+)
 from fastapi.exceptions import RequestValidationError
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from exceptions import (
     ColumnFullException,
     ColumnOutOfBoundsException,
     FetchMoveException,
     GameCompletedException,
+    GameNotFoundException,
+    GameTooLargeException,
     IllegalTurnException,
     PlayerNotFoundException,
+    StoreFullException,
+)
+from payload_schema import BatchMoves, GameIds, Move, NewGame, NewGames
+from game_events import LOBBY, FeedMessage, GameEvents, Subscriber
+from game_objects import GameState, TwoPlayerGame
+from game_store import GameStore, make_game_store
+from move_log import AnyMoveLog
+from response_cache import FrozenGame, ResponseCache, frozen_size_bound
+
+
+# Longest a GET .../moves?wait= request is parked, in seconds
+MAX_WAIT: float = 60
+# Parked requests also look at their game this often, since a move made
+# by another worker process notifies nobody here
+RECHECK_INTERVAL: float = 1
+# Seconds between comments sent on an idle lobby stream, so that proxies
+# don't time it out
+LOBBY_KEEP_ALIVE: float = 15
+# Longer move ranges are streamed, this many moves per chunk
+MOVES_PER_CHUNK: int = 1024
+# Total size of the responses of finished games kept in memory
+RESPONSE_CACHE_BYTES: int = int(
+    os.environ.get('RESPONSE_CACHE_BYTES', 64 * 2 ** 20),
 )
-from payload_schema import Move, NewGame
-from game_objects import TwoPlayerGame
 
+# orjson, when installed, serializes payloads faster and to the same bytes
+PayloadResponse: Type[JSONResponse] = (
+    JSONResponse if orjson is None else ORJSONResponse
+)
 
-games: Dict[str, TwoPlayerGame] = {}
+games: GameStore = make_game_store()
+game_events: GameEvents = GameEvents()
+response_cache: ResponseCache = ResponseCache(RESPONSE_CACHE_BYTES)
 app: FastAPI = FastAPI()
 
 @app.on_event('shutdown')
 def clear_in_memory_state():
-    games.clear()
+    games.close()
+    response_cache.clear()
 
 @app.exception_handler(RequestValidationError)
 def override_fastapi_default_422_response_with_400_on_invalid_payloads(
     request: Request,
     exception: RequestValidationError,
 ) -> None:
-    return JSONResponse(
+    return PayloadResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={'detail': exception.errors()},
     )
 
-@app.get('/drop_token')
-def get_all_in_progress_games() -> JSONResponse:
-    ids_of_games_in_progress: List[str] = [
-        game_id for game_id in games if games[game_id].state == 'IN_PROGRESS'
+def etag_of(game: TwoPlayerGame) -> str:
+    return f'"{game.version()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    if if_none_match is None:
+        return False
+    candidates: List[str] = [
+        candidate.strip() for candidate in if_none_match.split(',')
     ]
-    payload: Dict[str, List[str]] = {'games': ids_of_games_in_progress}
-    return JSONResponse(content=payload)
+    return '*' in candidates or any(
+        candidate.replace('W/', '', 1) == etag for candidate in candidates
+    )
 
-@app.get('/drop_token/{game_id}')
-def get_game(game_id: str) -> JSONResponse:
-    if game_id not in games:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Game not found.',
-        )
-    this_game: TwoPlayerGame = games[game_id]
-    if this_game.state == 'DONE':
-        payload: Dict[str, Union[List[str], str]] = {
-            'players': this_game.original_players,
-            'state': this_game.state,
-            'winner': this_game.winner,
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={'ETag': etag},
+    )
+
+def game_payload(game: TwoPlayerGame) -> Dict[str, Union[List[str], str]]:
+    if game.state == GameState.DONE:
+        return {
+            'players': list(game.players),
+            'state': game.state.value,
+            'winner': game.winner,
         }
-        return JSONResponse(content=payload)
-    payload: Dict[str, Union[List[str], str]] = {
-        'players': this_game.original_players,
-        'state': this_game.state,
+    return {
+        'players': list(game.players),
+        'state': game.state.value,
     }
-    return JSONResponse(content=payload)
 
-@app.post('/drop_token')
-def create_new_game(new_game: NewGame) -> JSONResponse:
-    win_condition: int = int(os.environ['WIN_CONDITION'], 10)
-    uuid_4: str = str(uuid.uuid4())
-    games[uuid_4] = TwoPlayerGame(uuid_4, new_game, win_condition)
-    payload: Dict[str, str] = {'gameId': uuid_4}
-    return JSONResponse(content=payload)
+def to_json(payload: Dict[str, Any]) -> str:
+    # As PayloadResponse serializes
+    if orjson is not None:
+        return orjson.dumps(payload).decode('utf-8')
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
 
-@app.post('/drop_token/{game_id}/{player_id}')
-def make_a_move(game_id: str, player_id: str, move: Move) -> JSONResponse:
-    if game_id not in games:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Game not found.',
+def moves_chunks(
+    move_log: Union[FrozenGame, AnyMoveLog],
+    slice_start: int,
+    slice_end: int,
+) -> Iterator[bytes]:
+    # The body of moves_response, MOVES_PER_CHUNK moves at a time, so a
+    # long range is never held in memory whole. Moves are only appended,
+    # so the range stays valid while the game goes on.
+    separator: bytes = b'{"moves":['
+    for chunk_start in range(slice_start, slice_end, MOVES_PER_CHUNK):
+        chunk_end: int = min(chunk_start + MOVES_PER_CHUNK, slice_end)
+        yield separator + move_log.join_range(chunk_start, chunk_end)
+        separator = b','
+    yield b']}'
+
+def json_response(content: bytes, etag: Optional[str] = None) -> Response:
+    # For payloads that are already JSON
+    return Response(
+        content=content,
+        media_type='application/json',
+        headers=None if etag is None else {'ETag': etag},
+    )
+
+def moves_response(moves_json: bytes, etag: str) -> Response:
+    return json_response(b'{"moves":' + moves_json + b'}', etag)
+
+def can_freeze(game: TwoPlayerGame) -> bool:
+    return game.state == GameState.DONE and response_cache.max_bytes > 0
+
+def freeze(game: TwoPlayerGame) -> Optional[FrozenGame]:
+    # The first read of a finished game caches its responses for good.
+    # A game too big for the cache is not frozen at all, and keeps being
+    # served from its move log.
+    status_json: bytes = to_json(game_payload(game)).encode('utf-8')
+    size_bound: int = frozen_size_bound(
+        len(status_json),
+        game.num_moves(),
+        max(map(len, game.moves.fragments.values()), default=0),
+    )
+    if size_bound > response_cache.max_bytes:
+        return None
+    frozen: FrozenGame = FrozenGame(
+        etag_of(game),
+        status_json,
+        [
+            game.moves.get_json(move_number)
+            for move_number in range(game.num_moves())
+        ],
+    )
+    response_cache.put(game.game_id, frozen)
+    return frozen
+
+def feed_messages(game: TwoPlayerGame, first_move: int) -> List[FeedMessage]:
+    # Moves from first_move on, then the outcome once the game is over,
+    # serialized once for all spectators. The state is read first, so a
+    # game finishing meanwhile never gets an outcome without its last move.
+    done: bool = game.state == GameState.DONE
+    messages: List[FeedMessage] = [
+        (
+            move_number,
+            to_json({**game.get_move(move_number), 'moveNumber': move_number}),
         )
-    this_game: TwoPlayerGame = games[game_id]
+        for move_number in range(first_move, game.num_moves())
+    ]
+    if done:
+        outcome: Dict[str, Optional[str]] = {
+            'state': game.state.value,
+            'winner': game.winner,
+        }
+        messages.append((None, to_json(outcome)))
+    return messages
+
+def lobby_message(event: str, data: Dict[str, Any]) -> FeedMessage:
+    return (None, f'event: {event}\ndata: {to_json(data)}\n\n')
+
+@app.get('/drop_token')
+def get_all_in_progress_games(
+    limit: Optional[int] = Query(None, gt=0),
+    after: Optional[str] = None,
+) -> JSONResponse:
     try:
-        move_number: int = this_game.make_move(player_id, move.column)
-        payload: Dict[str, str] = {'move': f'{game_id}/moves/{move_number}'}
-        return JSONResponse(content=payload)
-    except PlayerNotFoundException as error:
+        ids_of_games_in_progress: List[str] = games.in_progress(limit, after)
+    except GameNotFoundException as error:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'{error}',
         )
-    except IllegalTurnException as error:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f'{error}',
+    payload: Dict[str, List[str]] = {'games': ids_of_games_in_progress}
+    return PayloadResponse(content=payload)
+
+@app.get('/drop_token/events')
+async def follow_lobby() -> StreamingResponse:
+    # Server-sent events: a snapshot of the games in progress, then
+    # game-created, player-quit and game-finished as they happen. A game
+    # created while the snapshot is taken may show up in both.
+    subscriber: Subscriber = game_events.add_subscriber(LOBBY)
+    try:
+        ids_of_games_in_progress: List[str] = await run_in_threadpool(
+            games.in_progress,
         )
-    except (
-        GameCompletedException,
-        ColumnOutOfBoundsException,
-        ColumnFullException,
-    ) as error:
+    except BaseException:
+        game_events.remove_subscriber(LOBBY, subscriber)
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        # Cancelled by StreamingResponse when the client goes away
+        try:
+            yield lobby_message(
+                'snapshot',
+                {'games': ids_of_games_in_progress},
+            )[1]
+            while True:
+                try:
+                    message: Optional[FeedMessage] = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        LOBBY_KEEP_ALIVE,
+                    )
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if message is None:
+                    # Too far behind: reconnecting starts from a snapshot
+                    return
+                yield message[1]
+        finally:
+            game_events.remove_subscriber(LOBBY, subscriber)
+
+    return StreamingResponse(events(), media_type='text/event-stream')
+
+@app.get('/drop_token/{game_id}')
+def get_game(
+    game_id: str,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    frozen: Optional[FrozenGame] = response_cache.get(game_id)
+    if frozen is None:
+        try:
+            this_game: TwoPlayerGame = games.get(game_id)
+        except GameNotFoundException as error:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'{error}',
+            )
+        if can_freeze(this_game):
+            frozen = freeze(this_game)
+    if frozen is not None:
+        if etag_matches(if_none_match, frozen.etag):
+            return not_modified(frozen.etag)
+        return json_response(frozen.status_json, frozen.etag)
+    etag: str = etag_of(this_game)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return PayloadResponse(
+        content=game_payload(this_game),
+        headers={'ETag': etag},
+    )
+
+CREATE_ERROR_STATUSES: Dict[Type[Exception], int] = {
+    GameTooLargeException: status.HTTP_400_BAD_REQUEST,
+    StoreFullException: status.HTTP_507_INSUFFICIENT_STORAGE,
+}
+
+@app.post('/drop_token')
+def create_new_game(
+    new_game: NewGame,
+    x_game_id: Optional[str] = Header(None),
+) -> JSONResponse:
+    win_condition: int = int(os.environ['WIN_CONDITION'], 10)
+    board_engine: str = os.environ.get('BOARD_ENGINE', 'list')
+    move_log_dir: Optional[str] = os.environ.get('MOVE_LOG_DIR')
+    uuid_4: str = str(uuid.uuid4())
+    if x_game_id is not None and 'SHARD_WORKER' in os.environ:
+        # The front of a sharded deployment picks IDs that hash to us
+        uuid_4 = str(uuid.UUID(x_game_id))
+    try:
+        games.add(TwoPlayerGame(
+            uuid_4,
+            new_game,
+            win_condition,
+            board_engine,
+            move_log_dir,
+        ))
+    except tuple(CREATE_ERROR_STATUSES) as error:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=CREATE_ERROR_STATUSES[type(error)],
             detail=f'{error}',
         )
+    if game_events.has_subscribers(LOBBY):
+        game_events.publish(LOBBY, [lobby_message(
+            'game-created',
+            {'gameId': uuid_4, 'players': new_game.players},
+        )])
+    payload: Dict[str, str] = {'gameId': uuid_4}
+    return PayloadResponse(content=payload)
 
-@app.delete('/drop_token/{game_id}/{player_id}')
-def player_quits(game_id: str, player_id: str) -> JSONResponse:
-    if game_id not in games:
+def bulk_game_ids(count: int) -> List[str]:
+    # Random UUID4s cut from one os.urandom read rather than one per game
+    random_bytes: bytes = os.urandom(16 * count)
+    return [
+        str(uuid.UUID(bytes=random_bytes[offset:offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
+
+@app.post('/drop_token/batch/games')
+def create_new_games(batch: NewGames) -> JSONResponse:
+    # Settings are read once, and the games handed to the store together
+    win_condition: int = int(os.environ['WIN_CONDITION'], 10)
+    board_engine: str = os.environ.get('BOARD_ENGINE', 'list')
+    move_log_dir: Optional[str] = os.environ.get('MOVE_LOG_DIR')
+    if batch.game_ids is not None and 'SHARD_WORKER' in os.environ:
+        # The front of a sharded deployment picks IDs that hash to us
+        game_ids: List[str] = [
+            str(uuid.UUID(game_id)) for game_id in batch.game_ids
+        ]
+    else:
+        game_ids = bulk_game_ids(len(batch.games))
+    try:
+        games.add_many([
+            TwoPlayerGame(
+                game_id,
+                new_game,
+                win_condition,
+                board_engine,
+                move_log_dir,
+            )
+            for game_id, new_game in zip(game_ids, batch.games)
+        ])
+    except tuple(CREATE_ERROR_STATUSES) as error:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Game not found.',
+            status_code=CREATE_ERROR_STATUSES[type(error)],
+            detail=f'{error}',
         )
-    this_game: TwoPlayerGame = games[game_id]
-    try:
+    if game_events.has_subscribers(LOBBY):
+        game_events.publish(LOBBY, [
+            lobby_message(
+                'game-created',
+                {'gameId': game_id, 'players': new_game.players},
+            )
+            for game_id, new_game in zip(game_ids, batch.games)
+        ])
+    payload: Dict[str, List[str]] = {'gameIds': game_ids}
+    return PayloadResponse(content=payload)
+
+def play_move(game_id: str, player_id: str, column: int) -> int:
+    with games.update(game_id) as this_game:
+        move_number: int = this_game.make_move(player_id, column)
+        messages: List[FeedMessage] = []
+        if game_events.has_subscribers(game_id):
+            messages = feed_messages(this_game, move_number)
+        lobby_messages: List[FeedMessage] = []
+        finished: bool = this_game.state == GameState.DONE
+        if finished and game_events.has_subscribers(LOBBY):
+            lobby_messages.append(lobby_message(
+                'game-finished',
+                {'gameId': game_id, 'winner': this_game.winner},
+            ))
+    game_events.notify(game_id)
+    game_events.publish(game_id, messages)
+    game_events.publish(LOBBY, lobby_messages)
+    return move_number
+
+def quit_game(game_id: str, player_id: str) -> None:
+    with games.update(game_id) as this_game:
         this_game.delete_player(player_id)
-        return JSONResponse(status_code=status.HTTP_202_ACCEPTED)
-    except PlayerNotFoundException as error:
+        messages: List[FeedMessage] = []
+        if game_events.has_subscribers(game_id):
+            messages = feed_messages(this_game, this_game.num_moves() - 1)
+        lobby_messages: List[FeedMessage] = []
+        if game_events.has_subscribers(LOBBY):
+            lobby_messages = [
+                lobby_message(
+                    'player-quit',
+                    {'gameId': game_id, 'player': player_id},
+                ),
+                lobby_message(
+                    'game-finished',
+                    {'gameId': game_id, 'winner': this_game.winner},
+                ),
+            ]
+    game_events.notify(game_id)
+    game_events.publish(game_id, messages)
+    game_events.publish(LOBBY, lobby_messages)
+
+# Shared by the single and the batch endpoints
+MOVE_ERROR_STATUSES: Dict[Type[Exception], int] = {
+    GameNotFoundException: status.HTTP_404_NOT_FOUND,
+    PlayerNotFoundException: status.HTTP_404_NOT_FOUND,
+    IllegalTurnException: status.HTTP_409_CONFLICT,
+    GameCompletedException: status.HTTP_400_BAD_REQUEST,
+    ColumnOutOfBoundsException: status.HTTP_400_BAD_REQUEST,
+    ColumnFullException: status.HTTP_400_BAD_REQUEST,
+}
+QUIT_ERROR_STATUSES: Dict[Type[Exception], int] = {
+    GameNotFoundException: status.HTTP_404_NOT_FOUND,
+    PlayerNotFoundException: status.HTTP_404_NOT_FOUND,
+    GameCompletedException: status.HTTP_410_GONE,
+}
+
+@app.post('/drop_token/batch/moves')
+def make_moves(batch: BatchMoves) -> JSONResponse:
+    # Moves and quits applied in order, each answered as its own endpoint
+    # would: a status, plus the move or the error detail
+    results: List[Dict[str, Union[int, str]]] = []
+    for item in batch.moves:
+        try:
+            if item.type == 'QUIT':
+                quit_game(item.game_id, item.player_id)
+                results.append({'status': status.HTTP_202_ACCEPTED})
+                continue
+            move_number: int = play_move(
+                item.game_id,
+                item.player_id,
+                item.column,
+            )
+            results.append({
+                'status': status.HTTP_200_OK,
+                'move': f'{item.game_id}/moves/{move_number}',
+            })
+        except tuple(MOVE_ERROR_STATUSES) as error:
+            error_statuses: Dict[Type[Exception], int] = (
+                QUIT_ERROR_STATUSES if item.type == 'QUIT'
+                else MOVE_ERROR_STATUSES
+            )
+            results.append({
+                'status': error_statuses[type(error)],
+                'detail': f'{error}',
+            })
+    payload: Dict[str, List[Dict[str, Union[int, str]]]] = {
+        'results': results,
+    }
+    return PayloadResponse(content=payload)
+
+@app.post('/drop_token/batch/status')
+def get_games(batch: GameIds) -> JSONResponse:
+    # Each game as GET /drop_token/{gameId} would return it, with a status
+    results: List[Dict[str, Union[int, List[str], str]]] = []
+    for game_id in batch.game_ids:
+        try:
+            this_game: TwoPlayerGame = games.get(game_id)
+        except GameNotFoundException as error:
+            results.append({
+                'status': status.HTTP_404_NOT_FOUND,
+                'detail': f'{error}',
+            })
+            continue
+        results.append({
+            'status': status.HTTP_200_OK,
+            **game_payload(this_game),
+        })
+    payload: Dict[str, List[Dict[str, Union[int, List[str], str]]]] = {
+        'results': results,
+    }
+    return PayloadResponse(content=payload)
+
+@app.post('/drop_token/{game_id}/{player_id}')
+def make_a_move(game_id: str, player_id: str, move: Move) -> JSONResponse:
+    try:
+        move_number: int = play_move(game_id, player_id, move.column)
+    except tuple(MOVE_ERROR_STATUSES) as error:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=MOVE_ERROR_STATUSES[type(error)],
             detail=f'{error}',
         )
-    except GameCompletedException as error:
+    payload: Dict[str, str] = {'move': f'{game_id}/moves/{move_number}'}
+    return PayloadResponse(content=payload)
+
+@app.delete('/drop_token/{game_id}/{player_id}')
+def player_quits(game_id: str, player_id: str) -> JSONResponse:
+    try:
+        quit_game(game_id, player_id)
+    except tuple(QUIT_ERROR_STATUSES) as error:
         raise HTTPException(
-            status_code=status.HTTP_410_GONE,
+            status_code=QUIT_ERROR_STATUSES[type(error)],
             detail=f'{error}',
         )
+    return PayloadResponse(status_code=status.HTTP_202_ACCEPTED)
 
-@app.get('/drop_token/{game_id}/moves')
-def get_moves(
+def moves_answer(
     game_id: str,
-    start: Optional[int] = None,
-    until: Optional[int] = None,
-) -> JSONResponse:
-    if game_id not in games:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Game not found.',
+    start: Optional[int],
+    until: Optional[int],
+    after: Optional[int],
+    if_none_match: Optional[str],
+    may_wait: bool,
+) -> Optional[Response]:
+    # The answer to GET .../moves, or None while a request with `after`
+    # may still wait for moves. Run in the threadpool, since it reads the
+    # store and the move log and encodes the moves.
+    # A finished game is answered from its frozen responses
+    frozen: Optional[FrozenGame] = response_cache.get(game_id)
+    if frozen is None:
+        try:
+            this_game: TwoPlayerGame = games.get(game_id)
+        except GameNotFoundException as error:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'{error}',
+            )
+        keep_waiting: bool = (
+            may_wait
+            and after is not None
+            and this_game.num_moves() <= after + 1
+            and this_game.state != GameState.DONE
         )
-    this_game: TwoPlayerGame = games[game_id]
+        if keep_waiting:
+            return None
+        if can_freeze(this_game):
+            frozen = freeze(this_game)
+    if frozen is not None:
+        source: Union[FrozenGame, TwoPlayerGame] = frozen
+        etag: str = frozen.etag
+    else:
+        source = this_game
+        etag = etag_of(this_game)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if after is not None and source.num_moves() <= after + 1:
+        return moves_response(b'[]', etag)
     try:
-        moves_sublist: List[Dict[str, Union[int, str]]] = this_game.get_moves(
-            start,
+        slice_start, slice_end = source.move_slice(
+            start if after is None else after + 1,
             until,
         )
-        payload: Dict[str, List[Dict[str, Union[int, str]]]] = {
-            'moves': moves_sublist,
-        }
-        return JSONResponse(content=payload)
     except FetchMoveException as error:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'{error}',
         )
+    if frozen is not None and slice_end - slice_start == frozen.num_moves():
+        return json_response(frozen.moves_json, etag)
+    # The range is not empty, so the game's move log already exists
+    move_log: Union[FrozenGame, AnyMoveLog] = (
+        frozen if frozen is not None else this_game.moves
+    )
+    if slice_end - slice_start <= MOVES_PER_CHUNK:
+        return moves_response(
+            move_log.get_range_json(slice_start, slice_end),
+            etag,
+        )
+    return StreamingResponse(
+        moves_chunks(move_log, slice_start, slice_end),
+        media_type='application/json',
+        headers={'ETag': etag},
+    )
 
-@app.get('/drop_token/{game_id}/moves/{move_number}')
-def get_moves(game_id: str, move_number: int) -> JSONResponse:
-    if game_id not in games:
+@app.get('/drop_token/{game_id}/moves')
+async def get_moves(
+    game_id: str,
+    start: Optional[int] = None,
+    until: Optional[int] = None,
+    after: Optional[int] = Query(None, ge=-1),
+    wait: float = Query(0, ge=0, le=MAX_WAIT),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    # With `after`, only the moves after move number `after` are listed,
+    # and the request is parked for up to `wait` seconds until there are
+    # some or the game is over. Only the parking happens on the event loop.
+    if after is not None and (start is not None or until is not None):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail='Game not found.',
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Use either after or start and until.',
         )
-    this_game: TwoPlayerGame = games[game_id]
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    deadline: float = loop.time() + wait
+    while True:
+        waiter: asyncio.Future = game_events.subscribe(game_id)
+        try:
+            remaining: float = deadline - loop.time()
+            answer: Optional[Response] = await run_in_threadpool(
+                moves_answer,
+                game_id,
+                start,
+                until,
+                after,
+                if_none_match,
+                remaining > 0,
+            )
+            if answer is not None:
+                return answer
+            await asyncio.wait(
+                [waiter],
+                timeout=min(remaining, RECHECK_INTERVAL),
+            )
+        finally:
+            game_events.unsubscribe(game_id, waiter)
+
+@app.get('/drop_token/{game_id}/moves/{move_number}')
+def get_moves(game_id: str, move_number: int) -> Response:
+    source: Optional[Union[FrozenGame, TwoPlayerGame]] = response_cache.get(
+        game_id,
+    )
+    if source is None:
+        try:
+            source = games.get(game_id)
+        except GameNotFoundException as error:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f'{error}',
+            )
+        if can_freeze(source):
+            source = freeze(source) or source
     try:
-        move: Dict[str, Union[int, str]] = this_game.get_move(move_number)
-        return JSONResponse(content=move)
+        move_json: bytes = source.get_move_json(move_number)
+        return json_response(move_json)
     except FetchMoveException as error:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'{error}',
         )
+
+@app.websocket('/drop_token/{game_id}/ws')
+async def spectate(websocket: WebSocket, game_id: str) -> None:
+    # Sends the moves so far, then every new move as it is made, then the
+    # outcome, and closes. A spectator too slow to keep up is dropped.
+    subscriber: Subscriber = game_events.add_subscriber(game_id)
+    try:
+        try:
+            this_game: TwoPlayerGame = await run_in_threadpool(
+                games.get,
+                game_id,
+            )
+        except GameNotFoundException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        await websocket.accept()
+        # The game may change while the snapshot is built, so what was sent
+        # is told from the snapshot itself
+        snapshot: List[FeedMessage] = feed_messages(this_game, 0)
+        moves_sent: int = sum(
+            move_number is not None for move_number, _ in snapshot
+        )
+        for _, message in snapshot:
+            await websocket.send_text(message)
+        if snapshot and snapshot[-1][0] is None:
+            await websocket.close()
+            return
+        # Spectators only listen, but that is how a disconnect shows up
+        receiving: asyncio.Future = asyncio.ensure_future(websocket.receive())
+        try:
+            while True:
+                getting: asyncio.Future = asyncio.ensure_future(
+                    subscriber.queue.get(),
+                )
+                await asyncio.wait(
+                    [getting, receiving],
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getting.done():
+                    feed_message: Optional[FeedMessage] = getting.result()
+                    if feed_message is None:
+                        await websocket.close(
+                            code=status.WS_1008_POLICY_VIOLATION,
+                        )
+                        return
+                    move_number, message = feed_message
+                    if move_number is None or move_number >= moves_sent:
+                        await websocket.send_text(message)
+                    if move_number is None:
+                        await websocket.close()
+                        return
+                else:
+                    getting.cancel()
+                if receiving.done():
+                    if receiving.result()['type'] == 'websocket.disconnect':
+                        return
+                    receiving = asyncio.ensure_future(websocket.receive())
+        finally:
+            receiving.cancel()
+    finally:
+        game_events.remove_subscriber(game_id, subscriber)
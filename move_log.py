@@ -0,0 +1,367 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+
+# Each move is one entry of `columns` plus one byte of `kinds`:
+# bit 0 is the player index and bit 1 is set for a QUIT.
+QUIT_FLAG: int = 0b10
+# MmapMoveLog's fixed-size record: column, then the same kind byte
+MOVE_RECORD: struct.Struct = struct.Struct('<qB')
+
+# A move's JSON only depends on its column and kind, so each log encodes
+# every distinct (column, kind) once, when it is first appended, and JSON
+# for any range of moves is those cached fragments joined together.
+Fragments = Dict[Tuple[int, int], bytes]
+
+# Most MmapMoveLogs mapped at once, per process
+MAPPED_LOGS_LIMIT: int = 64
+# The mapped ones by id(), least recently used first
+mapped_logs: OrderedDict = OrderedDict()
+# Held while mapping, unmapping or using any MmapMoveLog's mapping
+mapped_logs_lock: threading.Lock = threading.Lock()
+
+
+def move_as_dict(
+    players: Sequence[str],
+    kind: int,
+    column: int,
+) -> Dict[str, Union[int, str]]:
+    player: str = players[kind & 1]
+    if kind & QUIT_FLAG:
+        return {'type': 'QUIT', 'player': player}
+    return {'type': 'MOVE', 'player': player, 'column': column}
+
+
+def encode_move(players: Sequence[str], kind: int, column: int) -> bytes:
+    # As JSONResponse serializes
+    return json.dumps(
+        move_as_dict(players, kind, column),
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode('utf-8')
+
+
+def cache_fragment(
+    fragments: Fragments,
+    players: Sequence[str],
+    column: int,
+    kind: int,
+) -> None:
+    if (column, kind) not in fragments:
+        fragments[column, kind] = encode_move(players, kind, column)
+
+
+def sync_file(path: str) -> None:
+    file_fd: int = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(file_fd)
+    finally:
+        os.close(file_fd)
+
+
+class MoveLog:
+    __slots__ = (
+        'players',
+        'columns',
+        'kinds',
+        'fragments',
+    )
+
+    def __init__(self, players: Sequence[str]) -> None:
+        self.players: Sequence[str] = players
+        self.columns: array = array('q')
+        self.kinds: bytearray = bytearray()
+        self.fragments: Fragments = {}
+
+    def __getstate__(self) -> Tuple[Sequence[str], array, bytearray]:
+        # Fragments are re-encoded on load rather than kept in snapshots
+        return self.players, self.columns, self.kinds
+
+    def __setstate__(
+        self,
+        state: Tuple[Sequence[str], array, bytearray],
+    ) -> None:
+        self.players, self.columns, self.kinds = state
+        self.fragments = {}
+        for column, kind in set(zip(self.columns, self.kinds)):
+            cache_fragment(self.fragments, self.players, column, kind)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def detach(self) -> None:
+        # Already in memory
+        pass
+
+    def remove(self) -> None:
+        pass
+
+    def copy(self) -> 'MoveLog':
+        # The moves so far, unaffected by later appends
+        copied: MoveLog = MoveLog.__new__(MoveLog)
+        copied.players = self.players
+        copied.columns = array('q', self.columns)
+        copied.kinds = bytearray(self.kinds)
+        copied.fragments = dict(self.fragments)
+        return copied
+
+    def append_move(self, player_index: int, column: int) -> None:
+        self.columns.append(column)
+        self.kinds.append(player_index)
+        cache_fragment(self.fragments, self.players, column, player_index)
+
+    def append_quit(self, player_index: int) -> None:
+        kind: int = player_index | QUIT_FLAG
+        self.columns.append(-1)
+        self.kinds.append(kind)
+        cache_fragment(self.fragments, self.players, -1, kind)
+
+    def entry(self, move_index: int) -> Tuple[int, bool, int]:
+        # (player index, is a quit, column) without building a dict
+        kind: int = self.kinds[move_index]
+        return kind & 1, bool(kind & QUIT_FLAG), self.columns[move_index]
+
+    def get(self, move_index: int) -> Dict[str, Union[int, str]]:
+        # Dicts are only built for the moves asked for
+        return move_as_dict(
+            self.players,
+            self.kinds[move_index],
+            self.columns[move_index],
+        )
+
+    def get_range(
+        self,
+        start: int,
+        end: int,
+    ) -> List[Dict[str, Union[int, str]]]:
+        return [self.get(move_index) for move_index in range(start, end)]
+
+    def get_json(self, move_index: int) -> bytes:
+        return self.fragments[
+            self.columns[move_index],
+            self.kinds[move_index],
+        ]
+
+    def join_range(self, start: int, end: int) -> bytes:
+        # The moves' JSON, comma-separated, copied from the cached fragments
+        fragments: Iterator[bytes] = map(
+            self.fragments.__getitem__,
+            zip(self.columns[start:end], self.kinds[start:end]),
+        )
+        return b','.join(fragments)
+
+    def get_range_json(self, start: int, end: int) -> bytes:
+        return b'[' + self.join_range(start, end) + b']'
+
+
+class MmapMoveLog:
+    # Same interface as MoveLog, backed by a file of fixed-size records
+    # mapped into memory. Long histories stay out of the Python heap and the
+    # OS page cache decides what is resident. The file grows by doubling.
+    #
+    # Only the MAPPED_LOGS_LIMIT most recently used logs of the process
+    # stay mapped, one file descriptor each; the others are mapped again
+    # on their next use. Once detached, a log's records are held in memory
+    # instead, and its file is no longer needed.
+    __slots__ = (
+        'players',
+        'path',
+        'mapping',
+        'records',
+        'length',
+        'fragments',
+    )
+
+    INITIAL_CAPACITY: int = 256
+
+    def __init__(self, players: Sequence[str], path: str) -> None:
+        self.players: Sequence[str] = players
+        self.path: str = path
+        self.length: int = 0
+        self.fragments: Fragments = {}
+        self.mapping: Optional[mmap.mmap] = None
+        self.records: Optional[bytes] = None
+        with open(path, 'wb') as log_file:
+            log_file.truncate(self.INITIAL_CAPACITY * MOVE_RECORD.size)
+
+    def __getstate__(
+        self,
+    ) -> Tuple[Sequence[str], str, int, Optional[bytes]]:
+        # The records are already on disk; only where to find them is kept,
+        # unless the log was detached from its file. The file is synced
+        # without holding mapped_logs_lock, which every read takes; fsync
+        # also writes back what was written through a mapping.
+        with mapped_logs_lock:
+            length: int = self.length
+            records: Optional[bytes] = self.records
+        if records is None:
+            try:
+                sync_file(self.path)
+            except FileNotFoundError:
+                # Unless it was detached and removed in the meantime
+                with mapped_logs_lock:
+                    if self.records is None:
+                        raise
+                    records = self.records
+        return self.players, self.path, length, records
+
+    def __setstate__(
+        self,
+        state: Tuple[Sequence[str], str, int, Optional[bytes]],
+    ) -> None:
+        self.players, self.path, self.length, self.records = state
+        self.mapping = None
+        # Rebuilt once the records are read
+        self.fragments = {}
+        if self.records is not None:
+            self.cache_fragments(self.records)
+
+    def cache_fragments(self, records: bytes) -> None:
+        for column, kind in set(MOVE_RECORD.iter_unpack(records)):
+            cache_fragment(self.fragments, self.players, column, kind)
+
+    @contextmanager
+    def mapped(self) -> Iterator[Union[mmap.mmap, bytes]]:
+        # The records, mapped again if they were unmapped, for the duration
+        # of the block
+        with mapped_logs_lock:
+            if self.records is not None:
+                yield self.records
+                return
+            if self.mapping is None:
+                with open(self.path, 'r+b') as log_file:
+                    self.mapping = mmap.mmap(log_file.fileno(), 0)
+                if self.length and not self.fragments:
+                    self.cache_fragments(
+                        self.mapping[:self.length * MOVE_RECORD.size],
+                    )
+                mapped_logs[id(self)] = self
+                while len(mapped_logs) > MAPPED_LOGS_LIMIT:
+                    _, unmapped = mapped_logs.popitem(last=False)
+                    unmapped.unmap()
+            else:
+                mapped_logs.move_to_end(id(self))
+            yield self.mapping
+
+    def unmap(self) -> None:
+        # Caller holds mapped_logs_lock
+        self.mapping.close()
+        self.mapping = None
+
+    def detach(self) -> None:
+        # Moves the records into memory and lets go of the file
+        with self.mapped() as records:
+            if self.records is None:
+                self.records = records[:self.length * MOVE_RECORD.size]
+                del mapped_logs[id(self)]
+                self.unmap()
+
+    def remove(self) -> None:
+        # Detached first, so that readers still holding the log are fine
+        self.detach()
+        os.remove(self.path)
+
+    def copy(self) -> 'MmapMoveLog':
+        # Shares the file; later appends land past the copy's length
+        copied: MmapMoveLog = MmapMoveLog.__new__(MmapMoveLog)
+        copied.players = self.players
+        copied.path = self.path
+        copied.mapping = None
+        copied.records = self.records
+        copied.length = self.length
+        copied.fragments = dict(self.fragments)
+        return copied
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, kind: int, column: int) -> None:
+        with self.mapped() as mapping:
+            offset: int = self.length * MOVE_RECORD.size
+            if offset + MOVE_RECORD.size > len(mapping):
+                mapping.resize(2 * len(mapping))
+            MOVE_RECORD.pack_into(mapping, offset, column, kind)
+            self.length += 1
+            cache_fragment(self.fragments, self.players, column, kind)
+
+    def append_move(self, player_index: int, column: int) -> None:
+        self.append(player_index, column)
+
+    def append_quit(self, player_index: int) -> None:
+        self.append(player_index | QUIT_FLAG, -1)
+
+    def record(self, move_index: int) -> Tuple[int, int]:
+        # (column, kind) of one move
+        with self.mapped() as mapping:
+            return MOVE_RECORD.unpack_from(
+                mapping,
+                move_index * MOVE_RECORD.size,
+            )
+
+    def record_range(self, start: int, end: int) -> bytes:
+        with self.mapped() as mapping:
+            return mapping[start * MOVE_RECORD.size:end * MOVE_RECORD.size]
+
+    def entry(self, move_index: int) -> Tuple[int, bool, int]:
+        column, kind = self.record(move_index)
+        return kind & 1, bool(kind & QUIT_FLAG), column
+
+    def get(self, move_index: int) -> Dict[str, Union[int, str]]:
+        column, kind = self.record(move_index)
+        return move_as_dict(self.players, kind, column)
+
+    def get_range(
+        self,
+        start: int,
+        end: int,
+    ) -> List[Dict[str, Union[int, str]]]:
+        # One slice of the records, unpacked record by record
+        return [
+            move_as_dict(self.players, kind, column)
+            for column, kind in MOVE_RECORD.iter_unpack(
+                self.record_range(start, end),
+            )
+        ]
+
+    def get_json(self, move_index: int) -> bytes:
+        return self.fragments[self.record(move_index)]
+
+    def join_range(self, start: int, end: int) -> bytes:
+        # Records unpack straight into fragment keys
+        fragments: Iterator[bytes] = map(
+            self.fragments.__getitem__,
+            MOVE_RECORD.iter_unpack(self.record_range(start, end)),
+        )
+        return b','.join(fragments)
+
+    def get_range_json(self, start: int, end: int) -> bytes:
+        return b'[' + self.join_range(start, end) + b']'
+
+
+AnyMoveLog = Union[MoveLog, MmapMoveLog]
+
+
+def make_move_log(
+    players: Sequence[str],
+    game_id: str,
+    directory: Optional[str] = None,
+) -> AnyMoveLog:
+    # In the heap by default, or in DIRECTORY/<game_id>.moves
+    if directory is None:
+        return MoveLog(players)
+    return MmapMoveLog(players, os.path.join(directory, f'{game_id}.moves'))
@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, root_validator, validator
 from pydantic.main import ModelMetaclass
 
 
@@ -36,3 +36,72 @@ class NewGame(BaseModel):
         if not rows > 0:
             raise ValueError('must be greater than 0')
         return rows
+
+
+# Most items one batch request may hold
+MAX_BATCH_SIZE: int = 1000
+# Most games one bulk creation may hold
+MAX_BULK_GAMES: int = 100_000
+
+class BatchMove(BaseModel):
+    game_id: str = Field(..., alias='gameId')
+    player_id: str = Field(..., alias='playerId')
+    type: str = 'MOVE'
+    column: Optional[int] = None
+
+    @validator('type')
+    def type_is_move_or_quit(cls: ModelMetaclass, type: str) -> str:
+        if type not in ('MOVE', 'QUIT'):
+            raise ValueError('must be MOVE or QUIT')
+        return type
+
+    @root_validator(skip_on_failure=True)
+    def move_has_a_column(cls: ModelMetaclass, values: dict) -> dict:
+        if values['type'] == 'MOVE' and values['column'] is None:
+            raise ValueError('a MOVE needs a column')
+        return values
+
+class BatchMoves(BaseModel):
+    moves: List[BatchMove]
+
+    @validator('moves')
+    def moves_is_not_too_long(
+        cls: ModelMetaclass,
+        moves: List[BatchMove],
+    ) -> List[BatchMove]:
+        if len(moves) > MAX_BATCH_SIZE:
+            raise ValueError(f'must hold at most {MAX_BATCH_SIZE} items')
+        return moves
+
+class GameIds(BaseModel):
+    game_ids: List[str] = Field(..., alias='gameIds')
+
+    @validator('game_ids')
+    def game_ids_is_not_too_long(
+        cls: ModelMetaclass,
+        game_ids: List[str],
+    ) -> List[str]:
+        if len(game_ids) > MAX_BATCH_SIZE:
+            raise ValueError(f'must hold at most {MAX_BATCH_SIZE} items')
+        return game_ids
+
+class NewGames(BaseModel):
+    games: List[NewGame]
+    # Only honoured from the front of a sharded deployment
+    game_ids: Optional[List[str]] = Field(None, alias='gameIds')
+
+    @validator('games')
+    def games_is_not_too_long(
+        cls: ModelMetaclass,
+        games: List[NewGame],
+    ) -> List[NewGame]:
+        if len(games) > MAX_BULK_GAMES:
+            raise ValueError(f'must hold at most {MAX_BULK_GAMES} items')
+        return games
+
+    @root_validator(skip_on_failure=True)
+    def one_game_id_per_game(cls: ModelMetaclass, values: dict) -> dict:
+        game_ids: Optional[List[str]] = values['game_ids']
+        if game_ids is not None and len(game_ids) != len(values['games']):
+            raise ValueError('gameIds must hold one ID per game')
+        return values
@@ -0,0 +1,125 @@
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from game_objects import check_move_number, move_slice
+
+
+# Rough cost of a cache entry beyond its bytes, for the size bound
+ENTRY_OVERHEAD: int = 256
+
+
+def frozen_size_bound(
+    status_bytes: int,
+    num_moves: int,
+    longest_fragment: int,
+) -> int:
+    # At least the size() of the FrozenGame of a game with this status and
+    # these moves, told before building it
+    return (
+        status_bytes
+        + len(b'{"moves":[]}')
+        + num_moves * (longest_fragment + 1)
+        + array('q').itemsize * (num_moves + 1)
+        + ENTRY_OVERHEAD
+    )
+
+
+class FrozenGame:
+    # The serialized responses of a finished game, which can't change any
+    # more: its status, and its whole move list as one JSON document with
+    # the offset of each move in it, so that any range of moves is a slice.
+    # Reads like a TwoPlayerGame and its move log at once.
+    __slots__ = (
+        'etag',
+        'status_json',
+        'moves_json',
+        'offsets',
+    )
+
+    def __init__(
+        self,
+        etag: str,
+        status_json: bytes,
+        move_fragments: List[bytes],
+    ) -> None:
+        self.etag: str = etag
+        self.status_json: bytes = status_json
+        self.moves_json: bytes = (
+            b'{"moves":[' + b','.join(move_fragments) + b']}'
+        )
+        # Where each move starts, plus where a move after the last would
+        # start, past its comma
+        self.offsets: array = array('q', accumulate(
+            [len(b'{"moves":[')]
+            + [len(fragment) + 1 for fragment in move_fragments],
+        ))
+
+    def num_moves(self) -> int:
+        return len(self.offsets) - 1
+
+    def size(self) -> int:
+        return (
+            len(self.status_json)
+            + len(self.moves_json)
+            + self.offsets.itemsize * len(self.offsets)
+            + ENTRY_OVERHEAD
+        )
+
+    def move_slice(
+        self,
+        start: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        return move_slice(self.num_moves(), start, until)
+
+    def join_range(self, start: int, end: int) -> bytes:
+        if start == end:
+            return b''
+        return self.moves_json[self.offsets[start]:self.offsets[end] - 1]
+
+    def get_range_json(self, start: int, end: int) -> bytes:
+        return b'[' + self.join_range(start, end) + b']'
+
+    def get_move_json(self, move_index: int) -> bytes:
+        check_move_number(self.num_moves(), move_index)
+        return self.join_range(move_index, move_index + 1)
+
+
+class ResponseCache:
+    # Frozen finished games by ID, least recently used first, evicted once
+    # their total size passes max_bytes. Shared by the threadpool.
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self.total_bytes: int = 0
+        self.entries: OrderedDict = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+    def get(self, game_id: str) -> Optional[FrozenGame]:
+        with self.lock:
+            frozen: Optional[FrozenGame] = self.entries.get(game_id)
+            if frozen is not None:
+                self.entries.move_to_end(game_id)
+            return frozen
+
+    def put(self, game_id: str, frozen: FrozenGame) -> None:
+        # A game bigger than the whole cache is simply not kept
+        size: int = frozen.size()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous: Optional[FrozenGame] = self.entries.pop(game_id, None)
+            if previous is not None:
+                self.total_bytes -= previous.size()
+            self.entries[game_id] = frozen
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.size()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+
+DOCKER_BUILDKIT=1 docker build -t drop-token .
+docker run \
+  -it \
+  -e WIN_CONDITION=4 \
+  --rm drop-token bash -c \
+  'for bench in benchmarks/bench_*.py; do python -m "benchmarks.$(basename "$bench" .py)"; done'
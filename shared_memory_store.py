@@ -0,0 +1,354 @@
+import fcntl
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import BinaryIO, Iterator, List, Optional
+
+import numpy as np
+
+from exceptions import (
+    GameNotFoundException,
+    GameTooLargeException,
+    StoreFullException,
+)
+from game_objects import GameState, TwoPlayerGame
+from game_store import GameStore
+from journal import BOARD_ENGINE_CODES
+from payload_schema import NewGame
+
+
+# Longest game ID a shared-memory record holds: a UUID in text form
+MAX_GAME_ID_BYTES: int = 36
+MAX_PLAYER_BYTES: int = 64
+STATE_CODES: List[GameState] = [GameState.IN_PROGRESS, GameState.DONE]
+
+
+def game_record_dtype(max_cells: int) -> np.dtype:
+    # A move is stored as its column, or as -1 - player index for a quit;
+    # whose move it was follows from the turn order. A game holds at most
+    # one move per cell and one quit.
+    return np.dtype([
+        ('used', 'u1'),
+        ('state', 'u1'),
+        ('board_engine', 'u1'),
+        ('game_id_length', 'u1'),
+        ('game_id', 'u1', (MAX_GAME_ID_BYTES,)),
+        ('player_lengths', 'u2', (2,)),
+        ('players', 'u1', (2, MAX_PLAYER_BYTES)),
+        ('sequence', 'u8'),
+        ('rows', 'u4'),
+        ('columns', 'u4'),
+        ('win_condition', 'u4'),
+        ('num_moves', 'u4'),
+        ('moves', 'i4', (max_cells + 1,)),
+    ])
+
+
+TABLE_HEADER: np.dtype = np.dtype([('next_sequence', 'u8'), ('games', 'u8')])
+
+
+class SharedMemoryGameStore(GameStore):
+    # Games live in a multiprocessing.shared_memory table of fixed-size
+    # records, so every uvicorn worker on the host attaches to the same
+    # games. A game's slot is found by open addressing on its ID, and each
+    # slot has its own lock: a byte-range fcntl lock between processes plus
+    # a striped thread lock, since fcntl locks don't exclude threads.
+    #
+    # A record holds a game's settings and its moves. Each process keeps
+    # TwoPlayerGame objects for up to `cached_games` recently used games,
+    # least recently used dropped first, and brings them up to date by
+    # replaying the moves other processes have added since. A game not
+    # cached is rebuilt from its record.
+    def __init__(
+        self,
+        name: str,
+        capacity: int = 65536,
+        max_cells: int = 256,
+        cached_games: int = 1024,
+    ) -> None:
+        self.name: str = name
+        self.capacity: int = capacity
+        self.max_cells: int = max_cells
+        self.record_dtype: np.dtype = game_record_dtype(max_cells)
+        self.memory: Optional[shared_memory.SharedMemory] = None
+        self.allocation_lock: threading.Lock = threading.Lock()
+        self.slot_locks: List[threading.Lock] = [
+            threading.Lock() for _ in range(64)
+        ]
+        self.cached_games: int = cached_games
+        # TwoPlayerGames by slot, least recently used first
+        self.games: OrderedDict = OrderedDict()
+        self.cache_lock: threading.Lock = threading.Lock()
+        self.attach()
+
+    def attach(self) -> None:
+        # Done again lazily after close(), as SqliteGameStore reconnects
+        with self.allocation_lock:
+            if self.memory is not None:
+                return
+            size: int = (
+                TABLE_HEADER.itemsize
+                + self.capacity * self.record_dtype.itemsize
+            )
+            try:
+                memory: shared_memory.SharedMemory = (
+                    shared_memory.SharedMemory(self.name, True, size)
+                )
+            except FileExistsError:
+                memory = shared_memory.SharedMemory(self.name)
+            # The table outlives any one worker; without this the resource
+            # tracker unlinks it when the process that attached it exits
+            resource_tracker.unregister(memory._name, 'shared_memory')
+            if memory.size < size:
+                memory.close()
+                raise ValueError(f'Shared memory {self.name!r} is too small.')
+            # Views over the shared buffer, nothing is copied
+            self.header: np.ndarray = np.ndarray(
+                (),
+                TABLE_HEADER,
+                memory.buf,
+            )
+            self.records: np.ndarray = np.ndarray(
+                (self.capacity,),
+                self.record_dtype,
+                memory.buf,
+                TABLE_HEADER.itemsize,
+            )
+            # Byte 0 locks slot allocation, byte slot + 1 locks that slot
+            self.lock_file: BinaryIO = open(
+                os.path.join(tempfile.gettempdir(), f'{self.name}.lock'),
+                'a+b',
+            )
+            self.memory = memory
+
+    @contextmanager
+    def locked(
+        self,
+        position: int,
+        thread_lock: threading.Lock,
+        exclusive: bool = True,
+    ) -> Iterator[None]:
+        with thread_lock:
+            fcntl.lockf(
+                self.lock_file,
+                fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH,
+                1,
+                position,
+            )
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.lock_file, fcntl.LOCK_UN, 1, position)
+
+    def slot_lock(self, slot: int) -> threading.Lock:
+        return self.slot_locks[slot % len(self.slot_locks)]
+
+    def probe(self, game_id: bytes) -> Optional[int]:
+        # The slot holding the game, else the empty slot it would go in, or
+        # None when the table is full
+        start: int = zlib.crc32(game_id) % self.capacity
+        for offset in range(self.capacity):
+            slot: int = (start + offset) % self.capacity
+            record: np.void = self.records[slot]
+            if not record['used']:
+                return slot
+            length: int = int(record['game_id_length'])
+            if record['game_id'][:length].tobytes() == game_id:
+                return slot
+        return None
+
+    def slot_of(self, game_id: str) -> int:
+        self.attach()
+        encoded: bytes = game_id.encode('utf-8')
+        slot: Optional[int] = None
+        if len(encoded) <= MAX_GAME_ID_BYTES:
+            slot = self.probe(encoded)
+        if slot is None or not self.records[slot]['used']:
+            raise GameNotFoundException('Game not found.')
+        return slot
+
+    def check_fits(self, game: TwoPlayerGame) -> None:
+        fits: bool = (
+            len(game.game_id.encode('utf-8')) <= MAX_GAME_ID_BYTES
+            and all(
+                len(player.encode('utf-8')) <= MAX_PLAYER_BYTES
+                for player in game.players
+            )
+            and game.rows * game.columns <= self.max_cells
+            and game.num_moves() == 0
+        )
+        if not fits:
+            raise GameTooLargeException('Game does not fit the game table.')
+
+    def add_many(self, games: List[TwoPlayerGame]) -> None:
+        # All or nothing as far as fitting goes; a table filling up midway
+        # still keeps the games added before
+        for game in games:
+            self.check_fits(game)
+        for game in games:
+            self.add(game)
+
+    def add(self, game: TwoPlayerGame) -> None:
+        self.check_fits(game)
+        encoded_id: bytes = game.game_id.encode('utf-8')
+        encoded_players: List[bytes] = [
+            player.encode('utf-8') for player in game.players
+        ]
+        self.attach()
+        with self.locked(0, self.allocation_lock):
+            if self.header['games'] >= self.capacity:
+                raise StoreFullException('Game table is full.')
+            slot: int = self.probe(encoded_id)
+            record: np.void = self.records[slot]
+            record['game_id_length'] = len(encoded_id)
+            record['game_id'][:len(encoded_id)] = np.frombuffer(
+                encoded_id,
+                'u1',
+            )
+            for player_index, player in enumerate(encoded_players):
+                record['player_lengths'][player_index] = len(player)
+                record['players'][player_index, :len(player)] = (
+                    np.frombuffer(player, 'u1')
+                )
+            record['board_engine'] = BOARD_ENGINE_CODES.index(
+                game.board_engine,
+            )
+            record['rows'] = game.rows
+            record['columns'] = game.columns
+            record['win_condition'] = game.win_condition
+            record['state'] = STATE_CODES.index(game.state)
+            record['num_moves'] = 0
+            record['sequence'] = self.header['next_sequence']
+            self.header['next_sequence'] += np.uint64(1)
+            self.header['games'] += np.uint64(1)
+            # Last, so that lookups never see a half-written record
+            record['used'] = 1
+        self.cache(slot, game)
+
+    def cached(self, slot: int) -> Optional[TwoPlayerGame]:
+        with self.cache_lock:
+            game: Optional[TwoPlayerGame] = self.games.get(slot)
+            if game is not None:
+                self.games.move_to_end(slot)
+            return game
+
+    def cache(self, slot: int, game: TwoPlayerGame) -> None:
+        # A game dropped here may still be in use under its slot lock; it
+        # is just rebuilt from its record next time
+        with self.cache_lock:
+            self.games[slot] = game
+            self.games.move_to_end(slot)
+            while len(self.games) > self.cached_games:
+                self.games.popitem(last=False)
+
+    def uncache(self, slot: int) -> None:
+        with self.cache_lock:
+            self.games.pop(slot, None)
+
+    def caught_up(self, slot: int) -> TwoPlayerGame:
+        # Caller holds the slot's lock
+        record: np.void = self.records[slot]
+        game: Optional[TwoPlayerGame] = self.cached(slot)
+        if game is None:
+            players: List[str] = [
+                record['players'][player_index, :length].tobytes().decode()
+                for player_index, length in enumerate(
+                    record['player_lengths'],
+                )
+            ]
+            new_game: NewGame = NewGame.construct(
+                players=players,
+                rows=int(record['rows']),
+                columns=int(record['columns']),
+            )
+            game_id_length: int = int(record['game_id_length'])
+            game = TwoPlayerGame(
+                record['game_id'][:game_id_length].tobytes().decode(),
+                new_game,
+                int(record['win_condition']),
+                BOARD_ENGINE_CODES[record['board_engine']],
+            )
+            self.cache(slot, game)
+        for move in record['moves'][game.num_moves():record['num_moves']]:
+            if move >= 0:
+                game.make_move(game.players[game.turn_index], int(move))
+            else:
+                game.delete_player(game.players[-1 - move])
+        return game
+
+    def get(self, game_id: str) -> TwoPlayerGame:
+        slot: int = self.slot_of(game_id)
+        with self.locked(slot + 1, self.slot_lock(slot), exclusive=False):
+            return self.caught_up(slot)
+
+    @contextmanager
+    def update(self, game_id: str) -> Iterator[TwoPlayerGame]:
+        slot: int = self.slot_of(game_id)
+        with self.locked(slot + 1, self.slot_lock(slot)):
+            game: TwoPlayerGame = self.caught_up(slot)
+            moves_before: int = game.num_moves()
+            try:
+                yield game
+            except BaseException:
+                # The game may be half changed; rebuild it from the record
+                self.uncache(slot)
+                raise
+            record: np.void = self.records[slot]
+            for move_index in range(moves_before, game.num_moves()):
+                player_index, is_quit, column = game.moves.entry(move_index)
+                record['moves'][move_index] = (
+                    -1 - player_index if is_quit else column
+                )
+            record['num_moves'] = game.num_moves()
+            record['state'] = STATE_CODES.index(game.state)
+
+    def in_progress(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[str]:
+        self.attach()
+        after_sequence: int = -1
+        if after is not None:
+            after_sequence = int(self.records[self.slot_of(after)]['sequence'])
+        # One vectorized pass over the table instead of a loop over records
+        slots: np.ndarray = np.flatnonzero(
+            (self.records['used'] == 1)
+            & (self.records['state'] == 0)
+            & (self.records['sequence'].astype(np.int64) > after_sequence)
+        )
+        slots = slots[np.argsort(self.records['sequence'][slots])][:limit]
+        return [
+            self.records[slot]['game_id'][
+                :self.records[slot]['game_id_length']
+            ].tobytes().decode()
+            for slot in slots
+        ]
+
+    def close(self) -> None:
+        # Leaves the table to the other workers; see unlink()
+        with self.allocation_lock:
+            if self.memory is None:
+                return
+            with self.cache_lock:
+                self.games.clear()
+            # The views must go before the buffer they export can be closed
+            del self.header
+            del self.records
+            self.memory.close()
+            self.memory = None
+            self.lock_file.close()
+
+    def unlink(self) -> None:
+        # Once no process uses the table any more
+        memory: shared_memory.SharedMemory = shared_memory.SharedMemory(
+            self.name,
+        )
+        memory.close()
+        # unlink() also unregisters it from the resource tracker
+        memory.unlink()
+        os.remove(os.path.join(tempfile.gettempdir(), f'{self.name}.lock'))
@@ -0,0 +1,56 @@
+import random
+from typing import List
+from unittest import TestCase
+
+import numpy as np
+
+from batch_helpers import check_winners, find_winners
+from helpers import check_winner
+
+
+class BatchHelpersTest(TestCase):
+    def test_check_winners_agrees_with_check_winner(self) -> None:
+        rng: random.Random = random.Random(98)
+        for _ in range(50):
+            rows: int = rng.randint(1, 8)
+            cols: int = rng.randint(1, 8)
+            how_many: int = rng.randint(1, 5)
+            boards: List[List[List[int]]] = [
+                [
+                    [rng.choice([-1, 0, 1]) for _ in range(cols)]
+                    for _ in range(rows)
+                ]
+                for _ in range(40)
+            ]
+            stacked: np.ndarray = np.array(boards, dtype=np.int8)
+            for target in (0, 1):
+                self.assertEqual(
+                    check_winners(stacked, target, how_many).tolist(),
+                    [
+                        check_winner(board, target, how_many)
+                        for board in boards
+                    ],
+                )
+
+    def test_find_winners(self) -> None:
+        no_one: List[List[int]] = [
+            [-1, -1, -1],
+            [-1, -1, -1],
+            [0, 1, 0],
+        ]
+        player_0: List[List[int]] = [
+            [0, -1, -1],
+            [1, 0, -1],
+            [1, 1, 0],
+        ]
+        player_1: List[List[int]] = [
+            [-1, -1, 1],
+            [0, 1, 0],
+            [1, 0, 0],
+        ]
+        stacked: np.ndarray = np.array([no_one, player_0, player_1])
+        self.assertEqual(find_winners(stacked, 3).tolist(), [-1, 0, 1])
+
+    def test_empty_batch(self) -> None:
+        stacked: np.ndarray = np.full((0, 6, 7), -1)
+        self.assertEqual(find_winners(stacked, 4).tolist(), [])
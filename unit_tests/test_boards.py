@@ -0,0 +1,162 @@
+import random
+from typing import List, Set, Tuple
+from unittest import TestCase
+
+from boards import (
+    SPARSE_BOARD_THRESHOLD,
+    BitBoard,
+    Board,
+    ListBoard,
+    SparseBoard,
+    make_board,
+)
+from helpers import check_winner, check_winner_at
+
+
+class BoardsTest(TestCase):
+    def test_make_board_selects_engine(self) -> None:
+        self.assertIsInstance(make_board('list', 6, 7, 4), ListBoard)
+        self.assertIsInstance(make_board('bitboard', 6, 7, 4), BitBoard)
+        with self.assertRaises(ValueError):
+            make_board('abacus', 6, 7, 4)
+
+    def test_make_board_goes_sparse_above_threshold(self) -> None:
+        self.assertIsInstance(
+            make_board('bitboard', 1, SPARSE_BOARD_THRESHOLD, 4),
+            BitBoard,
+        )
+        huge: Board = make_board('list', 100000, 100000, 4)
+        self.assertIsInstance(huge, SparseBoard)
+        self.assertEqual(huge.drop(99999, 0), 99999)
+        self.assertFalse(huge.is_column_full(99999))
+        self.assertTrue(huge.can_still_win(0))
+
+    def test_bitboard_drop_and_column_full(self) -> None:
+        board: BitBoard = BitBoard(2, 3, 2)
+        self.assertEqual(board.drop(1, 0), 1)
+        self.assertFalse(board.is_column_full(1))
+        self.assertEqual(board.drop(1, 1), 0)
+        self.assertTrue(board.is_column_full(1))
+        self.assertFalse(board.is_full())
+
+    def test_bitboard_wins_in_every_direction(self) -> None:
+        vertical: BitBoard = BitBoard(4, 4, 4)
+        for _ in range(4):
+            vertical.drop(2, 0)
+        self.assertTrue(vertical.is_winning_drop(0, 0, 2))
+
+        horizontal: BitBoard = BitBoard(4, 4, 4)
+        for column in range(4):
+            horizontal.drop(column, 1)
+        self.assertTrue(horizontal.is_winning_drop(1, 3, 3))
+        self.assertFalse(horizontal.is_winning_drop(0, 3, 3))
+
+        upward: BitBoard = BitBoard(3, 3, 3)
+        for column, player_index in [
+            (0, 0), (1, 1), (1, 0), (2, 1), (2, 1), (2, 0),
+        ]:
+            upward.drop(column, player_index)
+        self.assertTrue(upward.is_winning_drop(0, 0, 2))
+
+        downward: BitBoard = BitBoard(3, 3, 3)
+        for column, player_index in [
+            (2, 0), (1, 1), (1, 0), (0, 1), (0, 1), (0, 0),
+        ]:
+            downward.drop(column, player_index)
+        self.assertTrue(downward.is_winning_drop(0, 0, 0))
+
+    def test_bitboard_does_not_wrap_across_columns(self) -> None:
+        # Without the padding row, the two tokens in column 0 and the bottom
+        # token of column 1 would be three consecutive bits
+        board: BitBoard = BitBoard(2, 2, 3)
+        board.drop(0, 0)
+        board.drop(0, 0)
+        board.drop(1, 0)
+        self.assertFalse(board.is_winning_drop(0, 1, 1))
+
+    def test_engines_agree_with_check_winner_on_random_games(self) -> None:
+        rng: random.Random = random.Random(98)
+        for _ in range(200):
+            rows: int = rng.randint(1, 7)
+            columns: int = rng.randint(1, 7)
+            # check_winner only scans k x k boxes, so keep k within the board
+            how_many: int = rng.randint(1, min(rows, columns))
+            boards: List[Board] = [
+                ListBoard(rows, columns, how_many),
+                BitBoard(rows, columns, how_many),
+                SparseBoard(rows, columns, how_many),
+            ]
+            player_index: int = 0
+            while not boards[0].is_full():
+                column: int = rng.choice([
+                    c for c in range(columns)
+                    if not boards[0].is_column_full(c)
+                ])
+                results: List[bool] = []
+                for board in boards:
+                    row: int = board.drop(column, player_index)
+                    results.append(
+                        board.is_winning_drop(player_index, row, column),
+                    )
+                expected: bool = check_winner(
+                    boards[0].cells,
+                    player_index,
+                    how_many,
+                )
+                self.assertEqual(results, [expected] * 3)
+                # SparseBoard does not enumerate far-away cells for k = 1
+                compared: List[Board] = (
+                    boards[1:] if how_many > 1 else boards[1:2]
+                )
+                for board in compared:
+                    self.assertEqual(
+                        boards[0].open_threats(player_index),
+                        board.open_threats(player_index),
+                    )
+                for either_player in (0, 1):
+                    self.assertEqual(
+                        boards[0].can_still_win(either_player),
+                        boards[1].can_still_win(either_player),
+                    )
+                if expected:
+                    break
+                player_index = 1 - player_index
+
+    def test_open_threats_are_cells_completing_a_line(self) -> None:
+        rng: random.Random = random.Random(6)
+        for _ in range(100):
+            board: ListBoard = ListBoard(5, 6, 3)
+            for turn in range(rng.randint(0, 12)):
+                column: int = rng.choice([
+                    c for c in range(6) if not board.is_column_full(c)
+                ])
+                board.drop(column, turn % 2)
+            for player_index in (0, 1):
+                expected: Set[Tuple[int, int]] = set()
+                for row in range(5):
+                    for column in range(6):
+                        if board.cells[row][column] != -1:
+                            continue
+                        board.cells[row][column] = player_index
+                        if check_winner_at(
+                            board.cells,
+                            player_index,
+                            3,
+                            row,
+                            column,
+                        ):
+                            expected.add((row, column))
+                        board.cells[row][column] = -1
+                self.assertEqual(board.open_threats(player_index), expected)
+
+    def test_can_still_win_once_every_line_is_blocked(self) -> None:
+        for engine in ('list', 'bitboard'):
+            # Single row of 3, so one line: blocked for 1 by 0, then for 0 by 1
+            board: Board = make_board(engine, 1, 3, 3)
+            self.assertTrue(board.can_still_win(0))
+            self.assertTrue(board.can_still_win(1))
+            board.drop(0, 0)
+            self.assertTrue(board.can_still_win(0))
+            self.assertFalse(board.can_still_win(1))
+            board.drop(2, 1)
+            self.assertFalse(board.can_still_win(0))
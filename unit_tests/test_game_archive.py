@@ -0,0 +1,199 @@
+import os
+import tempfile
+import uuid
+from typing import List
+from unittest import TestCase
+
+from exceptions import GameCompletedException, GameNotFoundException
+from game_archive import ARCHIVE_NAME, GameArchive
+from game_objects import GameState, TwoPlayerGame
+from game_store import InMemoryGameStore
+from journal import Journal
+from payload_schema import NewGame
+
+
+class GameArchiveTest(TestCase):
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def finished_game(self, game_id: str) -> TwoPlayerGame:
+        new_game: NewGame = NewGame(
+            players=['foo', 'bär'],
+            columns=4,
+            rows=4,
+        )
+        game: TwoPlayerGame = TwoPlayerGame(game_id, new_game, 4, 'bitboard')
+        for column in (0, 1, 0, 1, 0, 1, 0):
+            game.make_move(game.players[game.turn_index], column)
+        return game
+
+    def test_games_round_trip_without_their_boards(self) -> None:
+        archive: GameArchive = GameArchive(self.directory.name)
+        game: TwoPlayerGame = self.finished_game('a')
+        archive.add_many([game, self.finished_game('b')])
+        self.assertIn('b', archive)
+        self.assertIsNone(archive.get('c'))
+        archived: TwoPlayerGame = archive.get('a')
+        self.assertEqual(archived.winner, 'foo')
+        self.assertEqual(archived.get_moves(), game.get_moves())
+        # The board comes back from the moves
+        self.assertEqual(archived.board.heights, game.board.heights)
+        with self.assertRaises(GameCompletedException):
+            archived.make_move('bär', 2)
+
+    def test_offsets_are_rebuilt_and_a_torn_tail_dropped(self) -> None:
+        archive: GameArchive = GameArchive(self.directory.name)
+        archive.add_many([self.finished_game('a')])
+        archive.add_many([self.finished_game('b')])
+        path: str = os.path.join(self.directory.name, ARCHIVE_NAME)
+        os.truncate(path, os.path.getsize(path) - 3)
+        reopened: GameArchive = GameArchive(self.directory.name)
+        self.assertEqual(list(reopened.offsets), ['a'])
+        reopened.add_many([self.finished_game('c')])
+        self.assertEqual(reopened.get('c').get_moves()[-1]['column'], 0)
+        self.assertEqual(GameArchive(self.directory.name).get('a').rows, 4)
+
+
+class ArchivingGameStoreTest(TestCase):
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def store(self, **options) -> InMemoryGameStore:
+        # Archived from the tests, not by the background thread
+        return InMemoryGameStore(
+            archive=GameArchive(os.path.join(self.directory.name, 'archive')),
+            archive_after=60,
+            **options,
+        )
+
+    def add_games(self, store: InMemoryGameStore, count: int) -> None:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        for number in range(count):
+            store.add(TwoPlayerGame(str(number), new_game, 4))
+
+    def test_old_finished_games_leave_memory(self) -> None:
+        store: InMemoryGameStore = self.store()
+        self.add_games(store, 3)
+        for game_id in ('0', '1'):
+            with store.update(game_id) as game:
+                game.delete_player('foo')
+        self.assertEqual(store.archive_finished(), 0)
+        later: float = store.finished['1'] + 61
+        self.assertEqual(store.archive_finished(later), 2)
+        self.assertEqual(list(store.games), ['2'])
+        archived: TwoPlayerGame = store.get('1')
+        self.assertEqual(archived.state, GameState.DONE)
+        self.assertEqual(archived.winner, 'bar')
+        with self.assertRaises(GameCompletedException):
+            with store.update('1') as game:
+                game.delete_player('bar')
+        self.assertEqual(store.in_progress(after='0'), ['2'])
+        store.close()
+
+    def test_finished_games_past_the_limit_leave_memory(self) -> None:
+        store: InMemoryGameStore = self.store(keep_finished=1)
+        self.add_games(store, 3)
+        for game_id in ('0', '1', '2'):
+            with store.update(game_id) as game:
+                game.delete_player('foo')
+        self.assertEqual(store.archive_finished(), 2)
+        self.assertEqual(list(store.games), ['2'])
+        self.assertEqual(store.get('0').num_moves(), 1)
+        store.close()
+
+    def test_move_files_go_with_archived_and_dropped_games(self) -> None:
+        store: InMemoryGameStore = self.store()
+        move_log_dir: str = os.path.join(self.directory.name, 'moves')
+        os.makedirs(move_log_dir)
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        for game_id in ('0', '1'):
+            store.add(
+                TwoPlayerGame(game_id, new_game, 4, 'list', move_log_dir),
+            )
+            with store.update(game_id) as game:
+                game.make_move('foo', 0)
+        with store.update('0') as game:
+            game.delete_player('bar')
+        self.assertEqual(store.archive_finished(float('inf')), 1)
+        self.assertEqual(os.listdir(move_log_dir), ['1.moves'])
+        self.assertEqual(
+            store.get('0').get_moves(),
+            [
+                {'type': 'MOVE', 'player': 'foo', 'column': 0},
+                {'type': 'QUIT', 'player': 'bar'},
+            ],
+        )
+        store.close()
+        self.assertEqual(os.listdir(move_log_dir), [])
+
+    def test_archive_survives_restarts_with_a_journal(self) -> None:
+        journal_dir: str = os.path.join(self.directory.name, 'journal')
+        store: InMemoryGameStore = self.store(journal=Journal(journal_dir))
+        game_id: str = str(uuid.uuid4())
+        store.add(TwoPlayerGame(
+            game_id,
+            NewGame(players=['foo', 'bar'], columns=4, rows=4),
+            4,
+        ))
+        with store.update(game_id) as game:
+            game.delete_player('foo')
+        store.archive_finished(store.finished[game_id] + 61)
+        store.take_snapshot()
+        store.close()
+        recovered: InMemoryGameStore = self.store(
+            journal=Journal(journal_dir),
+        )
+        self.assertNotIn(game_id, recovered.games)
+        self.assertEqual(recovered.get(game_id).winner, 'bar')
+        recovered.close()
+
+    def test_archived_games_are_not_recovered_again(self) -> None:
+        journal_dir: str = os.path.join(self.directory.name, 'journal')
+        store: InMemoryGameStore = self.store(journal=Journal(journal_dir))
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        game_ids: List[str] = [str(uuid.uuid4()), str(uuid.uuid4())]
+        for game_id in game_ids:
+            store.add(TwoPlayerGame(game_id, new_game, 4))
+        # One game finishes before the snapshot, the other in the segment
+        # after it
+        with store.update(game_ids[0]) as game:
+            game.delete_player('foo')
+        store.take_snapshot()
+        with store.update(game_ids[1]) as game:
+            game.delete_player('foo')
+        store.archive_finished(store.finished[game_ids[1]] + 61)
+        store.close()
+        archive_size: int = os.path.getsize(store.archive.path)
+        for _ in range(2):
+            recovered: InMemoryGameStore = self.store(
+                journal=Journal(journal_dir),
+            )
+            self.assertEqual(recovered.games, {})
+            self.assertEqual(recovered.archive_finished(float('inf')), 0)
+            self.assertEqual(recovered.get(game_ids[1]).winner, 'bar')
+            recovered.close()
+        self.assertEqual(os.path.getsize(store.archive.path), archive_size)
+
+    def test_archive_is_dropped_with_the_store_without_a_journal(
+        self,
+    ) -> None:
+        store: InMemoryGameStore = self.store(keep_finished=0)
+        self.add_games(store, 1)
+        with store.update('0') as game:
+            game.delete_player('foo')
+        store.archive_finished()
+        store.close()
+        reopened: InMemoryGameStore = self.store()
+        with self.assertRaises(GameNotFoundException):
+            reopened.get('0')
+        reopened.close()
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from typing import List
+from unittest import TestCase
+
+from game_events import GameEvents, Subscriber
+
+
+class GameEventsTest(TestCase):
+    def test_notify_from_another_thread_wakes_waiters(self) -> None:
+        events: GameEvents = GameEvents()
+
+        async def wait_for_notification() -> bool:
+            waiters: List[asyncio.Future] = [
+                events.subscribe('a'),
+                events.subscribe('a'),
+            ]
+            other: asyncio.Future = events.subscribe('b')
+            threading.Thread(target=events.notify, args=('a',)).start()
+            await asyncio.wait_for(asyncio.gather(*waiters), 5)
+            events.unsubscribe('b', other)
+            return other.done()
+
+        self.assertFalse(asyncio.run(wait_for_notification()))
+        self.assertEqual(events.waiters, {})
+
+    def test_unsubscribe_forgets_the_game(self) -> None:
+        events: GameEvents = GameEvents()
+
+        async def subscribe_and_leave() -> None:
+            events.unsubscribe('a', events.subscribe('a'))
+
+        asyncio.run(subscribe_and_leave())
+        self.assertEqual(events.waiters, {})
+        events.notify('a')
+
+    def test_published_messages_reach_every_subscriber(self) -> None:
+        events: GameEvents = GameEvents()
+
+        async def follow() -> List[list]:
+            subscribers: List[Subscriber] = [
+                events.add_subscriber('a'),
+                events.add_subscriber('a'),
+            ]
+            events.publish('a', [(0, 'first'), (None, 'over')])
+            received: List[list] = []
+            for subscriber in subscribers:
+                received.append([
+                    await subscriber.queue.get(),
+                    await subscriber.queue.get(),
+                ])
+                events.remove_subscriber('a', subscriber)
+            return received
+
+        self.assertEqual(
+            asyncio.run(follow()),
+            [[(0, 'first'), (None, 'over')]] * 2,
+        )
+        self.assertFalse(events.has_subscribers('a'))
+
+    def test_slow_subscriber_is_dropped(self) -> None:
+        events: GameEvents = GameEvents()
+
+        async def fall_behind() -> list:
+            subscriber: Subscriber = events.add_subscriber('a', maxsize=2)
+            for move_number in range(3):
+                events.publish('a', [(move_number, 'move')])
+            # Let the deliveries scheduled on this loop run
+            await asyncio.sleep(0)
+            return [subscriber.queue.get_nowait()]
+
+        self.assertEqual(asyncio.run(fall_behind()), [None])
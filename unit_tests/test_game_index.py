@@ -0,0 +1,38 @@
+from typing import List
+from unittest import TestCase
+
+from game_index import InProgressGameIndex
+
+
+class InProgressGameIndexTest(TestCase):
+    def test_page_lists_in_progress_games_in_creation_order(self) -> None:
+        index: InProgressGameIndex = InProgressGameIndex()
+        for game_id in ('a', 'b', 'c', 'd'):
+            index.add(game_id)
+        index.remove('b')
+        self.assertEqual(index.page(), ['a', 'c', 'd'])
+        self.assertEqual(index.page(limit=2), ['a', 'c'])
+        self.assertEqual(index.page(limit=2, after='c'), ['d'])
+
+    def test_finished_game_is_still_a_valid_cursor(self) -> None:
+        index: InProgressGameIndex = InProgressGameIndex()
+        for game_id in ('a', 'b', 'c'):
+            index.add(game_id)
+        index.remove('a')
+        index.remove('b')
+        self.assertIn('b', index)
+        self.assertEqual(index.page(after='b'), ['c'])
+        self.assertEqual(index.page(after='a'), ['c'])
+
+    def test_compaction_keeps_order(self) -> None:
+        index: InProgressGameIndex = InProgressGameIndex()
+        for number in range(100):
+            index.add(str(number))
+        for number in range(100):
+            if number % 3:
+                index.remove(str(number))
+        index.remove('not-indexed')
+        self.assertLess(len(index.sequences), 100)
+        expected: List[str] = [str(number) for number in range(0, 100, 3)]
+        self.assertEqual(index.page(), expected)
+        self.assertEqual(index.page(limit=3, after='50'), ['51', '54', '57'])
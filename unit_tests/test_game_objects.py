@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from game_objects import TwoPlayerGame
+from payload_schema import NewGame
+
+
+class TwoPlayerGameTest(TestCase):
+    def test_draw_is_called_once_no_line_is_reachable(self) -> None:
+        for engine in ('list', 'bitboard'):
+            new_game: NewGame = NewGame(
+                players=['foo', 'bar'],
+                columns=4,
+                rows=1,
+            )
+            game: TwoPlayerGame = TwoPlayerGame('game', new_game, 4, engine)
+            game.make_move('foo', 0)
+            self.assertEqual(game.state, 'IN_PROGRESS')
+            game.make_move('bar', 3)
+            self.assertEqual(game.state, 'DONE')
+            self.assertIsNone(game.winner)
+
+    def test_game_goes_on_while_a_line_is_reachable(self) -> None:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=5, rows=1)
+        game: TwoPlayerGame = TwoPlayerGame('game', new_game, 4)
+        game.make_move('foo', 0)
+        game.make_move('bar', 4)
+        self.assertEqual(game.state, 'IN_PROGRESS')
+        game.make_move('foo', 1)
+        game.make_move('bar', 2)
+        self.assertEqual(game.state, 'DONE')
+        self.assertIsNone(game.winner)
+
+    def test_win_is_reported(self) -> None:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        game: TwoPlayerGame = TwoPlayerGame('game', new_game, 4)
+        for column in (0, 1, 0, 1, 0, 1):
+            game.make_move(game.players[game.turn_index], column)
+        self.assertEqual(game.open_threats('foo'), {(0, 0)})
+        self.assertEqual(game.open_threats('bar'), {(0, 1)})
+        game.make_move('foo', 0)
+        self.assertEqual(game.state, 'DONE')
+        self.assertEqual(game.winner, 'foo')
+
+    def test_version_follows_moves_and_state(self) -> None:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        game: TwoPlayerGame = TwoPlayerGame('game', new_game, 4)
+        self.assertEqual(game.version(), '0-IN_PROGRESS')
+        game.make_move('foo', 0)
+        self.assertEqual(game.version(), '1-IN_PROGRESS')
+        game.delete_player('bar')
+        self.assertEqual(game.version(), '2-DONE')
+
+    def test_frozen_copy_keeps_the_moves_so_far(self) -> None:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        game: TwoPlayerGame = TwoPlayerGame('game', new_game, 4)
+        game.make_move('foo', 0)
+        frozen: TwoPlayerGame = game.frozen_copy()
+        game.make_move('bar', 1)
+        self.assertEqual(
+            frozen.get_moves(),
+            [{'type': 'MOVE', 'player': 'foo', 'column': 0}],
+        )
+        self.assertIsNone(frozen._board)
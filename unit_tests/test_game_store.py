@@ -0,0 +1,214 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from typing import List
+from unittest import TestCase
+
+from exceptions import (
+    GameNotFoundException,
+    GameTooLargeException,
+    IllegalTurnException,
+    StoreFullException,
+)
+from game_objects import GameState, TwoPlayerGame
+from game_store import GameStore, InMemoryGameStore, SqliteGameStore
+from payload_schema import NewGame
+from shared_memory_store import SharedMemoryGameStore
+
+
+class GameStoreTest(TestCase):
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+        self.stores: List[GameStore] = [
+            InMemoryGameStore(),
+            SqliteGameStore(os.path.join(self.directory.name, 'games.db')),
+            SharedMemoryGameStore(f'drop_token_test_{uuid.uuid4().hex}', 16),
+        ]
+
+    def tearDown(self) -> None:
+        for store in self.stores:
+            store.close()
+            if isinstance(store, SharedMemoryGameStore):
+                store.unlink()
+        self.directory.cleanup()
+
+    def new_game(self, game_id: str) -> TwoPlayerGame:
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        return TwoPlayerGame(game_id, new_game, 4)
+
+    def test_get_unknown_game(self) -> None:
+        for store in self.stores:
+            with self.assertRaises(GameNotFoundException):
+                store.get('nope')
+            with self.assertRaises(GameNotFoundException):
+                with store.update('nope'):
+                    pass
+            with self.assertRaises(GameNotFoundException):
+                store.in_progress(after='nope')
+
+    def test_update_persists_the_game(self) -> None:
+        for store in self.stores:
+            store.add(self.new_game('a'))
+            with store.update('a') as game:
+                game.make_move('foo', 2)
+            self.assertEqual(
+                store.get('a').get_moves(),
+                [{'type': 'MOVE', 'player': 'foo', 'column': 2}],
+            )
+
+    def test_failed_update_is_not_persisted(self) -> None:
+        for store in self.stores[1:]:
+            store.add(self.new_game('a'))
+            with self.assertRaises(IllegalTurnException):
+                with store.update('a') as game:
+                    game.make_move('foo', 2)
+                    game.make_move('foo', 2)
+            self.assertEqual(store.get('a').num_moves(), 0)
+
+    def test_in_progress_follows_state_changes(self) -> None:
+        for store in self.stores:
+            for game_id in ('a', 'b', 'c'):
+                store.add(self.new_game(game_id))
+            with store.update('b') as game:
+                game.delete_player('foo')
+            self.assertEqual(store.get('b').state, GameState.DONE)
+            self.assertEqual(store.in_progress(), ['a', 'c'])
+            self.assertEqual(store.in_progress(limit=1), ['a'])
+            self.assertEqual(store.in_progress(after='b'), ['c'])
+
+    def test_add_many(self) -> None:
+        for store in self.stores:
+            store.add_many([self.new_game(game_id) for game_id in 'abc'])
+            self.assertEqual(store.in_progress(), ['a', 'b', 'c'])
+            self.assertEqual(store.get('b').players, ('foo', 'bar'))
+
+
+class IncompleteGameStore(GameStore):
+    def get(self, game_id: str) -> TwoPlayerGame:
+        raise GameNotFoundException('Game not found.')
+
+
+class GameStoreInterfaceTest(TestCase):
+    def test_incomplete_store_cannot_be_created(self) -> None:
+        with self.assertRaises(TypeError):
+            IncompleteGameStore()
+
+
+class InMemoryGameStoreTest(TestCase):
+    def test_listing_waits_for_changes_to_the_index(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore()
+        new_game: NewGame = NewGame(players=['foo', 'bar'], columns=4, rows=4)
+        store.add(TwoPlayerGame('a', new_game, 4))
+        listed: List[List[str]] = []
+        with store.lock:
+            lister: threading.Thread = threading.Thread(
+                target=lambda: listed.append(store.in_progress()),
+            )
+            lister.start()
+            lister.join(0.1)
+            self.assertEqual(listed, [])
+            store.in_progress_games.remove('a')
+        lister.join()
+        self.assertEqual(listed, [[]])
+        store.close()
+
+
+class MakeGameStoreTest(TestCase):
+    def test_only_the_shared_memory_store_loads_numpy(self) -> None:
+        # In a fresh interpreter, since the tests themselves import numpy
+        subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'import sys, game_store; '
+                'game_store.make_game_store().close(); '
+                "assert 'numpy' not in sys.modules",
+            ],
+            check=True,
+            env=dict(os.environ, GAME_STORE='memory'),
+        )
+
+
+class SharedMemoryGameStoreTest(TestCase):
+    def setUp(self) -> None:
+        self.name: str = f'drop_token_test_{uuid.uuid4().hex}'
+        # Two attachments to one table, as two workers would have
+        self.store: SharedMemoryGameStore = SharedMemoryGameStore(
+            self.name,
+            4,
+            16,
+        )
+        self.other_store: SharedMemoryGameStore = SharedMemoryGameStore(
+            self.name,
+            4,
+            16,
+        )
+
+    def tearDown(self) -> None:
+        self.other_store.close()
+        self.store.close()
+        self.store.unlink()
+
+    def new_game(self, game_id: str, rows: int = 4) -> TwoPlayerGame:
+        new_game: NewGame = NewGame(
+            players=['foo', 'bar'],
+            columns=4,
+            rows=rows,
+        )
+        return TwoPlayerGame(game_id, new_game, 4)
+
+    def test_games_are_shared_between_attachments(self) -> None:
+        self.store.add(self.new_game('a'))
+        self.assertEqual(self.other_store.get('a').players, ('foo', 'bar'))
+        with self.store.update('a') as game:
+            game.make_move('foo', 1)
+        with self.other_store.update('a') as game:
+            game.make_move('bar', 2)
+        with self.store.update('a') as game:
+            game.delete_player('foo')
+        for store in (self.store, self.other_store):
+            game: TwoPlayerGame = store.get('a')
+            self.assertEqual(game.num_moves(), 3)
+            self.assertEqual(game.winner, 'bar')
+            self.assertEqual(store.in_progress(), [])
+
+    def test_game_must_fit_a_record(self) -> None:
+        with self.assertRaises(GameTooLargeException):
+            self.store.add(self.new_game('a', rows=5))
+        with self.assertRaises(GameTooLargeException):
+            self.store.add(self.new_game('a' * 37))
+
+    def test_table_full(self) -> None:
+        for game_id in ('a', 'b', 'c', 'd'):
+            self.store.add(self.new_game(game_id))
+        with self.assertRaises(StoreFullException):
+            self.store.add(self.new_game('e'))
+        self.assertEqual(self.other_store.in_progress(after='b'), ['c', 'd'])
+
+    def test_cached_games_are_bounded(self) -> None:
+        store: SharedMemoryGameStore = SharedMemoryGameStore(
+            self.name,
+            4,
+            16,
+            cached_games=2,
+        )
+        for game_id in ('a', 'b', 'c'):
+            self.store.add(self.new_game(game_id))
+            with store.update(game_id) as game:
+                game.make_move('foo', 1)
+        self.assertEqual(len(store.games), 2)
+        store.get('b')
+        with self.other_store.update('a') as game:
+            game.make_move('bar', 2)
+        # Dropped games are rebuilt from their records
+        self.assertEqual(store.get('a').num_moves(), 2)
+        self.assertEqual(
+            [game.game_id for game in store.games.values()],
+            ['b', 'a'],
+        )
+        store.close()
@@ -0,0 +1,39 @@
+import uuid
+from collections import Counter
+from typing import Dict, List
+from unittest import TestCase
+
+from hash_ring import HashRing
+
+
+class HashRingTest(TestCase):
+    def setUp(self) -> None:
+        self.keys: List[str] = [
+            str(uuid.UUID(int=number)) for number in range(3000)
+        ]
+
+    def test_keys_spread_over_every_shard(self) -> None:
+        ring: HashRing = HashRing(['a', 'b', 'c'])
+        counts: Counter = Counter(ring.shard_for(key) for key in self.keys)
+        self.assertEqual(set(counts), {'a', 'b', 'c'})
+        for count in counts.values():
+            self.assertGreater(count, 600)
+
+    def test_same_key_same_shard(self) -> None:
+        self.assertEqual(
+            HashRing(['a', 'b']).shard_for('game'),
+            HashRing(['a', 'b']).shard_for('game'),
+        )
+
+    def test_adding_a_shard_only_moves_keys_to_it(self) -> None:
+        before: HashRing = HashRing(['a', 'b', 'c'])
+        after: HashRing = HashRing(['a', 'b', 'c', 'd'])
+        owners: Dict[str, str] = {
+            key: before.shard_for(key) for key in self.keys
+        }
+        for key in self.keys:
+            self.assertIn(after.shard_for(key), (owners[key], 'd'))
+
+    def test_needs_a_shard(self) -> None:
+        with self.assertRaises(ValueError):
+            HashRing([])
@@ -1,7 +1,7 @@
 from typing import List, Tuple
 from unittest import TestCase
 
-from helpers import check_winner
+from helpers import check_winner, check_winner_at
 
 
 class HelpersTest(TestCase):
@@ -54,3 +54,60 @@ class HelpersTest(TestCase):
         ]
         self.assertFalse(check_winner(board, 0, 4))
         self.assertFalse(check_winner(board, 1, 4))
+
+    def test_check_winner_at_finds_row_through_middle_cell(self) -> None:
+        board: List[List[int]] = [
+            [-1, -1, -1, -1, -1],
+            [-1, -1, -1, -1, -1],
+            [1, 1, 1, -1, -1],
+            [0, 0, 0, 0, 1],
+        ]
+        self.assertTrue(check_winner_at(board, 0, 4, 3, 2))
+        self.assertFalse(check_winner_at(board, 1, 4, 2, 1))
+
+    def test_check_winner_at_finds_col(self) -> None:
+        board: List[List[int]] = [
+            [-1, -1, -1, 0],
+            [-1, -1, 1, 0],
+            [-1, -1, 1, 0],
+            [-1, -1, 1, 0],
+        ]
+        self.assertTrue(check_winner_at(board, 0, 4, 0, 3))
+        self.assertFalse(check_winner_at(board, 1, 4, 1, 2))
+
+    def test_check_winner_at_finds_both_diagonals(self) -> None:
+        downward: List[List[int]] = [
+            [0, -1, -1, -1],
+            [1, 0, -1, -1],
+            [0, 1, 0, 0],
+            [1, 1, 1, 0],
+        ]
+        upward: List[List[int]] = [
+            [-1, -1, -1, 0],
+            [-1, -1, 0, 1],
+            [0, 0, 1, 0],
+            [0, 1, 1, 1],
+        ]
+        self.assertTrue(check_winner_at(downward, 0, 4, 0, 0))
+        self.assertTrue(check_winner_at(upward, 0, 4, 0, 3))
+
+    def test_check_winner_at_agrees_with_check_winner(self) -> None:
+        # A board has a winner iff some cell of the target is on a winning line
+        board: List[List[int]] = [
+            [-1, 1, -1, -1],
+            [0, 1, 0, -1],
+            [1, 0, 1, -1],
+            [0, 0, 1, 1],
+        ]
+        for how_many in (2, 3, 4):
+            for target in (0, 1):
+                found_through_some_cell: bool = any(
+                    check_winner_at(board, target, how_many, row, col)
+                    for row in range(4)
+                    for col in range(4)
+                    if board[row][col] == target
+                )
+                self.assertEqual(
+                    found_through_some_cell,
+                    check_winner(board, target, how_many),
+                )
@@ -0,0 +1,180 @@
+import errno
+import os
+import pickle
+import tempfile
+import uuid
+from typing import BinaryIO, Callable, List
+from unittest import TestCase, mock
+
+from exceptions import GameTooLargeException
+from game_objects import GameState, TwoPlayerGame
+from game_store import InMemoryGameStore
+from journal import Journal, Record
+from payload_schema import NewGame
+
+
+class JournalTest(TestCase):
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def new_game(self, rows: int = 4) -> TwoPlayerGame:
+        new_game: NewGame = NewGame(
+            players=['foo', 'bär'],
+            columns=4,
+            rows=rows,
+        )
+        return TwoPlayerGame(str(uuid.uuid4()), new_game, 4, 'bitboard')
+
+    def test_records_round_trip(self) -> None:
+        game_id: str = str(uuid.uuid4())
+        journal: Journal = Journal(self.directory.name)
+        journal.append_create(game_id, ('foo', 'bär'), 6, 7, 4, 'bitboard')
+        journal.append_move(game_id, 1, 2 ** 40)
+        journal.wait(journal.append_quit(game_id, 0))
+        journal.close()
+        records: List[Record] = list(Journal(self.directory.name).replay())
+        self.assertEqual(records, [
+            ('CREATE', game_id, ('foo', 'bär'), 6, 7, 4, 'bitboard'),
+            ('MOVE', game_id, 1, 2 ** 40),
+            ('QUIT', game_id, 0),
+        ])
+
+    def test_store_adds_no_game_it_cannot_log(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+        )
+        with self.assertRaises(GameTooLargeException):
+            store.add_many([self.new_game(), self.new_game(rows=2 ** 64)])
+        self.assertEqual(store.in_progress(), [])
+        store.close()
+        self.assertEqual(list(Journal(self.directory.name).replay()), [])
+
+    def test_waiters_fail_once_a_write_fails(self) -> None:
+        journal: Journal = Journal(self.directory.name)
+        segment_file: BinaryIO = journal.file
+        full_disk: mock.Mock = mock.Mock()
+        full_disk.write.side_effect = OSError(errno.ENOSPC, 'No space')
+        with journal.file_lock:
+            journal.file = full_disk
+        segment_file.close()
+        game_id: str = str(uuid.uuid4())
+        for column in (1, 2):
+            with self.assertRaises(OSError):
+                journal.wait(journal.append_move(game_id, 0, column))
+        journal.close()
+        full_disk.close.assert_called_once_with()
+
+    def test_torn_tail_is_ignored(self) -> None:
+        game_id: str = str(uuid.uuid4())
+        journal: Journal = Journal(self.directory.name)
+        journal.append_move(game_id, 0, 1)
+        journal.append_move(game_id, 1, 2)
+        journal.close()
+        path: str = os.path.join(self.directory.name, 'segment-00000001.log')
+        with open(path, 'r+b') as segment_file:
+            segment_file.truncate(os.path.getsize(path) - 3)
+        records: List[Record] = list(Journal(self.directory.name).replay())
+        self.assertEqual(records, [('MOVE', game_id, 0, 1)])
+
+    def test_store_recovers_games_from_the_journal(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+        )
+        won: TwoPlayerGame = self.new_game()
+        quitted: TwoPlayerGame = self.new_game()
+        playing: TwoPlayerGame = self.new_game()
+        for game in (won, quitted, playing):
+            store.add(game)
+        for column in (0, 1, 0, 1, 0, 1, 0):
+            with store.update(won.game_id) as game:
+                game.make_move(game.players[game.turn_index], column)
+        with store.update(quitted.game_id) as game:
+            game.delete_player('bär')
+        with store.update(playing.game_id) as game:
+            game.make_move('foo', 3)
+        store.close()
+
+        recovered: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+        )
+        self.assertEqual(recovered.in_progress(), [playing.game_id])
+        self.assertEqual(recovered.get(won.game_id).winner, 'foo')
+        self.assertEqual(recovered.get(quitted.game_id).winner, 'foo')
+        self.assertEqual(
+            recovered.get(playing.game_id).get_moves(),
+            [{'type': 'MOVE', 'player': 'foo', 'column': 3}],
+        )
+        with recovered.update(playing.game_id) as game:
+            game.make_move('bär', 3)
+        recovered.close()
+        self.assertEqual(
+            InMemoryGameStore(Journal(self.directory.name))
+            .get(playing.game_id).num_moves(),
+            2,
+        )
+
+    def test_snapshots_replace_old_segments(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+            snapshot_every=3,
+        )
+        game: TwoPlayerGame = self.new_game(rows=8)
+        store.add(game)
+        for _ in range(3):
+            with store.update(game.game_id) as this_game:
+                this_game.make_move('foo', 0)
+            with store.update(game.game_id) as this_game:
+                this_game.make_move('bär', 1)
+        store.close()
+        names: List[str] = sorted(os.listdir(self.directory.name))
+        self.assertEqual(
+            [name for name in names if name.startswith('snapshot-')],
+            ['snapshot-00000003.pickle'],
+        )
+        recovered: TwoPlayerGame = InMemoryGameStore(
+            Journal(self.directory.name),
+        ).get(game.game_id)
+        self.assertEqual(recovered.num_moves(), 6)
+        self.assertEqual(recovered.state, GameState.IN_PROGRESS)
+
+    def test_snapshot_is_pickled_outside_the_lock(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+        )
+        store.add(self.new_game())
+        pickled_under_lock: List[bool] = []
+        dumps: Callable[..., bytes] = pickle.dumps
+
+        def checked_dumps(*args: object, **kwargs: object) -> bytes:
+            pickled_under_lock.append(store.lock.locked())
+            return dumps(*args, **kwargs)
+
+        with mock.patch('game_store.pickle.dumps', checked_dumps):
+            store.take_snapshot()
+        store.close()
+        self.assertEqual(pickled_under_lock, [False])
+
+    def test_one_snapshot_at_a_time(self) -> None:
+        store: InMemoryGameStore = InMemoryGameStore(
+            Journal(self.directory.name),
+            snapshot_every=1,
+        )
+        store.add(self.new_game())
+        store.snapshotting = True
+        store.take_snapshot()
+        store.snapshotting = False
+        store.take_snapshot(only_if_due=True)
+        store.take_snapshot(only_if_due=True)
+        store.close()
+        self.assertEqual(
+            [
+                name for name in os.listdir(self.directory.name)
+                if name.startswith('snapshot-')
+            ],
+            ['snapshot-00000002.pickle'],
+        )
@@ -0,0 +1,177 @@
+import json
+import os
+import pickle
+import resource
+import tempfile
+from typing import List
+from unittest import TestCase, mock
+
+from move_log import (
+    MAPPED_LOGS_LIMIT,
+    MmapMoveLog,
+    MoveLog,
+    make_move_log,
+    mapped_logs,
+    mapped_logs_lock,
+)
+
+
+class MoveLogTest(TestCase):
+    def test_moves_are_materialized_as_dicts(self) -> None:
+        move_log: MoveLog = MoveLog(['foo', 'bar'])
+        move_log.append_move(0, 3)
+        move_log.append_move(1, 0)
+        move_log.append_quit(0)
+        self.assertEqual(len(move_log), 3)
+        self.assertEqual(
+            move_log.get(0),
+            {'type': 'MOVE', 'player': 'foo', 'column': 3},
+        )
+        self.assertEqual(
+            move_log.get_range(1, 3),
+            [
+                {'type': 'MOVE', 'player': 'bar', 'column': 0},
+                {'type': 'QUIT', 'player': 'foo'},
+            ],
+        )
+
+    def test_large_columns_fit(self) -> None:
+        move_log: MoveLog = MoveLog(['foo', 'bar'])
+        move_log.append_move(1, 2 ** 40)
+        self.assertEqual(move_log.get(0)['column'], 2 ** 40)
+
+    def test_json_is_joined_from_fragments(self) -> None:
+        move_log: MoveLog = MoveLog(['foo', 'b\u00e4r'])
+        for move_number in range(10):
+            move_log.append_move(move_number % 2, move_number % 2)
+        move_log.append_quit(0)
+        # One fragment per distinct move, not per move
+        self.assertEqual(len(move_log.fragments), 3)
+        self.assertEqual(
+            json.loads(move_log.get_range_json(0, 11)),
+            move_log.get_range(0, 11),
+        )
+        self.assertEqual(move_log.get_range_json(2, 2), b'[]')
+        self.assertEqual(
+            move_log.get_json(1),
+            '{"type":"MOVE","player":"b\u00e4r","column":1}'.encode(),
+        )
+
+    def test_fragments_are_rebuilt_when_unpickled(self) -> None:
+        move_log: MoveLog = MoveLog(['foo', 'bar'])
+        move_log.append_move(0, 3)
+        move_log.append_quit(1)
+        reloaded: MoveLog = pickle.loads(pickle.dumps(move_log))
+        self.assertEqual(reloaded.fragments, move_log.fragments)
+        self.assertEqual(reloaded.get_range_json(0, 2), (
+            b'[{"type":"MOVE","player":"foo","column":3},'
+            b'{"type":"QUIT","player":"bar"}]'
+        ))
+
+
+class MmapMoveLogTest(TestCase):
+    def setUp(self) -> None:
+        self.directory: tempfile.TemporaryDirectory = (
+            tempfile.TemporaryDirectory()
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_same_moves_as_move_log(self) -> None:
+        in_heap: MoveLog = make_move_log(['foo', 'bar'], 'game')
+        mapped: MmapMoveLog = make_move_log(
+            ['foo', 'bar'],
+            'game',
+            self.directory.name,
+        )
+        self.assertIsInstance(mapped, MmapMoveLog)
+        # Enough moves to grow the file a few times
+        for move_log in (in_heap, mapped):
+            for move_number in range(1000):
+                move_log.append_move(move_number % 2, move_number)
+            move_log.append_quit(1)
+        self.assertEqual(len(mapped), 1001)
+        self.assertEqual(mapped.get_range(0, 1001), in_heap.get_range(0, 1001))
+        self.assertEqual(mapped.get(1000), in_heap.get(1000))
+        self.assertEqual(mapped.entry(999), (1, False, 999))
+        self.assertEqual(
+            mapped.get_range_json(0, 1001),
+            in_heap.get_range_json(0, 1001),
+        )
+        self.assertEqual(mapped.get_json(1000), in_heap.get_json(1000))
+
+    def test_pickles_as_a_reference_to_its_file(self) -> None:
+        mapped: MmapMoveLog = MmapMoveLog(
+            ['foo', 'bar'],
+            os.path.join(self.directory.name, 'game.moves'),
+        )
+        mapped.append_move(0, 3)
+        reopened: MmapMoveLog = pickle.loads(pickle.dumps(mapped))
+        reopened.append_move(1, 4)
+        self.assertEqual(
+            reopened.get_range(0, 2),
+            [
+                {'type': 'MOVE', 'player': 'foo', 'column': 3},
+                {'type': 'MOVE', 'player': 'bar', 'column': 4},
+            ],
+        )
+        self.assertEqual(reopened.fragments, mapped.fragments | {
+            (4, 1): b'{"type":"MOVE","player":"bar","column":4}',
+        })
+
+    def test_more_logs_than_open_files_allowed(self) -> None:
+        # Every log used to keep its file and its mapping open
+        soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+        open_files: int = len(os.listdir('/proc/self/fd'))
+        resource.setrlimit(
+            resource.RLIMIT_NOFILE,
+            (open_files + MAPPED_LOGS_LIMIT + 16, hard_limit),
+        )
+        self.addCleanup(
+            resource.setrlimit,
+            resource.RLIMIT_NOFILE,
+            (soft_limit, hard_limit),
+        )
+        move_logs: List[MmapMoveLog] = [
+            make_move_log(['foo', 'bar'], str(number), self.directory.name)
+            for number in range(4 * (open_files + MAPPED_LOGS_LIMIT))
+        ]
+        for number, move_log in enumerate(move_logs):
+            move_log.append_move(0, number)
+        for number, move_log in enumerate(move_logs):
+            move_log.append_quit(1)
+            self.assertEqual(move_log.entry(0), (0, False, number))
+        self.assertLessEqual(len(mapped_logs), MAPPED_LOGS_LIMIT)
+
+    def test_files_are_synced_outside_the_lock(self) -> None:
+        mapped: MmapMoveLog = MmapMoveLog(
+            ['foo', 'bar'],
+            os.path.join(self.directory.name, 'game.moves'),
+        )
+        mapped.append_move(0, 3)
+        synced_under_lock: List[bool] = []
+
+        def checked_sync(path: str) -> None:
+            synced_under_lock.append(mapped_logs_lock.locked())
+
+        with mock.patch('move_log.sync_file', checked_sync):
+            pickle.dumps(mapped)
+        self.assertEqual(synced_under_lock, [False])
+
+    def test_detached_logs_no_longer_need_their_file(self) -> None:
+        path: str = os.path.join(self.directory.name, 'game.moves')
+        mapped: MmapMoveLog = MmapMoveLog(['foo', 'bar'], path)
+        mapped.append_move(0, 3)
+        mapped.append_quit(1)
+        pickled_with_path: bytes = pickle.dumps(mapped)
+        mapped.remove()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(mapped.get_range_json(0, 2), (
+            b'[{"type":"MOVE","player":"foo","column":3},'
+            b'{"type":"QUIT","player":"bar"}]'
+        ))
+        reloaded: MmapMoveLog = pickle.loads(pickle.dumps(mapped))
+        self.assertEqual(reloaded.get(1), {'type': 'QUIT', 'player': 'bar'})
+        # Unpickling one whose file is gone fails only once it is read
+        self.assertEqual(len(pickle.loads(pickled_with_path)), 2)
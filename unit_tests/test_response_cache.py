@@ -0,0 +1,93 @@
+from typing import List
+from unittest import TestCase
+
+from exceptions import FetchMoveException
+from move_log import MoveLog
+from response_cache import FrozenGame, ResponseCache, frozen_size_bound
+
+
+def frozen_game(num_moves: int) -> FrozenGame:
+    move_log: MoveLog = MoveLog(['foo', 'bar'])
+    for move_number in range(num_moves):
+        move_log.append_move(move_number % 2, move_number)
+    fragments: List[bytes] = [
+        move_log.get_json(move_number) for move_number in range(num_moves)
+    ]
+    return FrozenGame('"etag"', b'{"state":"DONE"}', fragments)
+
+
+class FrozenGameTest(TestCase):
+    def test_ranges_are_slices_of_the_move_list(self) -> None:
+        move_log: MoveLog = MoveLog(['foo', 'bar'])
+        for move_number in range(12):
+            move_log.append_move(move_number % 2, move_number)
+        move_log.append_quit(0)
+        frozen: FrozenGame = FrozenGame(
+            '"13-DONE"',
+            b'{}',
+            [move_log.get_json(move_number) for move_number in range(13)],
+        )
+        self.assertEqual(frozen.num_moves(), 13)
+        self.assertEqual(
+            frozen.moves_json,
+            b'{"moves":' + move_log.get_range_json(0, 13) + b'}',
+        )
+        for start, end in ((0, 1), (3, 7), (12, 13), (0, 13), (5, 5)):
+            self.assertEqual(
+                frozen.get_range_json(start, end),
+                move_log.get_range_json(start, end),
+            )
+        self.assertEqual(frozen.get_move_json(12), move_log.get_json(12))
+        self.assertEqual(frozen.move_slice(2, None), (2, 13))
+        with self.assertRaises(FetchMoveException):
+            frozen.get_move_json(13)
+        with self.assertRaises(FetchMoveException):
+            frozen.move_slice(0, 13)
+
+    def test_size_bound_covers_the_size(self) -> None:
+        for num_moves in (0, 1, 10, 100):
+            frozen: FrozenGame = frozen_game(num_moves)
+            longest_fragment: int = max(
+                (
+                    len(frozen.get_move_json(move_number))
+                    for move_number in range(num_moves)
+                ),
+                default=0,
+            )
+            self.assertGreaterEqual(
+                frozen_size_bound(
+                    len(frozen.status_json),
+                    num_moves,
+                    longest_fragment,
+                ),
+                frozen.size(),
+            )
+
+
+class ResponseCacheTest(TestCase):
+    def test_least_recently_used_games_are_evicted(self) -> None:
+        size: int = frozen_game(10).size()
+        cache: ResponseCache = ResponseCache(3 * size)
+        for game_id in 'abc':
+            cache.put(game_id, frozen_game(10))
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('d', frozen_game(10))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(list(cache.entries), ['c', 'a', 'd'])
+        self.assertEqual(cache.total_bytes, 3 * size)
+
+    def test_replacing_a_game_keeps_the_total_right(self) -> None:
+        cache: ResponseCache = ResponseCache(2 ** 20)
+        cache.put('a', frozen_game(10))
+        cache.put('a', frozen_game(20))
+        self.assertEqual(cache.total_bytes, frozen_game(20).size())
+
+    def test_games_bigger_than_the_cache_are_not_kept(self) -> None:
+        cache: ResponseCache = ResponseCache(frozen_game(10).size())
+        cache.put('a', frozen_game(10))
+        cache.put('b', frozen_game(1000))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.total_bytes, 0)
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from boards import ListBoard
+from winning_lines import LineCounters, WinningLines, get_winning_lines
+
+
+class WinningLinesTest(TestCase):
+    def test_standard_board_has_69_lines(self) -> None:
+        winning_lines: WinningLines = get_winning_lines(6, 7, 4)
+        self.assertEqual(len(winning_lines.lines), 69)
+        self.assertEqual(len(winning_lines.lines_through_cell), 42)
+
+    def test_lines_through_cell_contain_that_cell(self) -> None:
+        winning_lines: WinningLines = get_winning_lines(5, 6, 3)
+        for cell, line_ids in enumerate(winning_lines.lines_through_cell):
+            for line_id in line_ids:
+                self.assertIn(cell, winning_lines.lines[line_id])
+
+    def test_line_shapes(self) -> None:
+        winning_lines: WinningLines = get_winning_lines(2, 2, 2)
+        self.assertEqual(
+            sorted(winning_lines.lines),
+            [(0, 1), (0, 2), (0, 3), (1, 3), (2, 1), (2, 3)],
+        )
+
+    def test_board_too_small_for_any_line(self) -> None:
+        winning_lines: WinningLines = get_winning_lines(3, 3, 4)
+        self.assertEqual(winning_lines.lines, ())
+
+    def test_single_cell_lines_are_not_repeated(self) -> None:
+        winning_lines: WinningLines = get_winning_lines(2, 3, 1)
+        self.assertEqual(len(winning_lines.lines), 6)
+
+    def test_index_is_shared_between_boards_of_the_same_shape(self) -> None:
+        first: ListBoard = ListBoard(6, 7, 4)
+        second: ListBoard = ListBoard(6, 7, 4)
+        other_shape: ListBoard = ListBoard(7, 6, 4)
+        self.assertIs(first.winning_lines, second.winning_lines)
+        self.assertIsNot(first.winning_lines, other_shape.winning_lines)
+
+    def test_line_counters_track_wins_and_threats(self) -> None:
+        # Bottom row of a 2x3 board, cells 3, 4 and 5
+        counters: LineCounters = LineCounters(get_winning_lines(2, 3, 3))
+        bottom_row: int = counters.winning_lines.lines.index((3, 4, 5))
+        counters.add_token(0, 3)
+        self.assertEqual(counters.threat_lines, [set(), set()])
+        counters.add_token(0, 4)
+        self.assertEqual(counters.threat_lines, [{bottom_row}, set()])
+        self.assertFalse(counters.has_full_line_through(0, 4))
+        counters.add_token(0, 5)
+        self.assertTrue(counters.has_full_line_through(0, 5))
+        self.assertEqual(counters.threat_lines, [set(), set()])
+
+    def test_line_counters_opponent_token_removes_threat(self) -> None:
+        counters: LineCounters = LineCounters(get_winning_lines(2, 3, 3))
+        counters.add_token(0, 3)
+        counters.add_token(0, 4)
+        counters.add_token(1, 5)
+        self.assertEqual(counters.threat_lines, [set(), set()])
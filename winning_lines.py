@@ -0,0 +1,107 @@
+from array import array
+from functools import lru_cache
+from typing import List, NamedTuple, Set, Tuple
+
+
+class WinningLines(NamedTuple):
+    # Cells are numbered row * columns + column, row 0 being the top.
+    # lines[line_id] holds the cells of one winning line and
+    # lines_through_cell[cell] holds the ids of every line containing cell.
+    rows: int
+    columns: int
+    how_many: int
+    lines: Tuple[Tuple[int, ...], ...]
+    lines_through_cell: Tuple[Tuple[int, ...], ...]
+
+    def __reduce__(self) -> tuple:
+        # Pickled boards point back at the shared index instead of copying it
+        return (get_winning_lines, (self.rows, self.columns, self.how_many))
+
+
+@lru_cache(maxsize=32)
+def get_winning_lines(rows: int, columns: int, how_many: int) -> WinningLines:
+    # Built once per board shape and shared by every game of that shape,
+    # which is why everything in it is a tuple.
+    lines: List[Tuple[int, ...]] = []
+    lines_through_cell: List[List[int]] = [[] for _ in range(rows * columns)]
+    directions: List[Tuple[int, int]] = [(0, 1), (1, 0), (1, 1), (-1, 1)]
+    if how_many == 1:
+        # A single cell is the same line in every direction
+        directions = directions[:1]
+    for row_step, col_step in directions:
+        for start_row in range(rows):
+            end_row: int = start_row + (how_many - 1) * row_step
+            if not 0 <= end_row < rows:
+                continue
+            for start_col in range(columns - (how_many - 1) * col_step):
+                line: Tuple[int, ...] = tuple(
+                    (start_row + i * row_step) * columns
+                    + start_col + i * col_step
+                    for i in range(how_many)
+                )
+                for cell in line:
+                    lines_through_cell[cell].append(len(lines))
+                lines.append(line)
+    return WinningLines(
+        rows,
+        columns,
+        how_many,
+        tuple(lines),
+        tuple(tuple(line_ids) for line_ids in lines_through_cell),
+    )
+
+
+class LineCounters:
+    # How many tokens each player has on each winning line of one board.
+    # A line is a threat for a player when they are one token short of
+    # filling it and the other player has no token on it, and is still open
+    # to a player as long as the other player has no token on it.
+    __slots__ = (
+        'winning_lines',
+        'counts',
+        'threat_lines',
+        'open_line_counts',
+    )
+
+    def __init__(self, winning_lines: WinningLines) -> None:
+        self.winning_lines: WinningLines = winning_lines
+        num_lines: int = len(winning_lines.lines)
+        # A count never exceeds the win condition, so a byte usually does
+        typecode: str = 'B' if winning_lines.how_many < 256 else 'I'
+        self.counts: List[array] = [
+            array(typecode, [0]) * num_lines,
+            array(typecode, [0]) * num_lines,
+        ]
+        # With a win condition of 1 every empty line starts one token short
+        starts_as_threat: bool = winning_lines.how_many == 1
+        self.threat_lines: List[Set[int]] = [
+            set(range(num_lines)) if starts_as_threat else set(),
+            set(range(num_lines)) if starts_as_threat else set(),
+        ]
+        self.open_line_counts: List[int] = [num_lines, num_lines]
+
+    def add_token(self, player_index: int, cell: int) -> None:
+        how_many: int = self.winning_lines.how_many
+        own_counts: array = self.counts[player_index]
+        other_counts: array = self.counts[1 - player_index]
+        for line_id in self.winning_lines.lines_through_cell[cell]:
+            own_counts[line_id] += 1
+            if own_counts[line_id] == 1:
+                self.threat_lines[1 - player_index].discard(line_id)
+                self.open_line_counts[1 - player_index] -= 1
+            if other_counts[line_id] == 0:
+                if own_counts[line_id] == how_many - 1:
+                    self.threat_lines[player_index].add(line_id)
+                elif own_counts[line_id] == how_many:
+                    self.threat_lines[player_index].discard(line_id)
+
+    def can_still_win(self, player_index: int) -> bool:
+        return self.open_line_counts[player_index] > 0
+
+    def has_full_line_through(self, player_index: int, cell: int) -> bool:
+        how_many: int = self.winning_lines.how_many
+        own_counts: array = self.counts[player_index]
+        return any(
+            own_counts[line_id] == how_many
+            for line_id in self.winning_lines.lines_through_cell[cell]
+        )